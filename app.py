@@ -11,12 +11,21 @@ import sys
 import time
 import hashlib
 from dotenv import load_dotenv
-from utils.data_loader import load_residents_from_excel
 from utils.sharepoint_data_loader import load_residents_from_sharepoint_list, load_residents_from_credhub_lists
-from utils.excel_export import (create_resident_list_export, create_reporting_runs_export,
-                                create_disputes_export, create_audit_logs_export)
-from utils.entrata_api import get_entrata_client
-from utils.sharepoint_verification import verify_resident_sharepoint, warmup_graph_token, warmup_site_id, get_graph_token_cache_state, get_site_id_cache_state, get_verification_site_config, get_user_email_from_graph
+from utils.payment_views import compute_enrolled_payments, refresh_payment_views, attach_payment_views
+from utils.resident_snapshot import get_resident_snapshot, build_resident_snapshot, invalidate_resident_snapshot, snapshot_etag, get_snapshot_trend_series, get_resident_snapshot_state, get_resident_data_generation
+from utils.auth_decision_cache import authorization_decision_key, get_authorization_decision, store_authorization_decision
+from utils.fragment_cache import init_fragment_cache
+from utils.session_store import init_session_store, update_session
+from utils.request_timing import init_request_timing, timing_span, timed_span, get_route_timing_stats
+from utils.metrics import start_metrics_publisher, render_metrics, PROMETHEUS_CONTENT_TYPE
+from utils.deadline import Deadline
+from utils.readiness import run_warmup_targets, register_readiness_check, evaluate_readiness, STARTUP_WARMUP_DEADLINE_MS
+from utils.verification_orchestrator import verify_resident, VERIFICATION_SOURCES
+from utils.verification_guard import verification_result_key, get_cached_verification_result, store_verification_result, check_verification_rate_limits, get_verification_guard_state
+from utils.lru_cache import LRUCache
+from utils.logging_pipeline import configure_logging, log_kv, diagnostics_enabled
+from utils.sharepoint_verification import warmup_graph_token, warmup_site_id, get_graph_token_cache_state, get_site_id_cache_state, get_verification_site_config, get_user_email_from_graph, warmup_admin_directory, get_admin_directory_version, warmup_verification_index, get_verification_index_state
 from utils.entra_token_validation import require_bearer_token, warmup_jwks_cache, log_auth_config_diagnostics, get_jwks_cache_state
 from utils.custom_extension_responses import (
     build_continue_response,
@@ -41,12 +50,8 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
 app.config['SESSION_COOKIE_NAME'] = 'credit_boost_session'
 
-# Configure logging for Azure
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+# Configure logging for Azure (queue-based: a background thread formats and writes to stdout)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -112,17 +117,38 @@ def safe_log_timings_dict(timings_dict, prefix=""):
 _first_request_after_start = True
 _first_request_lock = __import__('threading').Lock()
 
+# ============================================================================
+# VERIFICATION DEADLINE
+# ============================================================================
+# The Entra custom authentication extension gives up after ~2 seconds.
+# /api/verify-resident measures its budget from decorator entry (before token
+# validation); token, site and list stages get the remaining budget, and once
+# it is spent the endpoint answers with VERIFY_DEADLINE_RESPONSE
+# ('block' = ShowBlockPage, 'validation' = ShowValidationError)
+# ============================================================================
+VERIFY_REQUEST_BUDGET_MS = int(os.environ.get('VERIFY_REQUEST_BUDGET_MS', '1700'))
+VERIFY_DEADLINE_RESPONSE = os.environ.get('VERIFY_DEADLINE_RESPONSE', 'block').lower()
+
 # ============================================================================
 # STARTUP WARM-UP FOR PERFORMANCE
 # ============================================================================
 # Pre-fetch expensive dependencies on app startup to eliminate cold-start latency
 # This ensures the first custom authentication extension request is fast
+# Targets run concurrently within STARTUP_WARMUP_DEADLINE_MS (utils/readiness.py)
 # ============================================================================
+WARMUP_ADMIN_DIRECTORY = os.environ.get('WARMUP_ADMIN_DIRECTORY', 'true').lower() == 'true'
+WARMUP_SNAPSHOT_SOURCES = [
+    name.strip().lower() for name in os.environ.get('WARMUP_SNAPSHOT_SOURCES', '').split(',') if name.strip()
+]
+
 
 def warmup_caches():
     """
     Warm up all caches on application startup
-    Pre-fetches JWKS keys, Graph tokens, and SharePoint site IDs
+    Pre-fetches JWKS keys, Graph tokens, SharePoint site IDs, the admin directory,
+    the sign-up verification index and any WARMUP_SNAPSHOT_SOURCES resident snapshots.
+    Targets run concurrently under STARTUP_WARMUP_DEADLINE_MS (targets needing the
+    Graph token wait on its single-flight acquisition); results go to the readiness registry
     Logs results but does not fail app startup on errors
     """
     import socket
@@ -144,34 +170,55 @@ def warmup_caches():
     
     warmup_start = time.time()
     
-    # 1. Warm up JWKS cache
-    jwks_result = warmup_jwks_cache()
-    if jwks_result['success']:
-        logger.info(f"✅ JWKS warm-up: SUCCESS ({jwks_result['duration_ms']:.1f}ms)")
-    else:
-        logger.warning(f"⚠️ JWKS warm-up: FAILED ({jwks_result['error']})")
-    
-    # 2. Warm up Graph token cache
-    token_result = warmup_graph_token()
-    if token_result['success']:
-        logger.info(f"✅ Graph token warm-up: SUCCESS ({token_result['duration_ms']:.1f}ms, TTL={token_result['ttl_s']:.0f}s)")
-    else:
-        logger.warning(f"⚠️ Graph token warm-up: FAILED ({token_result['error']})")
+    targets = [
+        ('jwks', warmup_jwks_cache),
+        ('graph_token', warmup_graph_token),
+        ('site_id', warmup_site_id),
+        ('verification_index', warmup_verification_index)
+    ]
+    if WARMUP_ADMIN_DIRECTORY:
+        targets.append(('admin_directory', warmup_admin_directory))
+    for data_source in WARMUP_SNAPSHOT_SOURCES:
+        targets.append((f'resident_snapshot:{data_source}', lambda data_source=data_source: warmup_resident_snapshot(data_source)))
+    
+    results = run_warmup_targets(targets, deadline_ms=STARTUP_WARMUP_DEADLINE_MS)
+    
+    labels = {
+        'jwks': 'JWKS',
+        'graph_token': 'Graph token',
+        'site_id': 'Site ID',
+        'verification_index': 'Verification index',
+        'admin_directory': 'Admin directory'
+    }
+    details = {
+        'graph_token': lambda r: f", TTL={r['ttl_s']:.0f}s",
+        'site_id': lambda r: f", site={r['site_id'][:40]}...",
+        'verification_index': lambda r: f", emails={r['email_count']}",
+        'admin_directory': lambda r: f", admins={r['admin_count']}"
+    }
     
-    # 3. Warm up Site ID cache
-    site_result = warmup_site_id()
-    if site_result['success']:
-        logger.info(f"✅ Site ID warm-up: SUCCESS ({site_result['duration_ms']:.1f}ms, site={site_result['site_id'][:40]}...)")
-    else:
-        logger.warning(f"⚠️ Site ID warm-up: FAILED ({site_result['error']})")
+    def status(result):
+        if result.get('pending'):
+            return 'PENDING'
+        return 'SUCCESS' if result['success'] else 'FAILED'
+    
+    for name, result in results.items():
+        label = labels.get(name, name.replace('_', ' ').capitalize())
+        if result['success']:
+            detail = details[name](result) if name in details else ''
+            logger.info(f"✅ {label} warm-up: SUCCESS ({result['duration_ms']:.1f}ms{detail})")
+        elif result.get('pending'):
+            logger.warning(f"⏱️ {label} warm-up: PENDING after {result['duration_ms']:.0f}ms - continuing in background")
+        else:
+            logger.warning(f"⚠️ {label} warm-up: FAILED ({result['error']})")
     
     total_duration = (time.time() - warmup_start) * 1000
+    slowest = max(results, key=lambda name: results[name]['duration_ms'] or 0) if results else None
     
     logger.info("="*80)
-    logger.info(f"🔥 STARTUP WARM-UP: Complete in {total_duration:.1f}ms")
-    logger.info(f"   JWKS: {'SUCCESS' if jwks_result['success'] else 'FAILED'}")
-    logger.info(f"   Graph token: {'SUCCESS' if token_result['success'] else 'FAILED'}")
-    logger.info(f"   Site ID: {'SUCCESS' if site_result['success'] else 'FAILED'}")
+    logger.info(f"🔥 STARTUP WARM-UP: Complete in {total_duration:.1f}ms (slowest: {slowest}, deadline={STARTUP_WARMUP_DEADLINE_MS}ms)")
+    for name, result in results.items():
+        logger.info(f"   {labels.get(name, name.replace('_', ' ').capitalize())}: {status(result)}")
     logger.info("="*80)
     
     # Concise one-line summary
@@ -179,20 +226,24 @@ def warmup_caches():
         f"📊 STARTUP SUMMARY: "
         f"worker_pid={worker_pid} | "
         f"hostname={hostname} | "
-        f"jwks_warmup={'success' if jwks_result['success'] else 'fail'} | "
-        f"graph_token_warmup={'success' if token_result['success'] else 'fail'} | "
-        f"site_id_warmup={'success' if site_result['success'] else 'fail'} | "
+        + "".join(f"{name.replace(':', '_')}_warmup={'pending' if result.get('pending') else 'success' if result['success'] else 'fail'} | " for name, result in results.items())
+        + f"slowest_warmup={slowest} | "
         f"total_startup_warmup_ms={total_duration:.0f}"
     )
     logger.info(summary)
     logger.info("="*80)
 
-# Run warm-up on module load (when app starts)
-try:
-    warmup_caches()
-except Exception as warmup_error:
-    logger.error(f"❌ Startup warm-up failed with exception: {warmup_error}", exc_info=True)
-    logger.warning("⚠️ Continuing app startup despite warm-up failure. Caches will populate on first request.")
+# Server-side sessions: the cookie carries only a session ID (SESSION_BACKEND=cookie to revert)
+init_session_store(app)
+
+# Jinja fragment cache ({% call cache_fragment(...) %}) for per-resident template blocks
+init_fragment_cache(app)
+
+# Per-request timing spans (Server-Timing header for admins, per-route aggregates)
+init_request_timing(app)
+
+# Publish this worker's metrics to the shared cache so /metrics covers every worker
+start_metrics_publisher()
 
 # Custom Jinja filter for currency formatting with commas
 @app.template_filter('currency')
@@ -273,44 +324,11 @@ def mask_phone_filter(value):
         return '***-***-****'
 
 # Custom Jinja filter to filter payments during enrollment
+# Kept for compatibility - templates read the precomputed resident['enrolled_payments'] view
 @app.template_filter('enrolled_payments')
 def enrolled_payments_filter(payments, enrollment_history):
     """Filter payments to only show those that occurred during enrolled periods"""
-    if not payments or not enrollment_history:
-        return []
-    
-    # Find the first enrollment date
-    enrollment_date = None
-    for event in enrollment_history:
-        if event.get('action') == 'enrolled':
-            enrollment_date = event.get('timestamp')
-            break
-    
-    if not enrollment_date:
-        return []
-    
-    # Parse enrollment date (could be datetime string or date string)
-    try:
-        if ' ' in enrollment_date:  # datetime format
-            enrollment_dt = datetime.strptime(enrollment_date, '%Y-%m-%d %H:%M:%S')
-        else:  # date only format
-            enrollment_dt = datetime.strptime(enrollment_date, '%Y-%m-%d')
-    except (ValueError, TypeError):
-        return payments  # If we can't parse, return all payments
-    
-    # Filter payments to only those on or after enrollment date
-    filtered_payments = []
-    for payment in payments:
-        payment_date_str = payment.get('payment_date')
-        if payment_date_str:
-            try:
-                payment_dt = datetime.strptime(payment_date_str, '%Y-%m-%d')
-                if payment_dt >= enrollment_dt:
-                    filtered_payments.append(payment)
-            except (ValueError, TypeError):
-                continue
-    
-    return filtered_payments
+    return compute_enrolled_payments(payments, enrollment_history)
 
 # Load test data from JSON file (fallback)
 def load_test_data():
@@ -332,33 +350,39 @@ CURRENT_RESIDENT_ID = 1
 
 # Lazy-load residents on first access to avoid blocking worker startup
 _residents_cache = None
-_residents_loading = False
+_residents_load_lock = __import__('threading').Lock()
 
 def get_residents():
-    """Lazy-load residents on first access to avoid blocking Gunicorn worker startup"""
-    global _residents_cache, _residents_loading
+    """
+    Lazy-load residents on first access to avoid blocking Gunicorn worker startup.
+    Concurrent first callers wait for the one in-flight load instead of seeing an empty list.
+    """
+    global _residents_cache
     
     if _residents_cache is not None:
         return _residents_cache
     
-    if _residents_loading:
-        # Prevent re-entrant loading
-        return []
-    
-    _residents_loading = True
-    try:
-        logger.info("Loading residents from Excel file...")
-        _residents_cache = load_residents_from_excel('Resident PII Test.xlsx')
-        if not _residents_cache:
-            logger.warning("Excel file empty or not found, falling back to JSON")
-            _residents_cache = load_test_data()
-        logger.info(f"Loaded {len(_residents_cache)} residents from data source")
-    except Exception as e:
-        logger.error(f"Error loading Excel file: {e}, falling back to JSON", exc_info=True)
-        _residents_cache = load_test_data()
-    finally:
-        _residents_loading = False
-    
+    with _residents_load_lock:
+        # Another thread may have finished loading while we waited
+        if _residents_cache is not None:
+            return _residents_cache
+        
+        # Build on a local list and publish it only once complete - readers outside
+        # the lock must never see residents without their payment views
+        try:
+            from utils.data_loader import load_residents_from_excel  # pandas, only for the test data source
+            logger.info("Loading residents from Excel file...")
+            loaded = load_residents_from_excel('Resident PII Test.xlsx')
+            if not loaded:
+                logger.warning("Excel file empty or not found, falling back to JSON")
+                loaded = load_test_data()
+            logger.info(f"Loaded {len(loaded)} residents from data source")
+        except Exception as e:
+            logger.error(f"Error loading Excel file: {e}, falling back to JSON", exc_info=True)
+            loaded = load_test_data()
+        
+        # Precompute payment views once per load instead of on every render
+        _residents_cache = attach_payment_views(loaded)
     return _residents_cache
 
 # Compatibility wrapper - use get_residents() for lazy loading
@@ -399,6 +423,107 @@ def get_last_reported_month(resident):
     return "N/A"
 
 
+def get_authorization_generation():
+    """
+    Versions the cached authorization decisions depend on.
+    A change to the admin list or the resident data invalidates every decision.
+    """
+    return get_admin_directory_version(), get_resident_data_generation('test')
+
+
+def get_admin_snapshot(data_source):
+    """
+    Get the cached resident snapshot for an admin data source.
+    Falls back to the test data snapshot if SharePoint/CredHub loading fails.
+    
+    Returns:
+        tuple: (snapshot dict, fell_back: bool)
+    """
+    if data_source == 'sharepoint':
+        # Load from SharePoint List (Credit Boost - Tenants)
+        snapshot = get_resident_snapshot('sharepoint', load_residents_from_sharepoint_list)
+    elif data_source == 'credhub':
+        # Load from CredHub SharePoint Lists
+        snapshot = get_resident_snapshot('credhub', load_residents_from_credhub_lists)
+    else:
+        snapshot = None
+    
+    if snapshot is not None:
+        return snapshot, False
+    
+    # Use test data; with no test data at all, render empty pages rather than fail
+    snapshot = get_resident_snapshot('test', get_residents)
+    if snapshot is None:
+        snapshot = build_resident_snapshot('test', [], source='empty', store=False)
+    return snapshot, data_source in ('sharepoint', 'credhub')
+
+
+def warm_resident_snapshots(data_sources, source='startup_warmup'):
+    """
+    Build resident snapshots ahead of the first admin request
+    Used by the gunicorn --preload master (PREFORK_SNAPSHOT_SOURCES) so forked workers share them
+    
+    Args:
+        data_sources: iterable of 'test', 'sharepoint', 'credhub'
+        source: cache source label
+    
+    Returns:
+        dict of data_source -> snapshot version (None if loading failed)
+    """
+    loaders = {
+        'test': get_residents,
+        'sharepoint': load_residents_from_sharepoint_list,
+        'credhub': load_residents_from_credhub_lists
+    }
+    versions = {}
+    for data_source in data_sources:
+        if data_source not in loaders:
+            logger.warning(f"⚠️ Unknown resident data source for warm-up: {data_source}")
+            continue
+        snapshot = get_resident_snapshot(data_source, loaders[data_source], source=source)
+        versions[data_source] = snapshot['version'] if snapshot else None
+    return versions
+
+
+def warmup_resident_snapshot(data_source):
+    """
+    Warm up one resident snapshot on application startup (WARMUP_SNAPSHOT_SOURCES)
+    
+    Returns:
+        dict with warmup results: success (bool), duration_ms (float), version (str or None), error (str or None)
+    """
+    warmup_start = time.time()
+    version = warm_resident_snapshots([data_source]).get(data_source)
+    duration_ms = (time.time() - warmup_start) * 1000
+    return {
+        'success': version is not None,
+        'duration_ms': duration_ms,
+        'version': version,
+        'error': None if version is not None else f'{data_source} resident snapshot load failed'
+    }
+
+
+def _resident_snapshot_readiness(data_source):
+    """
+    Ready once the snapshot has been loaded - an expired snapshot is rebuilt on
+    the next admin request, so expiry alone does not take the worker out of rotation
+    """
+    state = get_resident_snapshot_state(data_source)
+    return state['present'], {'age_s': round(state['age_s']), 'expired': state['expired']}
+
+
+for _data_source in WARMUP_SNAPSHOT_SOURCES:
+    register_readiness_check(f'resident_snapshot:{_data_source}',
+                             lambda data_source=_data_source: _resident_snapshot_readiness(data_source))
+
+
+# Run warm-up on module load (when app starts)
+try:
+    warmup_caches()
+except Exception as warmup_error:
+    logger.error(f"❌ Startup warm-up failed with exception: {warmup_error}", exc_info=True)
+    logger.warning("⚠️ Continuing app startup despite warm-up failure. Caches will populate on first request.")
+
 # ============= AUTHORIZATION DECORATORS =============
 
 def require_admin(f):
@@ -451,6 +576,91 @@ def require_resident(f):
 
 # ============= EASY AUTH INTEGRATION =============
 
+# Decoded principals keyed by a digest of the X-MS-CLIENT-PRINCIPAL header, so
+# repeat requests skip base64/JSON decoding and the claim scans
+EASY_AUTH_PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get('EASY_AUTH_PRINCIPAL_CACHE_MAX_ENTRIES', '2048'))
+_easy_auth_principal_cache = LRUCache(EASY_AUTH_PRINCIPAL_CACHE_MAX_ENTRIES, name='easy_auth_principal')
+
+
+def decode_easy_auth_principal(principal_header):
+    """
+    Decode an X-MS-CLIENT-PRINCIPAL header and extract identity claims.
+    Results are memoized per header digest; the header is immutable for a given sign-in.
+    
+    Returns:
+        dict with email (from claims only), name, object_id, tenant_id, roles,
+        identity_provider and raw_claims
+    
+    Raises:
+        ValueError / UnicodeDecodeError if the header is not valid base64 JSON
+    """
+    header_digest = hashlib.sha256(principal_header.encode('utf-8')).hexdigest()
+    principal = _easy_auth_principal_cache.get(header_digest)
+    if principal is not None:
+        return principal
+    
+    # Decode the base64-encoded JSON
+    decoded = base64.b64decode(principal_header).decode('utf-8')
+    claims = json.loads(decoded)
+    
+    # Extract useful information
+    user_email = None
+    user_name = None
+    object_id = None
+    tenant_id = None
+    roles = []
+    
+    # Log all claims for debugging (first decode of each principal only)
+    if diagnostics_enabled(logger, 'auth.claims'):
+        all_claim_types = [claim.get('typ') for claim in claims.get('claims', [])]
+        logger.info(f"🔍 Easy Auth claims received: {all_claim_types[:10]}")  # Show first 10 claim types
+        
+        # DEBUG: Log ALL claim type-value pairs to diagnose email claim issue
+        logger.info(f"🔍 ALL CLAIMS DEBUG:")
+        for claim in claims.get('claims', []):
+            logger.info(f"   {claim.get('typ')}: {claim.get('val')}")
+    
+    # Single pass over the claims: OID, tenant, app roles, email and name
+    for claim in claims.get('claims', []):
+        claim_type = claim.get('typ')
+        claim_value = claim.get('val')
+        
+        if claim_type == 'http://schemas.microsoft.com/identity/claims/objectidentifier':
+            object_id = claim_value
+            logger.info(f"🔑 Extracted OID: {object_id[:16]}...")
+        
+        elif claim_type == 'http://schemas.microsoft.com/identity/claims/tenantid':
+            tenant_id = claim_value
+            logger.info(f"🔑 Extracted Tenant ID: {tenant_id[:16]}...")
+        
+        # Extract Azure AD app roles
+        elif claim_type == 'roles':
+            roles.append(claim_value)
+            logger.info(f"🎭 Found role: {claim_value}")
+        
+        # Check for email-related claims
+        elif claim_type in ['emails', 'email', 'preferred_username', 'upn', 'signInNames.emailAddress']:
+            if not user_email:  # Take first email found
+                user_email = claim_value
+                logger.info(f"✅ Found email in claim type '{claim_type}': {user_email}")
+        
+        # Check for name claim
+        elif claim_type == 'name':
+            user_name = claim_value
+    
+    principal = {
+        'email': user_email,
+        'name': user_name,
+        'object_id': object_id,
+        'tenant_id': tenant_id,
+        'roles': roles,
+        'identity_provider': claims.get('identity_provider', 'aad'),
+        'raw_claims': claims
+    }
+    _easy_auth_principal_cache.set(header_digest, principal)
+    return principal
+
+
 def get_easy_auth_claims():
     """
     Extract claims from Azure Easy Auth headers.
@@ -463,59 +673,9 @@ def get_easy_auth_claims():
         return None
     
     try:
-        # Decode the base64-encoded JSON
-        decoded = base64.b64decode(principal_header).decode('utf-8')
-        claims = json.loads(decoded)
-        
-        # Extract useful information
-        user_email = None
-        user_name = None
-        object_id = None
-        tenant_id = None
-        
-        # Log all claims for debugging (first time only per session)
-        all_claim_types = [claim.get('typ') for claim in claims.get('claims', [])]
-        logger.info(f"🔍 Easy Auth claims received: {all_claim_types[:10]}")  # Show first 10 claim types
-        
-        # DEBUG: Log ALL claim type-value pairs to diagnose email claim issue
-        logger.info(f"🔍 ALL CLAIMS DEBUG:")
-        for claim in claims.get('claims', []):
-            logger.info(f"   {claim.get('typ')}: {claim.get('val')}")
-        
-        # Extract OID and Tenant ID first (primary identity)
-        roles = []  # Initialize roles list
-        
-        for claim in claims.get('claims', []):
-            claim_type = claim.get('typ')
-            claim_value = claim.get('val')
-            
-            if claim_type == 'http://schemas.microsoft.com/identity/claims/objectidentifier':
-                object_id = claim_value
-                logger.info(f"🔑 Extracted OID: {object_id[:16]}...")
-            
-            if claim_type == 'http://schemas.microsoft.com/identity/claims/tenantid':
-                tenant_id = claim_value
-                logger.info(f"🔑 Extracted Tenant ID: {tenant_id[:16]}...")
-            
-            # Extract Azure AD app roles
-            if claim_type == 'roles':
-                roles.append(claim_value)
-                logger.info(f"🎭 Found role: {claim_value}")
-        
-        # Look for email claim and other user info
-        for claim in claims.get('claims', []):
-            claim_type = claim.get('typ')
-            claim_value = claim.get('val')
-            
-            # Check for email-related claims
-            if claim_type in ['emails', 'email', 'preferred_username', 'upn', 'signInNames.emailAddress']:
-                if not user_email:  # Take first email found
-                    user_email = claim_value
-                    logger.info(f"✅ Found email in claim type '{claim_type}': {user_email}")
-            
-            # Check for name claim
-            if claim_type == 'name':
-                user_name = claim_value
+        principal = decode_easy_auth_principal(principal_header)
+        user_email = principal['email']
+        object_id = principal['object_id']
         
         # Fallback to simple headers if claims parsing fails
         if not user_email:
@@ -528,7 +688,7 @@ def get_easy_auth_claims():
             else:
                 logger.info(f"⚠️ X-MS-CLIENT-PRINCIPAL-NAME is invalid: {fallback_email}")
         
-        # Final fallback: Query Microsoft Graph API using object identifier
+        # Final fallback: Query Microsoft Graph API using object identifier (cached per OID)
         # This is needed for External ID local accounts where email is stored as an identity
         if not user_email or user_email == 'unknown':
             if object_id:
@@ -543,12 +703,12 @@ def get_easy_auth_claims():
         
         return {
             'email': user_email,
-            'name': user_name or user_email,
+            'name': principal['name'] or user_email,
             'object_id': object_id,
-            'tenant_id': tenant_id,
-            'roles': roles,  # Include Azure AD app roles
-            'identity_provider': claims.get('identity_provider', 'aad'),
-            'raw_claims': claims
+            'tenant_id': principal['tenant_id'],
+            'roles': list(principal['roles']),  # Include Azure AD app roles
+            'identity_provider': principal['identity_provider'],
+            'raw_claims': principal['raw_claims']
         }
     except Exception as e:
         logger.error(f"Error parsing Easy Auth claims: {e}")
@@ -565,6 +725,7 @@ def get_easy_auth_claims():
 
 
 @app.before_request
+@timed_span('auth')
 def setup_session_from_easy_auth_middleware():
     """
     Middleware to populate Flask session from Easy Auth on every request.
@@ -572,7 +733,7 @@ def setup_session_from_easy_auth_middleware():
     """
     try:
         # Skip for health check and debug endpoints (must work without auth)
-        if request.path in ['/health', '/debug-ping', '/debug-auth']:
+        if request.path in ['/health', '/ready', '/debug-ping', '/debug-auth']:
             return
         
         # Skip session setup for landing page - let user choose their login path
@@ -599,8 +760,27 @@ def setup_session_from_easy_auth_middleware():
                 return
             # If role is resident but no resident_id, continue to try matching again
         
+        # Replay a cached authorization decision for this exact principal header
+        # (key changes with any claim/role change; entries expire quickly and are
+        # dropped when the admin list or resident data changes)
+        principal_header = request.headers.get('X-MS-CLIENT-PRINCIPAL')
+        decision_key = None
+        decision_generation = None
+        if principal_header:
+            with timing_span('auth_cache') as span:
+                decision_key = authorization_decision_key(request.headers.get('X-MS-CLIENT-PRINCIPAL-ID'), principal_header, app.secret_key)
+                decision_generation = get_authorization_generation()
+                decision = get_authorization_decision(decision_key, decision_generation)
+                span['desc'] = 'miss' if decision is None else 'hit'
+            if decision is not None:
+                # Enforce PERMANENT_SESSION_LIFETIME (1 hour); unchanged values are not rewritten
+                update_session(session, permanent=True, **decision)
+                logger.info(f"✅ Authorization decision cache HIT: role={decision.get('role')}, email={decision.get('user_email')}")
+                return
+        
         # Get Easy Auth claims
-        claims = get_easy_auth_claims()
+        with timing_span('auth_claims'):
+            claims = get_easy_auth_claims()
         
         if not claims:
             # No authentication - Easy Auth should have caught this
@@ -620,15 +800,18 @@ def setup_session_from_easy_auth_middleware():
         
         logger.info(f"🔍 Extracted from claims: email={user_email}, oid={object_id[:16] if object_id else None}...")
         
-        # Set session data (store only serializable data)
-        session['user_name'] = claims.get('name', user_email or 'Unknown User')
-        session['identity_provider'] = claims.get('identity_provider', 'unknown')
+        # Set session data (store only serializable data; only changed values are written)
+        identity = {
+            'user_name': claims.get('name', user_email or 'Unknown User'),
+            'identity_provider': claims.get('identity_provider', 'unknown')
+        }
         if user_email:
-            session['user_email'] = user_email
+            identity['user_email'] = user_email
         if object_id:
-            session['object_id'] = object_id
+            identity['object_id'] = object_id
         if tenant_id:
-            session['tenant_id'] = tenant_id
+            identity['tenant_id'] = tenant_id
+        update_session(session, **identity)
         
         # === STEP 1: Try OID-based lookup first (primary identity) ===
         resident_id = None
@@ -697,11 +880,11 @@ def setup_session_from_easy_auth_middleware():
         user_roles = claims.get('roles', [])
         if 'Admin' in user_roles:
             is_admin = True
-            session.permanent = True  # Enforce PERMANENT_SESSION_LIFETIME (1 hour)
-            session['role'] = 'admin'
-            session['user_email'] = user_email
+            update_session(session, permanent=True, role='admin', user_email=user_email)  # Enforce PERMANENT_SESSION_LIFETIME (1 hour)
             logger.info(f"✅ ADMIN AUTHORIZED via Azure AD app role: {user_email}")
             logger.info(f"   User roles: {user_roles}")
+            if decision_key:
+                store_authorization_decision(decision_key, decision_generation, session)
             return  # Admin authorized - exit middleware
         
         # METHOD 2: Fallback to SharePoint admin list check (if not already admin)
@@ -710,32 +893,30 @@ def setup_session_from_easy_auth_middleware():
             is_admin = check_admin_authorization(user_email)
             
             if is_admin:
-                session.permanent = True  # Enforce PERMANENT_SESSION_LIFETIME (1 hour)
-                session['role'] = 'admin'
-                session['user_email'] = user_email
+                update_session(session, permanent=True, role='admin', user_email=user_email)  # Enforce PERMANENT_SESSION_LIFETIME (1 hour)
                 logger.info(f"✅ ADMIN AUTHORIZED: email={user_email}")
+                if decision_key:
+                    store_authorization_decision(decision_key, decision_generation, session)
                 return
         
         # User is not admin - check if they have a valid resident record
         if resident:
             # Regular resident user with matched record
-            session.permanent = True  # Enforce PERMANENT_SESSION_LIFETIME (1 hour)
-            session['role'] = 'resident'
-            session['resident_id'] = resident_id
-            session['user_email'] = user_email
+            update_session(session, permanent=True, role='resident', resident_id=resident_id, user_email=user_email)  # Enforce PERMANENT_SESSION_LIFETIME (1 hour)
             logger.info(f"✅ RESIDENT AUTHORIZED: path={resolution_path} | resident_id={resident_id} | name={resident.get('name')} | email={user_email}")
         else:
             # CRITICAL SECURITY: No match found - DENY ACCESS
             # Do NOT default to any resident account
             # User is authenticated but not authorized for this application
-            session.permanent = True  # Enforce PERMANENT_SESSION_LIFETIME (1 hour)
-            session['role'] = 'unauthorized'
-            session['user_email'] = user_email
+            update_session(session, permanent=True, role='unauthorized', user_email=user_email)  # Enforce PERMANENT_SESSION_LIFETIME (1 hour)
             logger.warning(f"🚨 SECURITY: Unauthorized access attempt - authenticated user not found in system")
             logger.warning(f"   Email: {user_email}")
             logger.warning(f"   OID: {object_id[:16] if object_id else 'None'}...")
             logger.warning(f"   Resolution path: {resolution_path or 'unresolved_no_match'}")
             logger.warning(f"   Action: Access denied - redirecting to unauthorized page")
+        
+        if decision_key:
+            store_authorization_decision(decision_key, decision_generation, session)
 
     
     except Exception as e:
@@ -854,23 +1035,28 @@ def verify_resident_signup():
     # WORKER/PROCESS IDENTITY
     # Confirm same process handling warmup and requests
     # ============================================================================
-    import socket
-    worker_pid = os.getpid()
-    hostname = socket.gethostname()
-    logger.info(f"🔧 Worker PID: {worker_pid}, Hostname: {hostname}")
-    
-    # ============================================================================
-    # CACHE STATE DIAGNOSTICS
-    # Check if caches were populated by startup warm-up
-    # ============================================================================
-    jwks_cache_state = get_jwks_cache_state()
-    graph_cache_state = get_graph_token_cache_state()
-    site_cache_state = get_site_id_cache_state()
-    
-    logger.info("📦 CACHE STATE AT REQUEST START:")
-    logger.info(f"   JWKS cache: present={jwks_cache_state['present']}, source={jwks_cache_state.get('source', 'N/A')}, age={jwks_cache_state['age_s']:.0f}s, expired={jwks_cache_state['expired']}")
-    logger.info(f"   Graph token cache: present={graph_cache_state['present']}, source={graph_cache_state.get('source', 'N/A')}, age={graph_cache_state['age_s']:.0f}s, expired={graph_cache_state['expired']}")
-    logger.info(f"   Site ID cache: present={site_cache_state['present']}, source={site_cache_state.get('source', 'N/A')}, age={site_cache_state['age_s']:.0f}s")
+    if diagnostics_enabled(logger, 'verify.cache_state'):
+        import socket
+        worker_pid = os.getpid()
+        hostname = socket.gethostname()
+        logger.info(f"🔧 Worker PID: {worker_pid}, Hostname: {hostname}")
+        
+        # ========================================================================
+        # CACHE STATE DIAGNOSTICS
+        # Check if caches were populated by startup warm-up
+        # ========================================================================
+        jwks_cache_state = get_jwks_cache_state()
+        graph_cache_state = get_graph_token_cache_state()
+        site_cache_state = get_site_id_cache_state()
+        index_state = get_verification_index_state()
+        guard_state = get_verification_guard_state()
+        
+        logger.info("📦 CACHE STATE AT REQUEST START:")
+        logger.info(f"   JWKS cache: present={jwks_cache_state['present']}, source={jwks_cache_state.get('source', 'N/A')}, age={jwks_cache_state['age_s']:.0f}s, expired={jwks_cache_state['expired']}")
+        logger.info(f"   Graph token cache: present={graph_cache_state['present']}, source={graph_cache_state.get('source', 'N/A')}, age={graph_cache_state['age_s']:.0f}s, expired={graph_cache_state['expired']}")
+        logger.info(f"   Site ID cache: present={site_cache_state['present']}, source={site_cache_state.get('source', 'N/A')}, age={site_cache_state['age_s']:.0f}s")
+        logger.info(f"   Verification index: present={index_state['present']}, source={index_state['source'] or 'N/A'}, emails={index_state['email_count']}, sync_age={index_state['sync_age_s']:.0f}s, stale={index_state['stale']}")
+        logger.info(f"   Verification result cache: size={guard_state['result_cache']['size']}, hits={guard_state['result_cache']['hits']}, rate_limited(email/ip)={guard_state['email_limiter']['limited']}/{guard_state['ip_limiter']['limited']}")
     
     try:
         # Parse the custom extension request payload
@@ -898,22 +1084,17 @@ def verify_resident_signup():
         request_correlation['tenant_id'] = data.get('tenantId', 'N/A')[:20]
         
         # Log correlation info
-        logger.info(f"📋 Event type: {request_correlation['event_type']}")
-        logger.info(f"📋 Extension ID: {request_correlation['extension_id']}...")
-        logger.info(f"📋 Listener ID: {request_correlation['listener_id']}...")
-        logger.info(f"📋 Tenant ID: {request_correlation['tenant_id']}...")
-        logger.info(f"📋 Incoming @odata.type: {data.get('@odata.type', 'N/A')}")
-        logger.info(f"⏱️ Request parsing: {parsing_elapsed_ms:.1f}ms")
-        event_type = request_data.get('type', 'unknown')
-        logger.info(f"📋 Event type: {event_type}")
+        log_kv(logger, logging.INFO, "📋 REQUEST",
+               event_type=request_correlation['event_type'],
+               extension_id=request_correlation['extension_id'],
+               listener_id=request_correlation['listener_id'],
+               tenant_id=request_correlation['tenant_id'],
+               odata_type=data.get('@odata.type', 'N/A'),
+               parsing_ms=parsing_elapsed_ms)
         
         # Log data structure if present
-        data = request_data.get('data', {})
-        if data:
+        if data and diagnostics_enabled(logger, 'verify.request'):
             logger.info(f"📋 Data payload keys: {list(data.keys())}")
-            logger.info(f"📋 Incoming @odata.type: {data.get('@odata.type', 'N/A')}")
-            logger.info(f"📋 Tenant ID: {data.get('tenantId', 'N/A')[:20]}...")
-            logger.info(f"📋 Extension ID: {data.get('customAuthenticationExtensionId', 'N/A')[:20]}...")
         
         # Parse attributes from the custom extension payload
         parsed_attrs = parse_custom_extension_request(request_data)
@@ -936,10 +1117,8 @@ def verify_resident_signup():
         last_name = parsed_attrs.get('surname', '')
         date_of_birth = parsed_attrs.get('date_of_birth', '')
         
-        logger.info(f"👤 User data received:")
-        logger.info(f"   Email: {email}")
-        logger.info(f"   Name: {first_name} {last_name}")
-        logger.info(f"   DOB: {'***' if date_of_birth else 'missing'}")
+        log_kv(logger, logging.INFO, "👤 User data received",
+               email=email, name=f"{first_name} {last_name}", dob='***' if date_of_birth else 'missing')
         
         # Validate required fields
         missing_fields = []
@@ -964,23 +1143,72 @@ def verify_resident_signup():
             logger.info(f"⚠️ SUMMARY: wall_clock={wall_clock_ms:.0f}ms | first_request={is_first_request} | verification_result=error_missing_fields | diagnostic_error=false | status=error_missing_fields")
             return jsonify(error_response), 200
         
+        # ========================================================================
+        # RETRY CACHE AND RATE LIMITS
+        # Retries of the same details are answered from the short-lived result
+        # cache; new attempts spend a token per email and per end-user IP
+        # (Entra calls us from its own servers, so the IP comes from the payload)
+        # ========================================================================
+        result_key = verification_result_key(email, first_name, last_name, date_of_birth)
+        cached_result = get_cached_verification_result(result_key)
+        
+        if cached_result is None:
+            # Either object may be present but null in the payload
+            client_ip = ((data.get('authenticationContext') or {}).get('client') or {}).get('ip')
+            limited_by = check_verification_rate_limits(email, client_ip)
+            if limited_by:
+                error_response = build_validation_error_response(
+                    "Too many verification attempts. Please wait a minute and try again."
+                )
+                validate_response_schema(error_response, diagnostic_mode=True)
+                
+                wall_clock_ms = (time.time() - request_start_time) * 1000
+                logger.info(f"⚠️ SUMMARY: wall_clock={wall_clock_ms:.0f}ms | first_request={is_first_request} | verification_result=rate_limited_{limited_by} | diagnostic_error=false | status=rate_limited")
+                return jsonify(error_response), 200
+        
         # ========================================================================
         # SHAREPOINT VERIFICATION WITH COMPREHENSIVE DIAGNOSTICS
         # ========================================================================
         
         logger.info("="*80)
-        logger.info("🔍 Starting SharePoint resident verification")
+        logger.info(f"🔍 Starting resident verification (sources={','.join(VERIFICATION_SOURCES)})")
         logger.info(f"   Looking for: {first_name} {last_name} ({email})")
         logger.info("="*80)
         
         try:
-            # Call SharePoint verification (returns timings)
-            verification_result = verify_resident_sharepoint(
-                email=email,
-                first_name=first_name,
-                last_name=last_name,
-                date_of_birth=date_of_birth
-            )
+            if cached_result is not None:
+                logger.info(f"✅ Verification result cache HIT (verified={cached_result['verified']}) - skipping SharePoint")
+                verification_result = cached_result
+            else:
+                # Verify against the configured sources (returns timings) within the remaining request budget
+                deadline = Deadline(VERIFY_REQUEST_BUDGET_MS, start=request_start_time)
+                verification_result = verify_resident(
+                    email=email,
+                    first_name=first_name,
+                    last_name=last_name,
+                    date_of_birth=date_of_birth,
+                    deadline=deadline
+                )
+                log_kv(logger, logging.INFO, "⏳ BUDGET", **deadline.metrics())
+                store_verification_result(result_key, verification_result)
+            
+            if verification_result.get('deadline_exceeded'):
+                # Answer before Entra times out the extension call
+                logger.warning(f"⏳ Verification budget exhausted (stage={deadline.exceeded_stage or 'unknown'}) - returning {VERIFY_DEADLINE_RESPONSE} response")
+                if VERIFY_DEADLINE_RESPONSE == 'validation':
+                    error_response = build_validation_error_response(
+                        "We couldn't verify your information right now. Please try again in a moment."
+                    )
+                else:
+                    error_response = build_block_page_response(
+                        "Our verification service is temporarily unavailable. Please try again later."
+                    )
+                validate_response_schema(error_response, diagnostic_mode=True)
+                
+                wall_clock_ms = (time.time() - request_start_time) * 1000
+                logger.info(f"⚠️ SUMMARY: wall_clock={wall_clock_ms:.0f}ms | first_request={is_first_request} | verification_result=deadline_exceeded | diagnostic_error=false | status=deadline_exceeded")
+                logger.info("="*80)
+                return jsonify(error_response), 200
             
             # ============================================================
             # SAFE DIAGNOSTIC LOGGING - MUST NOT BREAK VERIFICATION FLOW
@@ -989,8 +1217,9 @@ def verify_resident_signup():
             try:
                 # Extract timings
                 sp_timings = verification_result.get('timings', {})
-                logger.info("⏱️ SharePoint timing breakdown:")
-                safe_log_timings_dict(sp_timings, prefix="   ")
+                if diagnostics_enabled(logger, 'verify.timings'):
+                    logger.info("⏱️ SharePoint timing breakdown:")
+                    safe_log_timings_dict(sp_timings, prefix="   ")
             except Exception as diagnostic_ex:
                 diagnostic_error = True
                 logger.error(f"❌ Diagnostics error (non-fatal): {diagnostic_ex}", exc_info=True)
@@ -1012,14 +1241,11 @@ def verify_resident_signup():
                 response_build_ms = (time.time() - response_build_start) * 1000
                 
                 logger.info(f"✅ Response object created: {response_build_ms:.3f}ms")
-                logger.info(f"   Type: {type(success_response)}")
-                logger.info(f"   Keys: {list(success_response.keys())}")
                 
                 # ========================================================
                 # VALIDATE RESPONSE SCHEMA (DIAGNOSTIC)
                 # ========================================================
                 # Catches schema regressions before Entra rejects with error 1003003
-                logger.info("🔍 Validating response schema...")
                 validation_result = validate_response_schema(success_response, diagnostic_mode=True)
                 if not validation_result['valid']:
                     logger.error(f"❌ RESPONSE SCHEMA INVALID - This will cause Entra error 1003003!")
@@ -1027,13 +1253,14 @@ def verify_resident_signup():
                 else:
                     logger.info("✅ Response schema is valid")
                 
-                # Log OData types for comparison
-                logger.info(f"📋 Outgoing @odata.type (data): {success_response.get('data', {}).get('@odata.type', 'N/A')}")
-                logger.info(f"📋 Outgoing @odata.type (action): {success_response.get('data', {}).get('actions', [{}])[0].get('@odata.type', 'N/A')}")
-                
-                # Pretty-print the response structure
-                logger.info(f"📤 Response payload to External ID:")
-                logger.info(f"{json.dumps(success_response, indent=2)}")
+                if diagnostics_enabled(logger, 'verify.payload'):
+                    # Log OData types for comparison
+                    logger.info(f"📋 Outgoing @odata.type (data): {success_response.get('data', {}).get('@odata.type', 'N/A')}")
+                    logger.info(f"📋 Outgoing @odata.type (action): {success_response.get('data', {}).get('actions', [{}])[0].get('@odata.type', 'N/A')}")
+                    
+                    # Pretty-print the response structure
+                    logger.info(f"📤 Response payload to External ID:")
+                    logger.info(f"{json.dumps(success_response, indent=2)}")
                 
                 # Create Flask response - THIS IS THE CRITICAL SERIALIZATION STEP
                 logger.info("🔨 Creating Flask response with jsonify...")
@@ -1044,29 +1271,25 @@ def verify_resident_signup():
                     flask_response_ms = (time.time() - flask_response_start) * 1000
                     
                     logger.info(f"✅ Flask response created: {flask_response_ms:.3f}ms")
-                    logger.info(f"   Response type: {type(flask_response)}")
-                    logger.info(f"   Status code: 200")
-                    logger.info(f"   Content-Type: {flask_response.content_type}")
                     
                     # ========================================================
                     # CRITICAL: Get the EXACT serialized response body
                     # ========================================================
-                    response_data = flask_response.get_data(as_text=True)
                     response_bytes = flask_response.get_data(as_text=False)
                     
                     # Calculate SHA-256 hash for comparison
                     response_hash = hashlib.sha256(response_bytes).hexdigest()
-                    
-                    logger.info(f"📡 ACTUAL DATA being sent to External ID:")
-                    logger.info(f"{response_data}")
-                    logger.info(f"")
                     logger.info(f"🔐 Response SHA-256 hash: {response_hash}")
-                    logger.info(f"📏 Response size: {len(response_bytes)} bytes")
                     
-                    # Log response headers
-                    logger.info(f"📋 Response headers:")
-                    for header, value in flask_response.headers:
-                        logger.info(f"   {header}: {value}")
+                    if diagnostics_enabled(logger, 'verify.payload'):
+                        logger.info(f"📡 ACTUAL DATA being sent to External ID:")
+                        logger.info(f"{flask_response.get_data(as_text=True)}")
+                        logger.info(f"📏 Response size: {len(response_bytes)} bytes")
+                        
+                        # Log response headers
+                        logger.info(f"📋 Response headers:")
+                        for header, value in flask_response.headers:
+                            logger.info(f"   {header}: {value}")
                     
                     # ========================================================
                     # COMPREHENSIVE TIMING BREAKDOWN WITH CACHE HIT TRACKING
@@ -1078,28 +1301,28 @@ def verify_resident_signup():
                         # Get token validation metrics from decorator
                         entra_metrics = getattr(request, 'entra_metrics', {})
                         
-                        logger.info(f"")
-                        logger.info(f"⏱️ TIMING BREAKDOWN:")
-                        logger.info(f"   Token validation: {entra_metrics.get('total_validation_ms', 0):.1f}ms")
-                        logger.info(f"      - Header parse: {entra_metrics.get('header_parse_ms', 0):.1f}ms")
-                        logger.info(f"      - JWKS fetch: {entra_metrics.get('jwks_fetch_ms', 0):.1f}ms (cache={'HIT' if entra_metrics.get('jwks_cache_hit') else 'MISS'})")
-                        if entra_metrics.get('jwks_cache_hit'):
-                            logger.info(f"         * JWKS cache age: {entra_metrics.get('jwks_cache_age_s', 0):.0f}s, TTL: {entra_metrics.get('jwks_ttl_remaining_s', 0):.0f}s")
-                        logger.info(f"      - Key lookup: {entra_metrics.get('key_lookup_ms', 0):.1f}ms (cache={'HIT' if entra_metrics.get('key_cache_hit') else 'MISS'})")
-                        if not entra_metrics.get('key_cache_hit'):
-                            logger.info(f"         * Key construction: {entra_metrics.get('key_construction_ms', 0):.1f}ms")
-                        logger.info(f"      - Signature verify: {entra_metrics.get('signature_verify_ms', 0):.1f}ms")
-                        logger.info(f"   Request parsing: {parsing_elapsed_ms:.1f}ms")
-                        logger.info(f"   SharePoint token: {sp_timings.get('token_acquisition_ms', 0):.1f}ms (cache={'HIT' if sp_timings.get('graph_token_cache_hit') else 'MISS'})")
-                        if sp_timings.get('graph_token_cache_hit'):
-                            logger.info(f"      - Token cache age: {sp_timings.get('token_cache_age_s', 0):.0f}s, TTL remaining: {sp_timings.get('token_ttl_remaining_s', 0):.0f}s")
-                        logger.info(f"   Site resolution: {sp_timings.get('site_resolution_ms', 0):.1f}ms (cache={'HIT' if sp_timings.get('site_id_cache_hit') else 'MISS'})")
-                        if sp_timings.get('site_id_cache_hit'):
-                            logger.info(f"      - Site cache age: {sp_timings.get('site_cache_age_s', 0):.0f}s")
-                        logger.info(f"   List query: {sp_timings.get('list_query_ms', 0):.1f}ms")
-                        logger.info(f"   Response building: {response_build_ms:.1f}ms")
-                        logger.info(f"   Response serialization: {flask_response_ms:.1f}ms")
-                        logger.info(f"   TRUE WALL-CLOCK TOTAL: {wall_clock_ms:.1f}ms (includes decorator overhead)")
+                        if diagnostics_enabled(logger, 'verify.timings'):
+                            logger.info(f"⏱️ TIMING BREAKDOWN:")
+                            logger.info(f"   Token validation: {entra_metrics.get('total_validation_ms', 0):.1f}ms (token_cache={'HIT' if entra_metrics.get('token_cache_hit') else 'MISS'}, hits={entra_metrics.get('token_cache_hits', 0)}, misses={entra_metrics.get('token_cache_misses', 0)})")
+                            logger.info(f"      - Header parse: {entra_metrics.get('header_parse_ms', 0):.1f}ms")
+                            logger.info(f"      - JWKS fetch: {entra_metrics.get('jwks_fetch_ms', 0):.1f}ms (cache={'HIT' if entra_metrics.get('jwks_cache_hit') else 'MISS'})")
+                            if entra_metrics.get('jwks_cache_hit'):
+                                logger.info(f"         * JWKS cache age: {entra_metrics.get('jwks_cache_age_s', 0):.0f}s, TTL: {entra_metrics.get('jwks_ttl_remaining_s', 0):.0f}s")
+                            logger.info(f"      - Key lookup: {entra_metrics.get('key_lookup_ms', 0):.1f}ms (cache={'HIT' if entra_metrics.get('key_cache_hit') else 'MISS'})")
+                            if not entra_metrics.get('key_cache_hit'):
+                                logger.info(f"         * Key construction: {entra_metrics.get('key_construction_ms', 0):.1f}ms")
+                            logger.info(f"      - Signature verify: {entra_metrics.get('signature_verify_ms', 0):.1f}ms")
+                            logger.info(f"   Request parsing: {parsing_elapsed_ms:.1f}ms")
+                            logger.info(f"   SharePoint token: {sp_timings.get('token_acquisition_ms', 0):.1f}ms (cache={'HIT' if sp_timings.get('graph_token_cache_hit') else 'MISS'})")
+                            if sp_timings.get('graph_token_cache_hit'):
+                                logger.info(f"      - Token cache age: {sp_timings.get('token_cache_age_s', 0):.0f}s, TTL remaining: {sp_timings.get('token_ttl_remaining_s', 0):.0f}s")
+                            logger.info(f"   Site resolution: {sp_timings.get('site_resolution_ms', 0):.1f}ms (cache={'HIT' if sp_timings.get('site_id_cache_hit') else 'MISS'})")
+                            if sp_timings.get('site_id_cache_hit'):
+                                logger.info(f"      - Site cache age: {sp_timings.get('site_cache_age_s', 0):.0f}s")
+                            logger.info(f"   List query: {sp_timings.get('list_query_ms', 0):.1f}ms")
+                            logger.info(f"   Response building: {response_build_ms:.1f}ms")
+                            logger.info(f"   Response serialization: {flask_response_ms:.1f}ms")
+                            logger.info(f"   TRUE WALL-CLOCK TOTAL: {wall_clock_ms:.1f}ms (includes decorator overhead)")
                     except Exception as timing_ex:
                         diagnostic_error = True
                         logger.error(f"❌ Timing breakdown diagnostics failed (non-fatal): {timing_ex}", exc_info=True)
@@ -1109,26 +1332,25 @@ def verify_resident_signup():
                     # WRAPPED IN TRY-EXCEPT TO PREVENT DIAGNOSTIC EXCEPTIONS
                     # ========================================================
                     try:
-                        summary = (
-                            f"📊 SUMMARY: "
-                            f"wall_clock={wall_clock_ms:.0f}ms | "
-                            f"token_validation={entra_metrics.get('total_validation_ms', 0):.0f}ms | "
-                            f"jwks_cache={'HIT' if entra_metrics.get('jwks_cache_hit') else 'MISS'} | "
-                            f"key_cache={'HIT' if entra_metrics.get('key_cache_hit') else 'MISS'} | "
-                            f"signature_verify={entra_metrics.get('signature_verify_ms', 0):.0f}ms | "
-                            f"graph_token={sp_timings.get('token_acquisition_ms', 0):.0f}ms | "
-                            f"graph_token_cache={'HIT' if sp_timings.get('graph_token_cache_hit') else 'MISS'} | "
-                            f"site_resolution={sp_timings.get('site_resolution_ms', 0):.0f}ms | "
-                            f"site_id_cache={'HIT' if sp_timings.get('site_id_cache_hit') else 'MISS'} | "
-                            f"list_query={sp_timings.get('list_query_ms', 0):.0f}ms | "
-                            f"sharepoint_total={sp_timings.get('total_verification_ms', 0):.0f}ms | "
-                            f"first_request={is_first_request} | "
-                            f"verification_result=success | "
-                            f"diagnostic_error={diagnostic_error} | "
-                            f"status=success | "
-                            f"hash={response_hash[:16]}..."
-                        )
-                        logger.info(summary)
+                        log_kv(logger, logging.INFO, "📊 SUMMARY",
+                               wall_clock_ms=wall_clock_ms,
+                               token_validation_ms=entra_metrics.get('total_validation_ms', 0),
+                               token_cache='HIT' if entra_metrics.get('token_cache_hit') else 'MISS',
+                               jwks_cache='HIT' if entra_metrics.get('jwks_cache_hit') else 'MISS',
+                               key_cache='HIT' if entra_metrics.get('key_cache_hit') else 'MISS',
+                               signature_verify_ms=entra_metrics.get('signature_verify_ms', 0),
+                               graph_token_ms=sp_timings.get('token_acquisition_ms', 0),
+                               graph_token_cache='HIT' if sp_timings.get('graph_token_cache_hit') else 'MISS',
+                               site_resolution_ms=sp_timings.get('site_resolution_ms', 0),
+                               site_id_cache='HIT' if sp_timings.get('site_id_cache_hit') else 'MISS',
+                               list_query_ms=sp_timings.get('list_query_ms', 0),
+                               sharepoint_total_ms=sp_timings.get('total_verification_ms', 0),
+                               verification_source=verification_result.get('source', 'cache'),
+                               first_request=is_first_request,
+                               verification_result='success',
+                               diagnostic_error=diagnostic_error,
+                               status='success',
+                               hash=f"{response_hash[:16]}...")
                     except Exception as summary_ex:
                         diagnostic_error = True
                         logger.error(f"❌ Summary logging failed (non-fatal): {summary_ex}", exc_info=True)
@@ -1161,20 +1383,15 @@ def verify_resident_signup():
                     elif 'name' in reason.lower():
                         error_message = "The name doesn't match our records. Please verify your first and last name."
                 
-                logger.info("🔨 Building validation error response...")
                 error_response = build_validation_error_response(error_message)
                 
                 # Validate schema before returning
-                logger.info("🔍 Validating error response schema...")
                 validation_result = validate_response_schema(error_response, diagnostic_mode=True)
                 
-                logger.info(f"📤 Validation error response payload:")
-                logger.info(f"{json.dumps(error_response, indent=2)}")
-                
-                logger.info("🔨 Creating Flask error response...")
                 flask_response = jsonify(error_response)
-                logger.info(f"📡 Actual error data being sent:")
-                logger.info(f"{flask_response.get_data(as_text=True)}")
+                if diagnostics_enabled(logger, 'verify.payload'):
+                    logger.info(f"📡 Actual error data being sent:")
+                    logger.info(f"{flask_response.get_data(as_text=True)}")
                 
                 wall_clock_ms = (time.time() - request_start_time) * 1000
                 logger.info(f"⚠️ SUMMARY: wall_clock={wall_clock_ms:.0f}ms | first_request={is_first_request} | verification_result=failed | diagnostic_error={diagnostic_error} | status=verification_failed")
@@ -1187,22 +1404,17 @@ def verify_resident_signup():
             logger.error(f"❌ SharePoint verification service error: {verify_error}", exc_info=True)
             
             # Return block page for service errors
-            logger.info("🔨 Building block page response (service error)...")
             error_response = build_block_page_response(
                 "Our verification service is temporarily unavailable. Please try again later."
             )
             
             # Validate schema before returning
-            logger.info("🔍 Validating block page response schema...")
             validation_result = validate_response_schema(error_response, diagnostic_mode=True)
             
-            logger.info(f"📤 Block page response payload:")
-            logger.info(f"{json.dumps(error_response, indent=2)}")
-            
-            logger.info("🔨 Creating Flask block response...")
             flask_response = jsonify(error_response)
-            logger.info(f"📡 Actual block page data being sent:")
-            logger.info(f"{flask_response.get_data(as_text=True)}")
+            if diagnostics_enabled(logger, 'verify.payload'):
+                logger.info(f"📡 Actual block page data being sent:")
+                logger.info(f"{flask_response.get_data(as_text=True)}")
             
             wall_clock_ms = (time.time() - request_start_time) * 1000
             logger.info(f"⚠️ SUMMARY: wall_clock={wall_clock_ms:.0f}ms | first_request={is_first_request} | verification_result=service_error | diagnostic_error=false | status=service_error")
@@ -1214,21 +1426,17 @@ def verify_resident_signup():
         # Catch-all for unexpected errors
         logger.error(f"❌ Unexpected error in verification endpoint: {e}", exc_info=True)
         
-        logger.info("🔨 Building block page response (unexpected error)...")
         error_response = build_block_page_response(
             "Service temporarily unavailable. Please try again later."
         )
         
         # Validate schema before returning
-        logger.info("🔍 Validating block page response schema...")
         validation_result = validate_response_schema(error_response, diagnostic_mode=True)
         
-        logger.info(f"📤 Block page response payload:")
-        logger.info(f"{json.dumps(error_response, indent=2)}")
-        
         flask_response = jsonify(error_response)
-        logger.info(f"📡 Actual data being sent:")
-        logger.info(f"{flask_response.get_data(as_text=True)}")
+        if diagnostics_enabled(logger, 'verify.payload'):
+            logger.info(f"📡 Actual data being sent:")
+            logger.info(f"{flask_response.get_data(as_text=True)}")
         
         wall_clock_ms = (time.time() - request_start_time) * 1000
         logger.info(f"⚠️ SUMMARY: wall_clock={wall_clock_ms:.0f}ms | first_request={is_first_request} | verification_result=unexpected_error | diagnostic_error=false | status=unexpected_error")
@@ -1259,6 +1467,22 @@ def health_check():
     return {'status': 'ok'}, 200
 
 
+@app.route('/ready')
+def readiness_check():
+    """
+    Readiness endpoint for the load balancer / App Service health check.
+    Returns 200 only when the registered caches (JWKS, Graph token, site ID,
+    verification index, warmed resident snapshots) are warm and fresh, 503 otherwise.
+    Reads in-memory cache state only - never calls Graph or Entra.
+    """
+    readiness = evaluate_readiness()
+    return {
+        'status': 'ready' if readiness['ready'] else 'not_ready',
+        'checks': readiness['checks'],
+        'warmup': readiness['warmup']
+    }, 200 if readiness['ready'] else 503
+
+
 @app.route('/debug-ping')
 def debug_ping():
     """
@@ -1382,7 +1606,7 @@ def handle_unexpected_error(error):
 def log_request_info():
     """Log all incoming requests for debugging"""
     # Skip heavy startup logging for health/debug endpoints to prevent timeout
-    if request.path not in ['/health', '/debug-ping']:
+    if request.path not in ['/health', '/ready', '/debug-ping']:
         # Flask 3.x compatible: Call first-request handler here instead of @before_first_request
         log_application_startup()
     
@@ -1607,7 +1831,8 @@ def resident_dashboard():
     return render_template('resident/dashboard.html', 
                           resident=resident,
                           current_cycle=current_cycle,
-                          next_run_date=next_run_date)
+                          next_run_date=next_run_date,
+                          data_generation=get_resident_data_generation('test'))
 
 
 @app.route('/resident/enroll', methods=['GET', 'POST'])
@@ -1637,6 +1862,8 @@ def resident_enroll():
                 'action': 'enrolled',
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             })
+            refresh_payment_views(resident)
+            invalidate_resident_snapshot('test')
             
             flash('Enrollment successful! Your rent payments will now be reported.', 'success')
             return redirect(url_for('resident_enroll_success'))
@@ -1690,6 +1917,8 @@ def resident_opt_out():
             'action': 'revoked consent',
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         })
+        refresh_payment_views(resident)
+        invalidate_resident_snapshot('test')
         
         flash('You have successfully opted out. Future rent payments will not be reported.', 'info')
         return redirect(url_for('resident_rent_reporting'))
@@ -1704,102 +1933,36 @@ def resident_opt_out():
 def admin_dashboard():
     data_source = request.args.get('data_source', 'credhub')  # Default to 'credhub', also supports 'test', 'sharepoint'
     
-    # Load data based on selected source
-    if data_source == 'sharepoint':
-        # Load from SharePoint List (Credit Boost - Tenants)
-        source_residents = load_residents_from_sharepoint_list()
-        if not source_residents:
-            flash('Failed to load SharePoint data. Falling back to test data.', 'warning')
-            source_residents = residents
-    elif data_source == 'credhub':
-        # Load from CredHub SharePoint Lists
-        source_residents = load_residents_from_credhub_lists()
-        if not source_residents:
-            flash('Failed to load CredHub data. Falling back to test data.', 'warning')
-            source_residents = residents
-    else:
-        # Use test data
-        source_residents = residents
-    
-    # Calculate statistics from resident data
-    total_residents = len(source_residents)
-    enrolled_residents = [r for r in source_residents if r.get('enrolled', False)]
-    
-    # Active leases - residents with active status
-    active_leases = [r for r in source_residents if r.get('resident_status', '').lower() in ['active', 'current', ''] or r.get('enrollment_status') == 'enrolled']
-    
-    # Reporting this cycle - enrolled residents who are set to report
-    reporting_this_cycle = [r for r in source_residents if r.get('enrolled', False) and r.get('tradeline_created', False)]
-    
-    # Account status breakdowns
-    current_accounts = [r for r in source_residents if r.get('account_status', '') == 'Current']
-    
-    # Delinquent 30-89 days (early stage)
-    delinquent_30_89 = [r for r in source_residents if r.get('days_late', 0) >= 30 and r.get('days_late', 0) < 90]
-    
-    # Severely delinquent 90+ days
-    delinquent_90_plus = [r for r in source_residents if r.get('days_late', 0) >= 90]
-    
-    # Calculate total outstanding balance
-    total_outstanding = sum(r.get('total_balance', 0) if r.get('total_balance', 0) > 0 else r.get('amount_past_due', 0) for r in source_residents)
-    
-    # Diagnostic logging for outstanding balances
-    residents_with_balance = [r for r in source_residents if r.get('total_balance', 0) > 0]
-    if residents_with_balance:
-        logger.info(f"📊 OUTSTANDING BALANCE BREAKDOWN (Data Source: {data_source}):")
-        logger.info(f"   Total Outstanding: ${total_outstanding:,.2f}")
-        logger.info(f"   Residents with balance: {len(residents_with_balance)}")
-        for r in residents_with_balance[:10]:  # Log first 10
-            logger.info(f"      {r.get('name', 'Unknown')}: ${r.get('total_balance', 0):,.2f} (days_late={r.get('days_late', 0)})")
-        if len(residents_with_balance) > 10:
-            logger.info(f"      ... and {len(residents_with_balance) - 10} more")
-    
-    # Calculate average days late (only for delinquent accounts)
-    delinquent_with_days = [r.get('days_late', 0) for r in source_residents if r.get('days_late', 0) > 0]
-    avg_days_late = sum(delinquent_with_days) / len(delinquent_with_days) if delinquent_with_days else 0
-    
-    # Monthly revenue potential
-    total_monthly_revenue = sum(r.get('scheduled_monthly_payment', 0) for r in source_residents)
-    
-    # Total last payment amounts
-    total_last_payments = sum(r.get('last_payment_amount', 0) for r in source_residents)
-    
-    # Collection rate - calculate based on expected vs collected
-    expected_revenue = total_monthly_revenue
-    collection_rate = (total_last_payments / expected_revenue * 100) if expected_revenue > 0 else 0
-    
-    # Aging bucket details
-    aged_30_59_residents = [r for r in source_residents if r.get('aged_30_59', 0) > 0 or (r.get('days_late', 0) >= 30 and r.get('days_late', 0) < 60)]
-    aged_30_59_amount = sum(r.get('aged_30_59', 0) if r.get('aged_30_59', 0) > 0 else r.get('amount_past_due', 0) for r in aged_30_59_residents)
-    
-    aged_60_89_residents = [r for r in source_residents if r.get('aged_60_89', 0) > 0 or (r.get('days_late', 0) >= 60 and r.get('days_late', 0) < 90)]
-    aged_60_89_amount = sum(r.get('aged_60_89', 0) if r.get('aged_60_89', 0) > 0 else r.get('amount_past_due', 0) for r in aged_60_89_residents)
-    
-    aged_90_plus_residents = [r for r in source_residents if r.get('aged_90_plus', 0) > 0 or r.get('days_late', 0) >= 90]
-    aged_90_plus_amount = sum(r.get('aged_90_plus', 0) if r.get('aged_90_plus', 0) > 0 else r.get('amount_past_due', 0) for r in aged_90_plus_residents)
-    
-    stats = {
-        'total_residents': total_residents,
-        'enrolled_count': len(enrolled_residents),
-        'active_leases': len(active_leases),
-        'reporting_this_cycle': len(reporting_this_cycle),
-        'current_accounts': len(current_accounts),
-        'delinquent_30_89': len(delinquent_30_89),
-        'delinquent_90_plus': len(delinquent_90_plus),
-        'total_outstanding': total_outstanding,
-        'avg_days_late': round(avg_days_late, 1),
-        'total_monthly_revenue': total_monthly_revenue,
-        'total_last_payments': total_last_payments,
-        'collection_rate': round(collection_rate, 1),
-        # Aging details
-        'aged_30_59_count': len(aged_30_59_residents),
-        'aged_30_59_amount': aged_30_59_amount,
-        'aged_60_89_count': len(aged_60_89_residents),
-        'aged_60_89_amount': aged_60_89_amount,
-        'aged_90_plus_count': len(aged_90_plus_residents),
-        'aged_90_plus_amount': aged_90_plus_amount,
-    }
-    return render_template('admin/dashboard.html', residents=source_residents, stats=stats, data_source=data_source)
+    # Load data based on selected source (served from the snapshot cache)
+    snapshot, fell_back = get_admin_snapshot(data_source)
+    if fell_back:
+        flash(f"Failed to load {'SharePoint' if data_source == 'sharepoint' else 'CredHub'} data. Falling back to test data.", 'warning')
+    
+    # Statistics are precomputed when the snapshot is built
+    return render_template('admin/dashboard.html', residents=snapshot['residents'], stats=snapshot['stats'], data_source=data_source)
+
+
+@app.route('/admin/properties')
+@require_admin
+def admin_properties():
+    data_source = request.args.get('data_source', 'credhub')  # 'test', 'sharepoint', or 'credhub'
+    selected_property = request.args.get('property', '')
+    
+    # Per-property roll-ups are precomputed when the snapshot is built
+    snapshot, fell_back = get_admin_snapshot(data_source)
+    if fell_back:
+        flash(f"Failed to load {'SharePoint' if data_source == 'sharepoint' else 'CredHub'} data. Falling back to test data.", 'warning')
+    
+    property_rollup = snapshot['property_rollup']
+    if selected_property not in property_rollup:
+        selected_property = ''
+    
+    return render_template('admin/properties.html',
+                         property_rollup=property_rollup,
+                         selected_property=selected_property,
+                         selected_stats=property_rollup.get(selected_property),
+                         month_rollup=snapshot['property_month_rollup'].get(selected_property, []),
+                         data_source=data_source)
 
 
 @app.route('/admin/rent-reporting')
@@ -1808,24 +1971,12 @@ def admin_rent_reporting():
     search_query = request.args.get('search', '').lower()
     data_source = request.args.get('data_source', 'test')  # 'test', 'sharepoint', or 'credhub'
     
-    # Load data based on selected source
-    if data_source == 'sharepoint':
-        # Load from SharePoint List (Credit Boost - Tenants)
-        source_residents = load_residents_from_sharepoint_list()
-        if not source_residents:
-            flash('Failed to load SharePoint data. Falling back to test data.', 'warning')
-            source_residents = residents
-    elif data_source == 'credhub':
-        # Load from CredHub SharePoint Lists
-        source_residents = load_residents_from_credhub_lists()
-        if not source_residents:
-            flash('Failed to load CredHub data. Falling back to test data.', 'warning')
-            source_residents = residents
-    else:
-        # Use test data
-        source_residents = residents
+    # Load data based on selected source (served from the snapshot cache)
+    snapshot, fell_back = get_admin_snapshot(data_source)
+    if fell_back:
+        flash(f"Failed to load {'SharePoint' if data_source == 'sharepoint' else 'CredHub'} data. Falling back to test data.", 'warning')
     
-    filtered_residents = source_residents
+    filtered_residents = snapshot['residents']
     
     # Filter by search query (searches name, property, and unit)
     if search_query:
@@ -1856,7 +2007,8 @@ def admin_rent_reporting():
                           residents=residents_with_info, 
                           current_cycle=current_cycle,
                           next_run_date=next_run_date,
-                          data_source=data_source)
+                          data_source=data_source,
+                          snapshot_version=snapshot['version'])
 
 
 @app.route('/admin/resident/<int:resident_id>')
@@ -1864,35 +2016,20 @@ def admin_rent_reporting():
 def admin_resident_detail(resident_id):
     data_source = request.args.get('data_source', 'test')  # 'test', 'sharepoint', or 'credhub'
     
-    # Load data based on selected source
-    if data_source == 'sharepoint':
-        # Load from SharePoint List (Credit Boost - Tenants)
-        source_residents = load_residents_from_sharepoint_list()
-        if not source_residents:
-            flash('Failed to load SharePoint data. Falling back to test data.', 'warning')
-            source_residents = residents
-    elif data_source == 'credhub':
-        # Load from CredHub SharePoint Lists
-        source_residents = load_residents_from_credhub_lists()
-        if not source_residents:
-            flash('Failed to load CredHub data. Falling back to test data.', 'warning')
-            source_residents = residents
-    else:
-        # Use test data
-        source_residents = residents
+    # Load data based on selected source (served from the snapshot cache)
+    snapshot, fell_back = get_admin_snapshot(data_source)
+    if fell_back:
+        flash(f"Failed to load {'SharePoint' if data_source == 'sharepoint' else 'CredHub'} data. Falling back to test data.", 'warning')
     
     # Find the specific resident
-    resident = None
-    for r in source_residents:
-        if r['id'] == resident_id:
-            resident = r
-            break
+    resident = snapshot['residents_by_id'].get(resident_id)
     
     if not resident:
         flash('Resident not found', 'danger')
         return redirect(url_for('admin_rent_reporting', data_source=data_source))
     
-    return render_template('admin/resident_detail.html', resident=resident, data_source=data_source)
+    return render_template('admin/resident_detail.html', resident=resident, data_source=data_source,
+                          snapshot_version=snapshot['version'])
 
 
 @app.route('/admin/resident/<int:resident_id>/data-mismatch', methods=['GET', 'POST'])
@@ -1947,6 +2084,7 @@ def admin_payment_issue(resident_id):
             for payment in resident['payments']:
                 if payment['month'] == month:
                     payment['status'] = new_status
+                    invalidate_resident_snapshot('test')
                     flash(f'Payment status for {month} updated to {new_status}.', 'success')
                     break
         elif action == 'confirm':
@@ -2101,6 +2239,233 @@ def admin_error_correction():
     """
     return render_template('admin/error_correction.html')
 
+# ============= ADMIN STATS API ENDPOINTS =============
+
+def snapshot_json_response(snapshot, resource, build_payload):
+    """
+    Serve a JSON payload derived from a resident snapshot with ETag support.
+    Answers If-None-Match with 304 so unchanged data costs no serialization.
+
+    Args:
+        snapshot: resident snapshot dict
+        resource: resource name used in the ETag ('stats', 'residents')
+        build_payload: callable returning the JSON-serializable payload
+    """
+    etag = snapshot_etag(snapshot, resource)
+
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = jsonify(build_payload())
+
+    response.set_etag(etag)
+    # Browsers must revalidate every poll so a new snapshot version is picked up immediately
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@app.route('/api/admin/stats', methods=['GET'])
+@require_admin
+def api_admin_stats():
+    """
+    Portfolio statistics from the cached resident snapshot.
+
+    Query parameters:
+    - data_source: 'credhub' (default), 'sharepoint' or 'test'
+
+    Returns:
+    {
+        "dataSource": "credhub",
+        "version": "credhub-1767225600000-3",
+        "loadedAt": "2026-01-01T00:00:00",
+        "fallback": false,
+        "stats": { ...same keys as the admin dashboard... }
+    }
+    """
+    data_source = request.args.get('data_source', 'credhub')
+    snapshot, fell_back = get_admin_snapshot(data_source)
+
+    return snapshot_json_response(snapshot, 'stats', lambda: {
+        'dataSource': snapshot['data_source'],
+        'version': snapshot['version'],
+        'loadedAt': datetime.fromtimestamp(snapshot['loaded_at']).isoformat(),
+        'fallback': fell_back,
+        'stats': snapshot['stats']
+    })
+
+
+@app.route('/api/admin/residents', methods=['GET'])
+@require_admin
+def api_admin_residents():
+    """
+    Resident summary list from the cached resident snapshot.
+    Only non-sensitive summary fields are included (no DOB, SSN or contact details).
+
+    Query parameters:
+    - data_source: 'credhub' (default), 'sharepoint' or 'test'
+
+    Returns:
+    {
+        "dataSource": "credhub",
+        "version": "credhub-1767225600000-3",
+        "count": 1,
+        "residents": [
+            {"id": 1, "name": "Jane Doe", "property": "48 West", "unit": "101",
+             "enrolled": true, "accountStatus": "Current", "daysLate": 0, "balance": 0.0}
+        ]
+    }
+    """
+    data_source = request.args.get('data_source', 'credhub')
+    snapshot, fell_back = get_admin_snapshot(data_source)
+
+    def build_payload():
+        resident_summaries = [
+            {
+                'id': r.get('id'),
+                'name': r.get('name', ''),
+                'property': r.get('property', ''),
+                'unit': r.get('unit', ''),
+                'enrolled': r.get('enrolled', False),
+                'accountStatus': r.get('account_status', ''),
+                'daysLate': r.get('days_late', 0),
+                'balance': r.get('total_balance', r.get('current_balance', 0))
+            }
+            for r in snapshot['residents']
+        ]
+        return {
+            'dataSource': snapshot['data_source'],
+            'version': snapshot['version'],
+            'fallback': fell_back,
+            'count': len(resident_summaries),
+            'residents': resident_summaries
+        }
+
+    return snapshot_json_response(snapshot, 'residents', build_payload)
+
+
+@app.route('/api/admin/properties', methods=['GET'])
+@require_admin
+def api_admin_properties():
+    """
+    Per-property roll-up from the cached resident snapshot.
+
+    Query parameters:
+    - data_source: 'credhub' (default), 'sharepoint' or 'test'
+    - property: optional property name; adds its month-by-month history
+
+    Returns:
+    {
+        "dataSource": "credhub",
+        "version": "credhub-1767225600000-3",
+        "fallback": false,
+        "properties": { "48 West": { ...same keys as /api/admin/stats... } },
+        "property": "48 West",
+        "months": [
+            {"month": "2026-01", "accounts": 40, "late_count": 3, "delinquent_30_89": 2,
+             "delinquent_90_plus": 1, "outstanding": 5230.0, "billed": 48000.0}
+        ]
+    }
+    """
+    data_source = request.args.get('data_source', 'credhub')
+    selected_property = request.args.get('property')
+    snapshot, fell_back = get_admin_snapshot(data_source)
+
+    if selected_property is not None and selected_property not in snapshot['property_rollup']:
+        return jsonify({'error': 'Property not found', 'property': selected_property}), 404
+
+    def build_payload():
+        payload = {
+            'dataSource': snapshot['data_source'],
+            'version': snapshot['version'],
+            'fallback': fell_back,
+            'properties': snapshot['property_rollup']
+        }
+        if selected_property is not None:
+            payload['property'] = selected_property
+            payload['months'] = snapshot['property_month_rollup'].get(selected_property, [])
+        return payload
+
+    resource = 'properties' if selected_property is None else f'properties:{selected_property}'
+    return snapshot_json_response(snapshot, resource, build_payload)
+
+
+@app.route('/api/admin/trends', methods=['GET'])
+@require_admin
+def api_admin_trends():
+    """
+    Month-by-month portfolio delinquency series from the cached resident snapshot.
+    Series are computed once per snapshot version from the full payment history.
+
+    Query parameters:
+    - data_source: 'credhub' (default), 'sharepoint' or 'test'
+    - months: number of most recent months (default and max 24)
+
+    Returns:
+    {
+        "dataSource": "credhub",
+        "version": "credhub-1767225600000-3",
+        "fallback": false,
+        "series": {
+            "months": ["2025-12", "2026-01"],
+            "outstanding": [5230.0, 4810.5],
+            "aged_30_59_count": [4, 3], "aged_30_59_amount": [2100.0, 1500.0],
+            "aged_60_89_count": [1, 2], "aged_60_89_amount": [900.0, 1210.5],
+            "aged_90_plus_count": [1, 1], "aged_90_plus_amount": [2230.0, 2100.0],
+            "collection_rate": [96.2, 97.4]
+        }
+    }
+    """
+    data_source = request.args.get('data_source', 'credhub')
+    months = request.args.get('months', 24, type=int)
+    snapshot, fell_back = get_admin_snapshot(data_source)
+
+    return snapshot_json_response(snapshot, f'trends:{months}', lambda: {
+        'dataSource': snapshot['data_source'],
+        'version': snapshot['version'],
+        'fallback': fell_back,
+        'series': get_snapshot_trend_series(snapshot, months)
+    })
+
+
+@app.route('/api/admin/timings', methods=['GET'])
+@require_admin
+def api_admin_timings():
+    """
+    Per-route timing aggregates collected from the request timing spans
+    (the same spans sent to admins in the Server-Timing header).
+
+    Returns:
+    {
+        "routes": {
+            "admin_dashboard": {
+                "requests": 12, "avg_ms": 84.2, "max_ms": 910.4,
+                "spans": {
+                    "render": {"calls": 12, "avg_per_request_ms": 41.0, "avg_ms": 41.0, "max_ms": 60.2},
+                    "graph_page": {"calls": 6, "avg_per_request_ms": 35.1, "avg_ms": 70.2, "max_ms": 95.0}
+                }
+            }
+        }
+    }
+    """
+    return jsonify({'routes': get_route_timing_stats()})
+
+
+@app.route('/metrics', methods=['GET'])
+@require_admin
+def prometheus_metrics():
+    """
+    Metrics for every gunicorn worker on this instance in Prometheus text format:
+    route latency histograms, Graph calls per list, cache hits/misses and
+    loader durations. Counters and histograms are summed across workers;
+    gauges carry a worker label.
+
+    Example:
+        http_request_duration_seconds_bucket{route="admin_dashboard",method="GET",le="0.25"} 118
+        cache_requests_total{cache="jwks",result="hit"} 5210
+    """
+    return render_metrics(), 200, {'Content-Type': PROMETHEUS_CONTENT_TYPE}
+
+
 # ============= ERROR CORRECTION API ENDPOINTS =============
 
 @app.route('/api/admin/credit-reporting/validation-issues', methods=['GET'])
@@ -2329,6 +2694,7 @@ def export_residents():
         # No filter - export all enrolled residents
         filtered_residents = [r for r in residents if r.get('enrollment_status', '').lower() == 'enrolled' or r.get('enrolled') == True]
     
+    from utils.excel_export import create_resident_list_export  # openpyxl, export routes only
     excel_file = create_resident_list_export(filtered_residents)
     filename = f"residents_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     return send_file(excel_file, as_attachment=True, download_name=filename,
@@ -2345,6 +2711,7 @@ def export_reporting_runs():
         {'id': 'RUN-2026-003', 'date': '2026-01-01', 'type': 'Monthly Metro2', 'status': 'Completed', 'records': 145, 'success_rate': '98.6%', 'notes': '2 payment disputes pending'},
         {'id': 'RUN-2025-012', 'date': '2025-12-01', 'type': 'Monthly Metro2', 'status': 'Completed', 'records': 142, 'success_rate': '99.3%', 'notes': 'Year-end reporting'},
     ]
+    from utils.excel_export import create_reporting_runs_export
     excel_file = create_reporting_runs_export(runs)
     filename = f"reporting_runs_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     return send_file(excel_file, as_attachment=True, download_name=filename,
@@ -2359,6 +2726,7 @@ def export_disputes():
         {'id': 'D-002', 'date': '2026-01-28', 'resident': 'Sarah Johnson - Unit 205', 'issue': 'Late payment dispute', 'status': 'In Progress', 'priority': 'Medium', 'details': 'Payment was made on time but not processed until the 6th'},
         {'id': 'D-003', 'date': '2026-01-15', 'resident': 'Mike Davis - Unit 102', 'issue': 'Payment not reported', 'status': 'Resolved', 'priority': 'High', 'details': 'December payment was not included in monthly report. Added to supplemental file.'},
     ]
+    from utils.excel_export import create_disputes_export
     excel_file = create_disputes_export(disputes)
     filename = f"disputes_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     return send_file(excel_file, as_attachment=True, download_name=filename,
@@ -2373,6 +2741,7 @@ def export_audit_logs():
         {'id': 2, 'timestamp': '2026-01-11 14:30:00', 'user': 'admin', 'action': 'Exported report', 'details': 'Monthly Metro2'},
         {'id': 3, 'timestamp': '2026-01-12 09:15:00', 'user': 'admin', 'action': 'Resolved dispute', 'details': 'D-001'}
     ]
+    from utils.excel_export import create_audit_logs_export
     excel_file = create_audit_logs_export(audit_logs)
     filename = f"audit_logs_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     return send_file(excel_file, as_attachment=True, download_name=filename,
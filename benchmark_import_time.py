@@ -0,0 +1,147 @@
+"""
+Benchmark worker boot: import-time profile of app.py
+
+Imports app in fresh interpreters with -X importtime and reports:
+- app:     median cumulative import time of app.py (module body + everything it imports)
+- process: median wall time of the whole child process (interpreter start + import)
+- the modules app.py imports directly, by median cumulative time
+- whether the heavy optional dependencies (pandas, openpyxl, msal, cryptography
+  Fernet, numpy) were loaded at import - they should only load on first use
+
+Credentials are blanked in the child environment so startup warm-up fails fast
+and the numbers measure imports, not Graph/JWKS round trips.
+
+Save a run and compare later runs against it to track regressions:
+    python benchmark_import_time.py --save import_baseline.json
+    python benchmark_import_time.py --compare import_baseline.json
+
+Usage:
+    python benchmark_import_time.py [runs] [--top N] [--save FILE] [--compare FILE]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+HEAVY_MODULES = ['pandas', 'numpy', 'openpyxl', 'msal', 'cryptography.fernet']
+
+# Warm-up must not reach the network (load_dotenv does not override variables that are set)
+BLANK_ENV = {
+    'AUTH_EXTENSION_TENANT_ID': '',
+    'AZURE_CLIENT_ID': '',
+    'AZURE_CLIENT_SECRET': '',
+    'AZURE_TENANT_ID': '',
+    'WARMUP_SNAPSHOT_SOURCES': '',
+    'SHARED_CACHE_ENABLED': 'false'
+}
+
+# Which heavy modules are loaded is written to a file: app logs share stdout with the child
+CHILD_CODE = (
+    "import sys, json\n"
+    "import app\n"
+    "with open(sys.argv[1], 'w') as out: json.dump({name: name in sys.modules for name in %r}, out)\n" % HEAVY_MODULES
+)
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output (children are printed before their parent,
+    indented two spaces per level)
+
+    Returns:
+        tuple: (app cumulative ms, {module imported directly by app: cumulative ms})
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1000))
+
+    app_index = max(i for i, (depth, module, _) in enumerate(entries) if depth == 0 and module == 'app')
+    direct = {}
+    for depth, module, cumulative_ms in reversed(entries[:app_index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct[module] = cumulative_ms
+    return entries[app_index][2], direct
+
+
+def run_once():
+    env = dict(os.environ, **BLANK_ENV)
+    with tempfile.TemporaryDirectory() as tmp:
+        heavy_path = os.path.join(tmp, 'heavy.json')
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD_CODE, heavy_path],
+                                env=env, capture_output=True, text=True)
+        process_ms = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"import app failed:\n{result.stderr[-2000:]}")
+        with open(heavy_path) as heavy_file:
+            heavy = json.load(heavy_file)
+
+    app_ms, direct = parse_importtime(result.stderr)
+    return app_ms, process_ms, direct, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('runs', nargs='?', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='direct imports to list')
+    parser.add_argument('--save', help='write the results as JSON')
+    parser.add_argument('--compare', help='JSON file from an earlier --save to compare against')
+    args = parser.parse_args()
+
+    app_runs, process_runs, direct_runs = [], [], {}
+    heavy = {}
+    for _ in range(args.runs):
+        app_ms, process_ms, direct, heavy = run_once()
+        app_runs.append(app_ms)
+        process_runs.append(process_ms)
+        for module, ms in direct.items():
+            direct_runs.setdefault(module, []).append(ms)
+
+    results = {
+        'app_ms': statistics.median(app_runs),
+        'process_ms': statistics.median(process_runs),
+        'imports': {module: statistics.median(values) for module, values in direct_runs.items()},
+        'heavy_loaded': heavy
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    def delta(current, previous):
+        return f" ({current - previous:+.1f})" if previous is not None else ''
+
+    print(f"import-time profile of app.py ({args.runs} runs, medians in ms)")
+    print(f"{'app':<40} {results['app_ms']:>8.1f}{delta(results['app_ms'], baseline and baseline['app_ms'])}")
+    print(f"{'process':<40} {results['process_ms']:>8.1f}{delta(results['process_ms'], baseline and baseline['process_ms'])}")
+    print()
+    print(f"{'direct import':<40} {'cum ms':>8}")
+    ranked = sorted(results['imports'].items(), key=lambda item: item[1], reverse=True)
+    for module, ms in ranked[:args.top]:
+        previous = baseline['imports'].get(module, 0.0) if baseline else None
+        print(f"{module:<40} {ms:>8.1f}{delta(ms, previous)}")
+    if baseline:
+        for module in sorted(set(baseline['imports']) - set(results['imports'])):
+            print(f"{module:<40} {'-':>8} (was {baseline['imports'][module]:.1f})")
+    print()
+    print("heavy dependencies loaded at import: " +
+          ", ".join(f"{name}={'yes' if loaded else 'no'}" for name, loaded in heavy.items()))
+
+    if args.save:
+        with open(args.save, 'w') as save_file:
+            json.dump(results, save_file, indent=2, sort_keys=True)
+        print(f"saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark gunicorn worker memory and time-to-first-request with and without pre-fork
+
+Starts gunicorn with gunicorn.conf.py in two modes and reports:
+- ready:   seconds from launch until /health first answers 200
+- workers: seconds from launch until every worker answered a request
+- rss/pss/uss per worker (MB): PSS splits shared pages between processes,
+  USS is memory private to the worker - copy-on-write sharing shows up as a
+  lower USS with preload
+
+Modes:
+- per_worker: every worker imports and warms the app itself (today's default)
+- preload:    GUNICORN_PRELOAD=true - the master warms once and forks workers
+
+Linux only (reads /proc). Warm-up calls to Graph/JWKS fail fast without
+credentials; run with real .env settings for representative numbers.
+
+Usage:
+    python benchmark_prefork.py [workers]
+"""
+import os
+import sys
+import time
+import socket
+import signal
+import subprocess
+import urllib.request
+
+MODES = {
+    'per_worker': {'GUNICORN_PRELOAD': 'false'},
+    'preload': {'GUNICORN_PRELOAD': 'true'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker_pids(master_pid):
+    try:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children') as children:
+            return [int(pid) for pid in children.read().split()]
+    except OSError:
+        return []
+
+
+def memory_mb(pid):
+    """RSS, PSS and USS of a process in MB from smaps_rollup"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':'):
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return values.get('Rss', 0.0), values.get('Pss', 0.0), values.get('Private_Clean', 0.0) + values.get('Private_Dirty', 0.0)
+
+
+def get_health(port, timeout=1.0):
+    """True if /health answered 200"""
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def run_mode(mode, env_overrides, workers):
+    port = free_port()
+    env = dict(os.environ, **env_overrides, PORT=str(port), GUNICORN_WORKERS=str(workers), GUNICORN_THREADS='1')
+    launch = time.perf_counter()
+    master = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '--config', 'gunicorn.conf.py'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        ready_s = None
+        while time.perf_counter() - launch < 120:
+            if get_health(port):
+                ready_s = time.perf_counter() - launch
+                break
+            time.sleep(0.05)
+        if ready_s is None:
+            raise RuntimeError(f"{mode}: gunicorn did not become ready")
+
+        # Every worker has finished booting once it is listed and has been running requests;
+        # with one thread per worker, a burst of concurrent requests reaches all of them
+        all_ready_s = None
+        while time.perf_counter() - launch < 120:
+            pids = worker_pids(master.pid)
+            if len(pids) == workers and all(get_health(port) for _ in range(workers * 4)):
+                all_ready_s = time.perf_counter() - launch
+                break
+            time.sleep(0.05)
+
+        time.sleep(1.0)
+        samples = [memory_mb(pid) for pid in worker_pids(master.pid)]
+        return {
+            'ready_s': ready_s,
+            'workers_s': all_ready_s,
+            'rss': sum(s[0] for s in samples) / len(samples),
+            'pss': sum(s[1] for s in samples) / len(samples),
+            'uss': sum(s[2] for s in samples) / len(samples),
+            'master_rss': memory_mb(master.pid)[0]
+        }
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"gunicorn pre-fork benchmark ({workers} workers)")
+    print(f"{'mode':<12} {'ready':>8} {'workers':>8} {'rss/wkr':>9} {'pss/wkr':>9} {'uss/wkr':>9} {'master':>9}")
+    for mode, env_overrides in MODES.items():
+        r = run_mode(mode, env_overrides, workers)
+        workers_s = f"{r['workers_s']:.2f}s" if r['workers_s'] is not None else 'n/a'
+        print(f"{mode:<12} {r['ready_s']:>7.2f}s {workers_s:>8} {r['rss']:>7.1f}MB {r['pss']:>7.1f}MB "
+              f"{r['uss']:>7.1f}MB {r['master_rss']:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
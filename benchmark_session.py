@@ -0,0 +1,131 @@
+"""
+Benchmark per-request session overhead: signed cookie vs server-side store
+
+Sends admin requests through the Easy Auth middleware (X-MS-CLIENT-PRINCIPAL
+with the Admin app role, so no SharePoint lookup) to a no-op route, in a fresh
+process per SESSION_BACKEND, and reports per request:
+
+- session ms:  time in the session interface (open_session + save_session)
+- set-cookie:  fraction of responses that carried a Set-Cookie header
+- cookie B:    size of the session cookie the browser sends back
+- store writes: server-side store writes per request (sqlite only)
+
+Scenarios:
+- steady:  the same principal on every request (the common case)
+- changing: the display name claim changes on every request, so the session must be written
+
+Usage:
+    python benchmark_session.py [requests]
+"""
+import os
+import sys
+import json
+import base64
+import tempfile
+import subprocess
+
+BACKENDS = ['cookie', 'sqlite']
+SCENARIOS = ['steady', 'changing']
+
+
+def principal_header(name):
+    claims = {'claims': [
+        {'typ': 'http://schemas.microsoft.com/identity/claims/objectidentifier', 'val': '11111111-2222-3333-4444-555555555555'},
+        {'typ': 'http://schemas.microsoft.com/identity/claims/tenantid', 'val': '66666666-7777-8888-9999-000000000000'},
+        {'typ': 'roles', 'val': 'Admin'},
+        {'typ': 'email', 'val': 'bench.admin@example.com'},
+        {'typ': 'name', 'val': name}
+    ]}
+    return base64.b64encode(json.dumps(claims).encode()).decode()
+
+
+def run_child(requests_per_scenario, out_path):
+    import time
+    import logging
+    import app as app_module
+
+    flask_app = app_module.app
+    logging.disable(logging.CRITICAL)  # Measure the session, not log formatting
+
+    @flask_app.route('/admin/session-bench')
+    def session_bench():
+        return 'ok'
+
+    interface = flask_app.session_interface
+    timings = {'ms': 0.0, 'store_writes': 0}
+    open_session, save_session = interface.open_session, interface.save_session
+
+    def timed_open(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return open_session(*args, **kwargs)
+        finally:
+            timings['ms'] += (time.perf_counter() - start) * 1000
+
+    def timed_save(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return save_session(*args, **kwargs)
+        finally:
+            timings['ms'] += (time.perf_counter() - start) * 1000
+
+    interface.open_session, interface.save_session = timed_open, timed_save
+    if hasattr(interface, '_upsert_session'):
+        upsert = interface._upsert_session
+
+        def counted_upsert(*args, **kwargs):
+            timings['store_writes'] += 1
+            return upsert(*args, **kwargs)
+        interface._upsert_session = counted_upsert
+
+    cookie_name = flask_app.config['SESSION_COOKIE_NAME']
+    results = {}
+    for scenario in SCENARIOS:
+        client = flask_app.test_client()
+        # First request establishes the session (not measured)
+        client.get('/admin/session-bench', base_url='https://localhost', headers={'X-MS-CLIENT-PRINCIPAL': principal_header('Bench Admin')})
+        timings['ms'], timings['store_writes'] = 0.0, 0
+        set_cookies = 0
+        for i in range(requests_per_scenario):
+            name = f'Bench Admin {i}' if scenario == 'changing' else 'Bench Admin'
+            response = client.get('/admin/session-bench', base_url='https://localhost',
+                                  headers={'X-MS-CLIENT-PRINCIPAL': principal_header(name)})
+            assert response.status_code == 200, response.status_code
+            if any(header.startswith(f'{cookie_name}=') for header in response.headers.getlist('Set-Cookie')):
+                set_cookies += 1
+        cookie = client.get_cookie(cookie_name, domain='localhost')
+        results[scenario] = {
+            'session_ms': timings['ms'] / requests_per_scenario,
+            'set_cookie_rate': set_cookies / requests_per_scenario,
+            'cookie_bytes': len(cookie.value) if cookie else 0,
+            'store_writes': timings['store_writes'] / requests_per_scenario
+        }
+
+    with open(out_path, 'w') as out:
+        json.dump(results, out)
+
+
+def main():
+    requests_per_scenario = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"session overhead per request ({requests_per_scenario} admin requests per scenario)")
+    print(f"{'backend':<11} {'scenario':<9} {'session ms':>10} {'set-cookie':>10} {'cookie B':>9} {'store writes':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in BACKENDS:
+            out_path = os.path.join(tmp, f'{backend}.json')
+            env = dict(os.environ, SESSION_BACKEND=backend, SHARED_CACHE_PATH=os.path.join(tmp, f'{backend}.sqlite3'),
+                       AUTH_EXTENSION_TENANT_ID='', AZURE_CLIENT_ID='')
+            subprocess.run([sys.executable, __file__, '--child', str(requests_per_scenario), out_path],
+                           env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            with open(out_path) as result_file:
+                results = json.load(result_file)
+            for scenario, r in results.items():
+                writes = f"{r['store_writes']:.2f}" if backend != 'cookie' else '-'
+                print(f"{backend:<11} {scenario:<9} {r['session_ms']:>10.3f} {r['set_cookie_rate']:>10.0%} "
+                      f"{r['cookie_bytes']:>9} {writes:>12}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(int(sys.argv[2]), sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,52 @@
+"""
+Gunicorn configuration for Azure App Service
+
+Startup command:
+    gunicorn app:app --config gunicorn.conf.py
+
+Environment:
+    PORT: port to bind (set by App Service)
+    GUNICORN_WORKERS: worker processes (default 1)
+    GUNICORN_THREADS: threads per worker (default 2)
+    GUNICORN_PRELOAD: 'true' to import and warm the app once in the master and
+        fork warm workers from it (see utils/prefork.py); default 'false'
+    PREFORK_SNAPSHOT_SOURCES: with preload, resident snapshots built in the master
+    PREFORK_IMPORT_MODULES: with preload, lazily imported modules imported in the master
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('GUNICORN_WORKERS', '1'))
+threads = int(os.environ.get('GUNICORN_THREADS', '2'))
+timeout = 120
+
+# Request and error logging to stdout (Azure Log Stream)
+accesslog = '-'
+errorlog = '-'
+loglevel = 'info'
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+
+def on_starting(server):
+    server.log.info(f"🚀 Gunicorn starting: workers={workers}, threads={threads}, preload={preload_app}")
+
+
+def when_ready(server):
+    # Runs in the master before any worker is forked
+    if preload_app:
+        import app as app_module  # Already imported by preload
+        from utils.prefork import prepare_for_fork, PREFORK_SNAPSHOT_SOURCES
+
+        result = prepare_for_fork(warm=lambda: app_module.warm_resident_snapshots(PREFORK_SNAPSHOT_SOURCES, source='prefork_warmup'))
+        server.log.info(f"🧊 Master prepared for fork: frozen_objects={result['frozen_objects']}, prepare={result['prepare_ms']:.0f}ms")
+    server.log.info(f"✅ Gunicorn ready on {bind}")
+
+
+def post_fork(server, worker):
+    server.log.info(f"👷 Worker spawned (pid: {worker.pid})")
+
+
+def worker_abort(worker):
+    worker.log.warning(f"⚠️ Worker aborted (pid: {worker.pid}) - likely exceeded timeout={timeout}s")
@@ -0,0 +1,95 @@
+"""
+Authorization decision cache for the Easy Auth middleware
+Remembers the session fields the identity pipeline produced for a principal so
+repeat requests skip claims decoding, resident scans and the admin lookup
+
+Entries are keyed by the Easy Auth OID plus an HMAC of the full
+X-MS-CLIENT-PRINCIPAL header (any claim or role change yields a new key),
+expire after a short TTL, and are discarded when the generation they were
+computed under (admin directory / resident data versions) changes
+"""
+import os
+import hmac
+import hashlib
+import logging
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+AUTH_DECISION_TTL_SECONDS = int(os.environ.get('AUTH_DECISION_TTL_SECONDS', '60'))
+AUTH_DECISION_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_DECISION_CACHE_MAX_ENTRIES', '10000'))
+
+# Session fields written by the identity pipeline and replayed on a cache hit
+DECISION_SESSION_FIELDS = (
+    'user_name', 'identity_provider', 'user_email', 'object_id', 'tenant_id', 'role', 'resident_id'
+)
+
+_decision_cache = LRUCache(AUTH_DECISION_CACHE_MAX_ENTRIES, ttl_seconds=AUTH_DECISION_TTL_SECONDS, name='auth_decision')
+
+
+def authorization_decision_key(object_id, principal_header, secret_key):
+    """
+    Build the cache key for a principal
+
+    Args:
+        object_id: OID from X-MS-CLIENT-PRINCIPAL-ID (may be None)
+        principal_header: raw X-MS-CLIENT-PRINCIPAL header value
+        secret_key: app secret used to sign the header digest
+
+    Returns:
+        tuple: (object_id, hex HMAC-SHA256 of the header)
+    """
+    digest = hmac.new(secret_key.encode('utf-8'), principal_header.encode('utf-8'), hashlib.sha256).hexdigest()
+    return object_id or '', digest
+
+
+def get_authorization_decision(key, generation):
+    """
+    Get a cached decision if it was made under the current generation
+
+    Args:
+        key: key from authorization_decision_key
+        generation: current (admin directory version, resident data version) tuple
+
+    Returns:
+        dict of session fields, or None on a miss
+    """
+    entry = _decision_cache.get(key)
+    if entry is None:
+        return None
+
+    if entry['generation'] != generation:
+        _decision_cache.pop(key)
+        logger.info(f"🔄 Authorization decision stale (generation changed) for oid={key[0][:16]}...")
+        return None
+
+    return entry['fields']
+
+
+def store_authorization_decision(key, generation, session):
+    """
+    Cache the session fields produced by the identity pipeline
+
+    Args:
+        key: key from authorization_decision_key
+        generation: generation the decision was computed under
+        session: Flask session after the pipeline ran
+    """
+    fields = {name: session[name] for name in DECISION_SESSION_FIELDS if name in session}
+    _decision_cache.set(key, {'generation': generation, 'fields': fields})
+
+
+def invalidate_authorization_decisions():
+    """Drop all cached decisions (e.g. after an admin or resident change)"""
+    _decision_cache.clear()
+    logger.info("🔄 Authorization decision cache cleared")
+
+
+def get_authorization_decision_cache_state():
+    """
+    Get decision cache counters for diagnostics
+
+    Returns:
+        dict with size, capacity, hits, misses, evictions and hit ratio
+    """
+    return _decision_cache.stats()
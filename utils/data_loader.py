@@ -3,10 +3,12 @@ Data loader for resident information from Excel files
 Handles SSN decryption and data transformation
 """
 import os
-import pandas as pd
+import logging
 from datetime import datetime, timedelta
 from utils.encryption import mask_ssn, get_last4_ssn
 
+logger = logging.getLogger(__name__)
+
 
 def calculate_last_quarter_date():
     """
@@ -52,10 +54,12 @@ def load_residents_from_excel(file_path='Resident PII Test.xlsx'):
     full_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), file_path)
     
     if not os.path.exists(full_path):
-        print(f"Warning: {full_path} not found. Using empty resident list.")
+        logger.warning(f"Warning: {full_path} not found. Using empty resident list.")
         return []
     
     try:
+        import pandas as pd  # Imported on first load - keeps pandas out of worker boot
+        
         # Read Excel file
         df = pd.read_excel(full_path)
         
@@ -134,11 +138,11 @@ def load_residents_from_excel(file_path='Resident PII Test.xlsx'):
             
             residents.append(resident)
         
-        print(f"Loaded {len(residents)} residents from Excel file")
+        logger.info(f"Loaded {len(residents)} residents from Excel file")
         return residents
         
     except Exception as e:
-        print(f"Error loading Excel file: {e}")
+        logger.error(f"Error loading Excel file: {e}")
         import traceback
         traceback.print_exc()
         return []
@@ -161,10 +165,12 @@ def link_resident_external_oid(resident_id, external_oid, external_tenant_id, fi
     full_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), file_path)
     
     if not os.path.exists(full_path):
-        print(f"Error: {full_path} not found")
+        logger.error(f"Error: {full_path} not found")
         return False
     
     try:
+        import pandas as pd
+        
         # Read Excel file
         df = pd.read_excel(full_path)
         
@@ -177,7 +183,7 @@ def link_resident_external_oid(resident_id, external_oid, external_tenant_id, fi
         # Update the row (resident_id is 1-based, row index is 0-based)
         row_index = resident_id - 1
         if row_index < 0 or row_index >= len(df):
-            print(f"Error: Invalid resident_id {resident_id}")
+            logger.error(f"Error: Invalid resident_id {resident_id}")
             return False
         
         df.at[row_index, 'External_OID'] = external_oid
@@ -185,11 +191,11 @@ def link_resident_external_oid(resident_id, external_oid, external_tenant_id, fi
         
         # Save back to Excel
         df.to_excel(full_path, index=False)
-        print(f"🔗 Linked OID {external_oid[:8]}... to resident ID {resident_id}")
+        logger.info(f"🔗 Linked OID {external_oid[:8]}... to resident ID {resident_id}")
         return True
         
     except Exception as e:
-        print(f"Error linking OID to resident: {e}")
+        logger.error(f"Error linking OID to resident: {e}")
         import traceback
         traceback.print_exc()
         return False
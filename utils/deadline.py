@@ -0,0 +1,102 @@
+"""
+Request deadlines for latency-budgeted endpoints
+/api/verify-resident must answer before the Entra custom authentication
+extension times out, so a Deadline created at request entry is passed down to
+every network stage (Graph token, site resolution, list query). Each stage
+uses the remaining budget as its timeout instead of a fixed 10 seconds and
+records how much of the budget it consumed.
+"""
+import time
+from contextlib import contextmanager
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage is about to start with no budget left"""
+
+    def __init__(self, stage):
+        super().__init__(f"Deadline exceeded before stage '{stage}'")
+        self.stage = stage
+
+
+class Deadline:
+    """
+    Time budget shared by the stages of one request
+
+    Args:
+        budget_ms: total budget in milliseconds (None for no deadline)
+        start: time.time() the budget is measured from (defaults to now)
+    """
+
+    # Smallest timeout handed to a network call; below this a call cannot succeed
+    MIN_TIMEOUT_S = 0.05
+
+    def __init__(self, budget_ms=None, start=None):
+        self.budget_ms = budget_ms
+        self.start = start if start is not None else time.time()
+        self.expires_at = self.start + budget_ms / 1000 if budget_ms is not None else None
+        self.stages = {}  # stage name -> elapsed ms (summed if a stage runs more than once)
+        self.exceeded_stage = None
+
+    def remaining_ms(self):
+        """Milliseconds left (infinite without a deadline, never negative)"""
+        if self.expires_at is None:
+            return float('inf')
+        return max(0.0, (self.expires_at - time.time()) * 1000)
+
+    def elapsed_ms(self):
+        """Milliseconds since the budget started"""
+        return (time.time() - self.start) * 1000
+
+    def expired(self):
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def timeout(self, cap_s):
+        """
+        Network timeout for the next call: the remaining budget, capped at cap_s
+
+        Args:
+            cap_s: the stage's usual fixed timeout in seconds
+        """
+        if self.expires_at is None:
+            return cap_s
+        return max(self.MIN_TIMEOUT_S, min(cap_s, self.expires_at - time.time()))
+
+    def check(self, stage):
+        """Raise DeadlineExceeded if no budget is left for stage"""
+        if self.expired():
+            self.exceeded_stage = self.exceeded_stage or stage
+            raise DeadlineExceeded(stage)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Run a stage: fails fast if the budget is gone, records its elapsed time,
+        and marks it as the exceeded stage if the budget ran out while it ran
+        """
+        self.check(name)
+        stage_start = time.time()
+        try:
+            yield self
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.time() - stage_start) * 1000
+            if self.expired() and self.exceeded_stage is None:
+                self.exceeded_stage = name
+
+    def metrics(self):
+        """
+        Budget usage for logging
+
+        Returns:
+            dict with budget_ms, used_ms, remaining_ms, exceeded_stage and
+            <stage>_ms for every stage that ran
+        """
+        remaining = self.remaining_ms()
+        result = {
+            'budget_ms': self.budget_ms,
+            'used_ms': self.elapsed_ms(),
+            'remaining_ms': None if remaining == float('inf') else remaining,
+            'exceeded_stage': self.exceeded_stage
+        }
+        for name, elapsed in self.stages.items():
+            result[f'{name}_ms'] = elapsed
+        return result
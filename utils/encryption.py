@@ -2,7 +2,6 @@
 SSN Encryption utilities using Fernet symmetric encryption
 """
 import os
-from cryptography.fernet import Fernet
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,6 +9,7 @@ load_dotenv()
 
 def get_cipher():
     """Get Fernet cipher instance"""
+    from cryptography.fernet import Fernet  # Only needed for encrypted SSNs, not for plain masking
     key = os.environ.get('ENCRYPTION_KEY')
     if not key:
         raise ValueError("ENCRYPTION_KEY not found in environment variables")
@@ -7,10 +7,18 @@ import logging
 import jwt
 import requests
 import time
+import hashlib
 from functools import wraps
 from flask import request, jsonify
 from datetime import datetime, timedelta
-from threading import Lock
+from threading import Lock, Thread
+from collections import namedtuple
+from utils.request_timing import timing_span
+from utils.lru_cache import LRUCache
+from utils.shared_cache import shared_cache_get, shared_cache_set, shared_cache_get_or_load
+from utils.prefork import register_fork_hooks
+from utils.readiness import register_readiness_check
+from utils.metrics import record_cache_lookup, observe_loader, register_metric_callback
 
 logger = logging.getLogger(__name__)
 
@@ -90,18 +98,33 @@ def log_auth_config_diagnostics():
 # ============================================================================
 # Cache JWKS keys in memory to avoid network round-trips on every request
 # TTL: 1 hour (keys rotate infrequently)
+#
+# Readers take the current immutable snapshot without locking. A background
+# thread refreshes it JWKS_REFRESH_AHEAD_SECONDS before expiry (an expired
+# snapshot keeps being served while that refresh runs), and only a cold cache
+# or an unknown kid fetches on the request path - one fetch at a time, with
+# unknown-kid fetches limited to one per JWKS_UNKNOWN_KID_MIN_INTERVAL_SECONDS
 # ============================================================================
 
+JWKS_CACHE_TTL_SECONDS = 3600  # 1 hour
+JWKS_REFRESH_AHEAD_SECONDS = int(os.environ.get('JWKS_REFRESH_AHEAD_SECONDS', '300'))
+JWKS_REFRESH_RETRY_SECONDS = int(os.environ.get('JWKS_REFRESH_RETRY_SECONDS', '30'))
+JWKS_UNKNOWN_KID_MIN_INTERVAL_SECONDS = int(os.environ.get('JWKS_UNKNOWN_KID_MIN_INTERVAL_SECONDS', '60'))
+
+# Published snapshot - replaced as a whole, never mutated
+_JWKSSnapshot = namedtuple('_JWKSSnapshot', ['keys', 'kids', 'cached_at', 'expires_at', 'source'])
+
 _jwks_cache = {
-    'keys': None,
-    'expires_at': None,
-    'cached_at': None,
-    'source': None,  # 'startup_warmup' or 'request_path'
-    'lock': Lock()
+    'snapshot': None,  # _JWKSSnapshot or None
+    'fetch_lock': Lock(),  # Held for the network fetch (single flight); readers never take it
+    'refreshing': False,  # Background refresh-ahead in progress
+    'retry_at': 0.0,  # Earliest next background refresh after a failed one
+    'last_unknown_kid_fetch': 0.0,
+    'unknown_kid_fetches': 0,
+    'unknown_kid_limited': 0,
+    'lock': Lock()  # Guards the bookkeeping fields above (never held across network calls)
 }
 
-JWKS_CACHE_TTL_SECONDS = 3600  # 1 hour
-
 # ============================================================================
 # PUBLIC KEY CACHE FOR PERFORMANCE
 # ============================================================================
@@ -116,11 +139,51 @@ _public_key_cache = {
 }
 
 
+# ============================================================================
+# VALIDATED TOKEN CACHE FOR PERFORMANCE
+# ============================================================================
+# Entra reuses the same bearer token for many extension calls within its
+# lifetime; successfully validated tokens are cached by SHA-256 digest with
+# their decoded claims until exp minus clock skew, skipping RSA verification
+# on repeat calls. Entries are tagged with the JWKS version and dropped when
+# the JWKS is refreshed (a rotated-out key must not keep validating tokens)
+# ============================================================================
+
+TOKEN_VALIDATION_CACHE_MAX_ENTRIES = int(os.environ.get('TOKEN_VALIDATION_CACHE_MAX_ENTRIES', '1000'))
+TOKEN_VALIDATION_CLOCK_SKEW_SECONDS = int(os.environ.get('TOKEN_VALIDATION_CLOCK_SKEW_SECONDS', '60'))
+
+_validated_token_cache = LRUCache(TOKEN_VALIDATION_CACHE_MAX_ENTRIES, name='validated_token')  # sha256(token) -> (decoded, jwks_version)
+
+
 def _increment_jwks_version():
-    """Increment JWKS version when cache is refreshed (invalidates key cache)"""
+    """Increment JWKS version when cache is refreshed (invalidates key and validated token caches)"""
     with _public_key_cache['lock']:
         _public_key_cache['jwks_version'] += 1
         _public_key_cache['keys'] = {}  # Clear key cache on JWKS refresh
+    _validated_token_cache.clear()
+
+
+def get_token_validation_cache_state():
+    """
+    Get validated token cache counters for diagnostics
+
+    Returns:
+        dict with LRU stats (size, hits, misses, evictions, hit_ratio) and clock skew
+    """
+    state = _validated_token_cache.stats()
+    state['clock_skew_s'] = TOKEN_VALIDATION_CLOCK_SKEW_SECONDS
+    return state
+
+
+def _reset_jwks_after_fork():
+    """Fresh locks for a forked child; a refresh running in the parent does not exist here"""
+    _jwks_cache['fetch_lock'] = Lock()
+    _jwks_cache['lock'] = Lock()
+    _jwks_cache['refreshing'] = False
+    _public_key_cache['lock'] = Lock()
+
+
+register_fork_hooks('jwks', after_fork_in_child=_reset_jwks_after_fork)
 
 
 def get_jwks_cache_state():
@@ -131,28 +194,52 @@ def get_jwks_cache_state():
     Returns:
         dict with cache state information
     """
+    snapshot = _jwks_cache['snapshot']
+    now = time.time()
+    
     with _jwks_cache['lock']:
-        now = time.time()
-        
-        if _jwks_cache['keys'] is None:
-            return {
-                'present': False,
-                'source': None,
-                'age_s': 0,
-                'ttl_remaining_s': 0,
-                'expired': False
-            }
-        
-        cached_at = _jwks_cache.get('cached_at', 0)
-        expires_at = _jwks_cache.get('expires_at', 0)
-        
-        return {
-            'present': True,
-            'source': _jwks_cache.get('source', 'unknown'),
-            'age_s': now - cached_at if cached_at else 0,
-            'ttl_remaining_s': max(0, expires_at - now) if expires_at else 0,
-            'expired': now >= expires_at if expires_at else True
+        refresh_state = {
+            'refreshing': _jwks_cache['refreshing'],
+            'unknown_kid_fetches': _jwks_cache['unknown_kid_fetches'],
+            'unknown_kid_limited': _jwks_cache['unknown_kid_limited']
         }
+    
+    if snapshot is None:
+        return dict(refresh_state, present=False, source=None, age_s=0, ttl_remaining_s=0, expired=False, key_count=0)
+    
+    return dict(
+        refresh_state,
+        present=True,
+        source=snapshot.source,
+        age_s=now - snapshot.cached_at,
+        ttl_remaining_s=max(0, snapshot.expires_at - now),
+        expired=now >= snapshot.expires_at,
+        key_count=len(snapshot.kids)
+    )
+
+
+def _jwks_readiness():
+    """
+    Ready once signing keys have been cached - expired keys keep validating
+    while refresh-ahead retries, so a failing refresh is reported, not failed
+    """
+    state = get_jwks_cache_state()
+    return state['present'], {
+        'age_s': round(state['age_s']),
+        'ttl_remaining_s': round(state['ttl_remaining_s']),
+        'expired': state['expired']
+    }
+
+
+register_readiness_check('jwks', _jwks_readiness, enabled=lambda: get_auth_config()['jwks_uri_present'])
+
+
+def _jwks_age_metric():
+    snapshot = _jwks_cache['snapshot']
+    return {('jwks',): time.time() - snapshot.cached_at} if snapshot is not None else {}
+
+
+register_metric_callback('cache_age_seconds', 'gauge', 'Age of each snapshot cache since it was loaded', ['cache'], _jwks_age_metric)
 
 
 def warmup_jwks_cache():
@@ -194,9 +281,94 @@ def warmup_jwks_cache():
         return {'success': False, 'duration_ms': duration_ms, 'error': error_msg}
 
 
+def _publish_jwks(jwks_data, fetched_at, source):
+    """Publish a new JWKS snapshot and invalidate keys built from the previous one"""
+    snapshot = _JWKSSnapshot(
+        keys=jwks_data,
+        kids=frozenset(key.get('kid') for key in jwks_data.get('keys', []) if key.get('kid')),
+        cached_at=fetched_at,
+        expires_at=fetched_at + JWKS_CACHE_TTL_SECONDS,
+        source=source
+    )
+    _jwks_cache['snapshot'] = snapshot
+    
+    # Invalidate public key cache when JWKS refreshes
+    _increment_jwks_version()
+    return snapshot
+
+
+def _download_jwks(jwks_uri, source):
+    with observe_loader('jwks'):
+        with timing_span('jwks_fetch', source):
+            jwks_response = requests.get(jwks_uri, timeout=5)
+        jwks_response.raise_for_status()
+        return jwks_response.json()
+
+
+def _fetch_jwks(jwks_uri, source, shared=True):
+    """
+    Fetch the JWKS and publish a new snapshot (caller holds _jwks_cache['fetch_lock'])
+    With shared=True a JWKS another worker on this host fetched is reused; its
+    shared entry expires where refresh-ahead starts, so one worker refetches
+    for the host and the rest pick the result up
+    
+    Returns:
+        tuple: (snapshot, fetch_time_ms)
+    """
+    fetch_start = time.time()
+    shared_key = f'jwks:{jwks_uri}'
+    shared_ttl = max(60, JWKS_CACHE_TTL_SECONDS - JWKS_REFRESH_AHEAD_SECONDS)
+    
+    if shared:
+        jwks_data, origin, fetched_at = shared_cache_get_or_load(
+            shared_key, lambda: _download_jwks(jwks_uri, source), ttl_seconds=shared_ttl, wait_seconds=5
+        )
+    else:
+        jwks_data, origin, fetched_at = _download_jwks(jwks_uri, source), 'loaded', time.time()
+        shared_cache_set(shared_key, jwks_data, shared_ttl)
+    fetch_elapsed_ms = (time.time() - fetch_start) * 1000
+    
+    snapshot = _publish_jwks(jwks_data, fetched_at, source)
+    
+    logger.info(f"✅ JWKS fetched and cached: {fetch_elapsed_ms:.1f}ms, keys={len(snapshot.kids)}, TTL={JWKS_CACHE_TTL_SECONDS}s, source={source}, origin={origin}")
+    return snapshot, fetch_elapsed_ms
+
+
+def _refresh_jwks_in_background(jwks_uri):
+    """Background refresh-ahead; on failure the current snapshot is kept and retried later"""
+    try:
+        with _jwks_cache['fetch_lock']:
+            _fetch_jwks(jwks_uri, source='background_refresh')
+    except Exception as e:
+        logger.error(f"❌ JWKS background refresh failed (keeping current keys, retry in {JWKS_REFRESH_RETRY_SECONDS}s): {e}")
+        with _jwks_cache['lock']:
+            _jwks_cache['retry_at'] = time.time() + JWKS_REFRESH_RETRY_SECONDS
+    finally:
+        with _jwks_cache['lock']:
+            _jwks_cache['refreshing'] = False
+
+
+def _start_background_jwks_refresh(jwks_uri):
+    """Start one background refresh unless one is running or recently failed"""
+    if _jwks_cache['refreshing']:
+        return
+    
+    with _jwks_cache['lock']:
+        if _jwks_cache['refreshing'] or time.time() < _jwks_cache['retry_at']:
+            return
+        _jwks_cache['refreshing'] = True
+    
+    logger.info("🔄 JWKS nearing expiry - refreshing in background")
+    Thread(target=_refresh_jwks_in_background, args=(jwks_uri,), daemon=True).start()
+
+
 def get_cached_jwks(jwks_uri, source='request_path'):
     """
-    Get JWKS keys from cache or fetch from network
+    Get JWKS keys from the current snapshot, fetching only when nothing is cached
+    
+    - Snapshot within JWKS_REFRESH_AHEAD_SECONDS of expiry (or past it): returned
+      while a background thread refreshes it
+    - No snapshot: fetched on this thread; concurrent callers wait for that one fetch
     
     Args:
         jwks_uri: JWKS endpoint URL
@@ -205,50 +377,86 @@ def get_cached_jwks(jwks_uri, source='request_path'):
     Returns:
         tuple: (jwks_data, cache_hit: bool, fetch_time_ms: float, cache_age_s: float, ttl_remaining_s: float)
     """
-    with _jwks_cache['lock']:
+    snapshot = _jwks_cache['snapshot']
+    
+    if snapshot is not None:
         now = time.time()
+        if now >= snapshot.expires_at - JWKS_REFRESH_AHEAD_SECONDS:
+            _start_background_jwks_refresh(jwks_uri)
+        cache_age = now - snapshot.cached_at
+        ttl_remaining = max(0.0, snapshot.expires_at - now)
+        logger.info(f"✅ JWKS cache HIT (source={snapshot.source}, age={cache_age:.0f}s, ttl_remaining={ttl_remaining:.0f}s)")
+        record_cache_lookup('jwks', hit=True)
+        return snapshot.keys, now < snapshot.expires_at, 0.0, cache_age, ttl_remaining
+    
+    # Cold cache - single flight: the first caller fetches, the rest wait and reuse its snapshot
+    record_cache_lookup('jwks', hit=False)
+    wait_start = time.time()
+    with _jwks_cache['fetch_lock']:
+        snapshot = _jwks_cache['snapshot']
+        if snapshot is not None:
+            return snapshot.keys, False, (time.time() - wait_start) * 1000, 0.0, max(0.0, snapshot.expires_at - time.time())
         
-        # Check cache validity
-        if _jwks_cache['keys'] is not None and _jwks_cache['expires_at'] is not None:
-            if now < _jwks_cache['expires_at']:
-                cache_age = now - _jwks_cache['cached_at'] if _jwks_cache['cached_at'] else 0
-                ttl_remaining = _jwks_cache['expires_at'] - now
-                logger.info(f"✅ JWKS cache HIT (source={_jwks_cache.get('source', 'unknown')}, age={cache_age:.0f}s, ttl_remaining={ttl_remaining:.0f}s)")
-                return _jwks_cache['keys'], True, 0.0, cache_age, ttl_remaining
-        
-        # Cache miss - fetch from network
         logger.info(f"⚠️ JWKS cache MISS - fetching from {jwks_uri}")
-        fetch_start = time.time()
-        
         try:
-            jwks_response = requests.get(jwks_uri, timeout=5)
-            jwks_response.raise_for_status()
-            jwks_data = jwks_response.json()
-            
-            fetch_elapsed_ms = (time.time() - fetch_start) * 1000
-            
-            # Update cache
-            _jwks_cache['keys'] = jwks_data
-            _jwks_cache['expires_at'] = now + JWKS_CACHE_TTL_SECONDS
-            _jwks_cache['cached_at'] = now
-            _jwks_cache['source'] = source
-            
-            # Invalidate public key cache when JWKS refreshes
-            _increment_jwks_version()
-            
-            logger.info(f"✅ JWKS fetched and cached: {fetch_elapsed_ms:.1f}ms, TTL={JWKS_CACHE_TTL_SECONDS}s, source={source}")
-            
-            return jwks_data, False, fetch_elapsed_ms, 0.0, JWKS_CACHE_TTL_SECONDS
-        
+            snapshot, fetch_elapsed_ms = _fetch_jwks(jwks_uri, source)
         except Exception as e:
             logger.error(f"❌ JWKS fetch failed: {e}")
-            # If we have stale cache, return it as fallback
-            if _jwks_cache['keys'] is not None:
-                logger.warning(f"⚠️ Using stale JWKS cache as fallback (source={_jwks_cache.get('source', 'unknown')})")
-                fetch_elapsed_ms = (time.time() - fetch_start) * 1000
-                cache_age = now - _jwks_cache['cached_at'] if _jwks_cache['cached_at'] else 0
-                return _jwks_cache['keys'], False, fetch_elapsed_ms, cache_age, 0.0
             raise
+        return snapshot.keys, False, fetch_elapsed_ms, 0.0, JWKS_CACHE_TTL_SECONDS
+
+
+def refresh_jwks_for_unknown_kid(jwks_uri, kid):
+    """
+    Refetch the JWKS because a token names a kid the current snapshot lacks (key rotation)
+    
+    Single flight: callers that queued behind an in-flight fetch reuse its result.
+    Fetches are limited to one per JWKS_UNKNOWN_KID_MIN_INTERVAL_SECONDS so tokens
+    with bogus kids cannot turn into a stream of JWKS requests
+    
+    Args:
+        jwks_uri: JWKS endpoint URL
+        kid: Key ID from the JWT header
+    
+    Returns:
+        tuple: (jwks_data or None if the kid is still unknown, fetch_time_ms: float)
+    """
+    seen = _jwks_cache['snapshot']
+    
+    with _jwks_cache['fetch_lock']:
+        current = _jwks_cache['snapshot']
+        if current is not None and kid in current.kids:
+            return current.keys, 0.0
+        if current is not seen:
+            # Another caller refetched while we waited and the kid is still not there
+            return None, 0.0
+        
+        # Another worker on this host may already have refetched for the same rotation
+        shared = shared_cache_get(f'jwks:{jwks_uri}')
+        if shared is not None and (current is None or shared[1] > current.cached_at):
+            if any(key.get('kid') == kid for key in shared[0].get('keys', [])):
+                logger.info(f"🔗 Unknown kid={kid} found in JWKS refetched by another worker")
+                return _publish_jwks(shared[0], shared[1], 'unknown_kid').keys, 0.0
+        
+        with _jwks_cache['lock']:
+            now = time.time()
+            if now - _jwks_cache['last_unknown_kid_fetch'] < JWKS_UNKNOWN_KID_MIN_INTERVAL_SECONDS:
+                _jwks_cache['unknown_kid_limited'] += 1
+                logger.warning(f"🚦 Unknown kid={kid} - JWKS refetch rate-limited")
+                return None, 0.0
+            _jwks_cache['last_unknown_kid_fetch'] = now
+            _jwks_cache['unknown_kid_fetches'] += 1
+        
+        logger.info(f"🔑 Unknown kid={kid} - refetching JWKS")
+        try:
+            snapshot, fetch_elapsed_ms = _fetch_jwks(jwks_uri, source='unknown_kid', shared=False)
+        except Exception as e:
+            logger.error(f"❌ JWKS refetch for unknown kid failed: {e}")
+            return None, 0.0
+        
+        if kid not in snapshot.kids:
+            return None, fetch_elapsed_ms
+        return snapshot.keys, fetch_elapsed_ms
 
 
 def get_public_key_from_jwks(jwks_data, kid, current_jwks_version):
@@ -325,6 +533,8 @@ class EntraTokenValidator:
         - Parse JWT header once only (to extract kid)
         - Parse JWT payload once only (during verified decode)
         - Use kid-keyed public key cache (avoid repeated RSA key construction)
+        - Cache validated tokens by digest until exp minus clock skew (skip RSA
+          verification for repeat tokens)
         - Minimal logging in hot path (defer diagnostics to summary)
         
         Args:
@@ -343,6 +553,9 @@ class EntraTokenValidator:
             'key_cache_hit': False,
             'signature_verify_ms': 0.0,
             'claims_validation_ms': 0.0,
+            'token_cache_hit': False,
+            'token_cache_hits': 0,
+            'token_cache_misses': 0,
             'total_validation_ms': 0.0
         }
         
@@ -353,6 +566,21 @@ class EntraTokenValidator:
             metrics['total_validation_ms'] = (time.time() - validation_start) * 1000
             return None, metrics
         
+        # STAGE 0: Validated token cache (digest only - the raw token is never kept)
+        token_digest = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        cached = _validated_token_cache.get(token_digest)
+        metrics['token_cache_hits'] = _validated_token_cache.hits
+        metrics['token_cache_misses'] = _validated_token_cache.misses
+        if cached is not None and cached[1] == _public_key_cache['jwks_version']:
+            metrics['token_cache_hit'] = True
+            metrics['total_validation_ms'] = (time.time() - validation_start) * 1000
+            logger.info(
+                f"✅ TOKEN_VALIDATION_SUCCESS: "
+                f"total={metrics['total_validation_ms']:.1f}ms | "
+                f"token_cache=HIT"
+            )
+            return dict(cached[0]), metrics
+        
         try:
             # STAGE 1: Parse header once to get kid (unverified header parse)
             stage_start = time.time()
@@ -373,12 +601,22 @@ class EntraTokenValidator:
             metrics['jwks_fetch_ms'] = jwks_fetch_ms
             metrics['jwks_cache_age_s'] = jwks_cache_age
             metrics['jwks_ttl_remaining_s'] = jwks_ttl
-            metrics['jwks_cache_source'] = _jwks_cache.get('source', 'unknown')
+            snapshot = _jwks_cache['snapshot']
+            metrics['jwks_cache_source'] = snapshot.source if snapshot is not None else 'unknown'
             
             # STAGE 3: Get public key from JWKS by kid (with key cache)
             stage_start = time.time()
             current_jwks_version = _public_key_cache['jwks_version']
             public_key, key_cache_hit, key_construction_ms = get_public_key_from_jwks(jwks_data, kid, current_jwks_version)
+            
+            if not public_key and (snapshot is None or kid not in snapshot.kids):
+                # Kid not in the cached key set - the keys may have rotated since the last fetch
+                jwks_data, refetch_ms = refresh_jwks_for_unknown_kid(self.jwks_uri, kid)
+                metrics['jwks_fetch_ms'] += refetch_ms
+                metrics['jwks_unknown_kid_refetch'] = True
+                if jwks_data is not None:
+                    current_jwks_version = _public_key_cache['jwks_version']
+                    public_key, key_cache_hit, key_construction_ms = get_public_key_from_jwks(jwks_data, kid, current_jwks_version)
             metrics['key_cache_hit'] = key_cache_hit
             metrics['key_construction_ms'] = key_construction_ms
             metrics['key_lookup_ms'] = (time.time() - stage_start) * 1000
@@ -405,6 +643,11 @@ class EntraTokenValidator:
             )
             metrics['signature_verify_ms'] = (time.time() - stage_start) * 1000
             
+            # Cache until exp minus clock skew, tagged with the JWKS version the key came from
+            ttl = decoded.get('exp', 0) - TOKEN_VALIDATION_CLOCK_SKEW_SECONDS - time.time()
+            if ttl > 0:
+                _validated_token_cache.set(token_digest, (decoded, current_jwks_version), ttl_seconds=ttl)
+            
             # STAGE 5: Additional claims validation (exp, aud, iss already verified above)
             # No additional validation needed - jwt.decode handles standard claims
             metrics['claims_validation_ms'] = 0.0
@@ -419,6 +662,7 @@ class EntraTokenValidator:
                 f"header_parse={metrics['header_parse_ms']:.1f}ms | "
                 f"jwks_cache={'HIT' if jwks_cache_hit else 'MISS'} | "
                 f"key_cache={'HIT' if key_cache_hit else 'MISS'} | "
+                f"token_cache=MISS | "
                 f"key_lookup={metrics['key_lookup_ms']:.1f}ms | "
                 f"signature_verify={metrics['signature_verify_ms']:.1f}ms | "
                 f"kid={kid}"
@@ -501,7 +745,8 @@ def require_bearer_token(f):
         # Validate token (returns tuple: decoded_token, metrics)
         # Detailed logging happens inside validate_token
         validator = get_token_validator()
-        decoded_token, metrics = validator.validate_token(token)
+        with timing_span('token_validation'):
+            decoded_token, metrics = validator.validate_token(token)
         
         if decoded_token is None:
             return jsonify({
@@ -26,6 +26,7 @@ import json
 import requests
 import logging
 from datetime import datetime
+from utils.request_timing import timing_span
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +58,7 @@ class EntrataAPIClient:
                 logger.info(f"   Username: {self.username}")
             logger.info(f"   Property ID: {self.property_id if self.property_id else 'Portfolio-level access'}")
     
-    def _make_request(self, method_name, group, params=None, version=None, use_api_key=True):
+    def _make_request(self, method_name, group, params=None, version=None, use_api_key=True, timeout=30):
         """
         Make authenticated request to Entrata API
         
@@ -67,6 +68,7 @@ class EntrataAPIClient:
             params: Dictionary of parameters
             version: API version (e.g., 'r2' for getLeases)
             use_api_key: Use API key auth (True) or username/password (False)
+            timeout: Request timeout in seconds
             
         Returns:
             Response data or None on error
@@ -119,12 +121,13 @@ class EntrataAPIClient:
             logger.info(f"   Auth: {'API Key' if use_api_key else 'Username/Password'}")
             logger.info(f"   Version: {version if version else 'default'}")
             
-            response = requests.post(
-                endpoint_url,
-                json=payload,
-                headers=headers,
-                timeout=30
-            )
+            with timing_span('entrata', method_name):
+                response = requests.post(
+                    endpoint_url,
+                    json=payload,
+                    headers=headers,
+                    timeout=timeout
+                )
             
             # Log response details
             logger.info(f"   Response status: {response.status_code}")
@@ -148,7 +151,7 @@ class EntrataAPIClient:
             return result
                 
         except requests.exceptions.Timeout:
-            logger.error("❌ Entrata API request timeout (30s)")
+            logger.error(f"❌ Entrata API request timeout ({timeout:.1f}s)")
             return None
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ Entrata API request failed: {e}")
@@ -157,7 +160,7 @@ class EntrataAPIClient:
             logger.error(f"❌ Entrata API invalid JSON response: {e}")
             return None
     
-    def verify_resident(self, email, first_name, last_name, date_of_birth):
+    def verify_resident(self, email, first_name, last_name, date_of_birth, deadline=None):
         """
         Verify a resident exists in Entrata with matching details
         
@@ -166,9 +169,11 @@ class EntrataAPIClient:
             first_name: Resident first name
             last_name: Resident last name
             date_of_birth: Date of birth (YYYY-MM-DD format or datetime object)
+            deadline: optional Deadline; the Entrata call uses the remaining budget as its timeout
             
         Returns:
             dict with 'verified': bool, 'resident_id': str/None, 'message': str
+            ('service_error': True when Entrata could not be queried)
         """
         # Normalize inputs
         email = email.lower().strip()
@@ -198,14 +203,16 @@ class EntrataAPIClient:
         else:
             logger.info(f"   Querying portfolio-wide (no property ID filter)")
         
-        result = self._make_request('getResidents', 'residents', params)
+        timeout = deadline.timeout(30) if deadline is not None else 30
+        result = self._make_request('getResidents', 'residents', params, timeout=timeout)
         
         if result is None:
             logger.error("❌ Failed to query Entrata API")
             return {
                 'verified': False,
                 'resident_id': None,
-                'message': 'Unable to verify at this time. Please try again later.'
+                'message': 'Unable to verify at this time. Please try again later.',
+                'service_error': True
             }
         
         # Check if we got any residents back
@@ -0,0 +1,70 @@
+"""
+Jinja fragment cache for heavy admin and resident templates
+Caches rendered HTML for per-resident blocks (table rows, payment history)
+keyed by resident ID plus snapshot version, so filters such as currency
+and date_format run once per data version
+
+Usage in a template:
+    {% call cache_fragment('rent_row', data_source, resident.id, snapshot_version) %}
+        ...expensive markup...
+    {% endcall %}
+"""
+import os
+import logging
+from markupsafe import Markup
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+FRAGMENT_CACHE_MAX_ENTRIES = int(os.environ.get('FRAGMENT_CACHE_MAX_ENTRIES', '5000'))
+
+_fragment_cache = LRUCache(FRAGMENT_CACHE_MAX_ENTRIES, name='fragment')
+
+
+def cache_fragment(name, *key_parts, caller=None):
+    """
+    Render a template block once per key and reuse the HTML afterwards
+
+    Args:
+        name: fragment name (e.g. 'rent_row', 'payment_history')
+        *key_parts: values identifying the fragment content; must include the
+            snapshot version so a data refresh yields new keys
+        caller: Jinja call-block body (supplied automatically by {% call %})
+
+    Returns:
+        Markup with the rendered fragment
+    """
+    if caller is None:
+        return Markup('')
+
+    # A missing version means the data is not versioned - never cache it
+    if not key_parts or key_parts[-1] is None:
+        return Markup(caller())
+
+    key = (name,) + tuple(key_parts)
+    html = _fragment_cache.get(key)
+    if html is None:
+        html = Markup(caller())
+        _fragment_cache.set(key, html)
+    return html
+
+
+def clear_fragment_cache():
+    """Drop all cached fragments"""
+    _fragment_cache.clear()
+    logger.info("🔄 Fragment cache cleared")
+
+
+def get_fragment_cache_state():
+    """
+    Get fragment cache counters for diagnostics
+
+    Returns:
+        dict with size, capacity, hits, misses, evictions and hit ratio
+    """
+    return _fragment_cache.stats()
+
+
+def init_fragment_cache(app):
+    """Register cache_fragment as a Jinja global on the Flask app"""
+    app.jinja_env.globals['cache_fragment'] = cache_fragment
@@ -0,0 +1,193 @@
+"""
+Asynchronous logging pipeline
+Request threads only resolve a record's message and enqueue it; a background
+QueueListener thread applies the output format and writes to stdout, so slow
+log I/O stays off hot paths such as /api/verify-resident (2-second Entra
+custom-extension budget)
+
+Also provides:
+- log_kv: structured key=value records, rendered only if the level is enabled
+- diagnostics_enabled: level gating and per-category sampling for verbose
+  diagnostic blocks (claim dumps, payload dumps, timing breakdowns)
+
+Environment:
+    LOG_ASYNC: 'true' (default) to use the queue pipeline, 'false' for direct stdout
+    LOG_LEVEL: root log level (default INFO)
+    DIAGNOSTIC_LOG_LEVEL: level diagnostic blocks are emitted at (default INFO);
+        set to DEBUG to drop them while LOG_LEVEL stays INFO
+    LOG_SAMPLE_RATES: per-category sampling, e.g. "verify.payload=0.1,auth.claims=0"
+        (categories not listed are always logged)
+"""
+import os
+import sys
+import copy
+import atexit
+import queue
+import random
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from utils.prefork import register_fork_hooks
+
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+
+DIAGNOSTIC_LOG_LEVEL = logging.getLevelName(os.environ.get('DIAGNOSTIC_LOG_LEVEL', 'INFO').upper())
+if not isinstance(DIAGNOSTIC_LOG_LEVEL, int):
+    DIAGNOSTIC_LOG_LEVEL = logging.INFO
+
+_listener = None
+
+
+def _parse_sample_rates(raw):
+    """Parse "category=rate,category=rate" into a dict, ignoring malformed entries"""
+    rates = {}
+    for entry in (raw or '').split(','):
+        name, sep, value = entry.partition('=')
+        if not sep:
+            continue
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+_sample_rates = _parse_sample_rates(os.environ.get('LOG_SAMPLE_RATES', ''))
+
+
+_exception_formatter = logging.Formatter()
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that hands records to the listener with only the message resolved
+    The stock handler applies the full output format on the calling thread (for
+    pickling to other processes); the listener lives in this process, so that step
+    is deferred. The message and traceback text are still rendered here: args may
+    be mutated by the caller after logging, and exc_info would keep the failing
+    request's frames alive until the listener catches up
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level=None, use_async=None):
+    """
+    Configure root logging for the app (idempotent)
+
+    Args:
+        level: root log level (defaults to LOG_LEVEL env var, then INFO)
+        use_async: queue pipeline on/off (defaults to the LOG_ASYNC env var)
+    """
+    global _listener
+
+    if _listener is not None:
+        return
+
+    level = level or os.environ.get('LOG_LEVEL', 'INFO').upper()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    if use_async is None:
+        use_async = os.environ.get('LOG_ASYNC', 'true').lower() == 'true'
+    if not use_async:
+        root.addHandler(stream_handler)
+        return
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _logging_before_fork():
+    """Flush and stop the listener thread; the master logs directly until it exits"""
+    if _listener is not None:
+        stop_logging()
+        configure_logging(level=logging.getLogger().level, use_async=False)
+
+
+def _logging_after_fork_in_child():
+    """The listener thread does not survive fork - give the child its own queue and listener"""
+    global _listener
+    _listener = None
+    configure_logging(level=logging.getLogger().level)
+
+
+register_fork_hooks('logging', _logging_before_fork, _logging_after_fork_in_child, first=True)
+
+
+class _KeyValueMessage:
+    """Log message rendered as "event: key=value | key=value" when first formatted"""
+
+    __slots__ = ('event', 'fields')
+
+    def __init__(self, event, fields):
+        self.event = event
+        self.fields = fields
+
+    def __str__(self):
+        parts = []
+        for key, value in self.fields.items():
+            if key.endswith('_ms') and isinstance(value, (int, float)):
+                parts.append(f"{key[:-3]}={value:.0f}ms")
+            elif isinstance(value, float):
+                parts.append(f"{key}={value:.1f}")
+            else:
+                parts.append(f"{key}={value}")
+        return f"{self.event}: {' | '.join(parts)}"
+
+
+def log_kv(target_logger, level, event, **fields):
+    """
+    Log a structured key=value record
+    Values are rendered only if the level is enabled; keys ending in _ms are shown
+    as rounded milliseconds (wall_clock_ms=12.3 -> wall_clock=12ms)
+
+    Args:
+        target_logger: logger to emit on
+        level: logging level
+        event: event label (e.g. "📊 SUMMARY")
+        **fields: key/value pairs in display order
+    """
+    if target_logger.isEnabledFor(level):
+        target_logger.log(level, _KeyValueMessage(event, fields))
+
+
+def diagnostics_enabled(target_logger, category):
+    """
+    Decide whether a verbose diagnostic block should be emitted
+
+    Args:
+        target_logger: logger the block would be written to
+        category: diagnostic category (e.g. 'verify.payload', 'auth.claims')
+
+    Returns:
+        bool: True if the logger accepts DIAGNOSTIC_LOG_LEVEL and the category is sampled in
+    """
+    if not target_logger.isEnabledFor(DIAGNOSTIC_LOG_LEVEL):
+        return False
+    rate = _sample_rates.get(category, 1.0)
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
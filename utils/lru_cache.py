@@ -0,0 +1,109 @@
+"""
+Thread-safe bounded LRU cache with optional per-entry TTL
+Shared by the in-memory caches that need a hard size limit; caches created
+with a name report their counters to the metrics registry (utils/metrics.py)
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+
+_MISSING = object()
+
+_named_caches = []  # LRUCache instances created with a name, for metrics
+
+
+class LRUCache:
+    """Bounded least-recently-used cache, safe to share between request threads"""
+
+    def __init__(self, max_entries, ttl_seconds=None, name=None):
+        """
+        Args:
+            max_entries: maximum number of entries kept; oldest are evicted first
+            ttl_seconds: default lifetime of an entry, or None for no expiry
+            name: cache name reported in metrics (None = not reported)
+        """
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (value, expires_at or None)
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if name is not None:
+            _named_caches.append(self)
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds=_MISSING):
+        """
+        Store a value, evicting the least recently used entries if over capacity
+
+        Args:
+            key: hashable cache key
+            value: value to store
+            ttl_seconds: lifetime override for this entry (None = never expires)
+        """
+        ttl = self.ttl_seconds if ttl_seconds is _MISSING else ttl_seconds
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Remove key and return its value (or default)"""
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """
+        Get cache counters for diagnostics
+
+        Returns:
+            dict with size, capacity, hits, misses, evictions and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0
+            }
+
+
+def get_named_caches():
+    """Get the LRU caches created with a name"""
+    return list(_named_caches)
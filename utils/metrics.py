@@ -0,0 +1,544 @@
+"""
+In-process metrics registry with Prometheus text exposition
+Counters, gauges and fixed-bucket latency histograms for routes, Graph calls
+per list, cache hits/misses and loader durations, so latency percentiles and
+hit ratios can be graphed instead of grepped out of log lines.
+
+Each gunicorn worker keeps its own registry. A background thread publishes
+the worker's values to the host-wide shared cache tier (utils/shared_cache.py)
+every METRICS_PUBLISH_SECONDS, and /metrics merges every live worker's entry:
+counters and histograms are summed, gauges keep one series per worker
+(label worker=<pid>). A worker that exits drops out once its entry expires,
+so its counts leave the sums (Prometheus treats that as a counter reset).
+Without the shared tier /metrics reports the answering worker only.
+
+Usage:
+    with observe_graph_request('tenants') as call:
+        response = requests.get(...)
+        call['status'] = response.status_code
+
+    record_cache_lookup('jwks', hit=True)
+
+    with observe_loader('verification_index') as run:
+        ...
+        run['outcome'] = 'error'  # for loaders that report failure without raising
+
+Values computed from existing state (LRU cache counters, token TTLs, cache
+ages) are registered as callbacks and read when metrics are collected.
+
+Environment:
+    METRICS_PUBLISH_SECONDS: how often each worker publishes its metrics for
+        cross-worker aggregation (default 15)
+"""
+import os
+import math
+import time
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock, Thread, Event
+from utils.lru_cache import get_named_caches
+from utils.prefork import register_fork_hooks
+from utils.shared_cache import shared_cache_set, shared_cache_delete, shared_cache_get_prefix, shared_cache_available, get_shared_cache_state
+
+logger = logging.getLogger(__name__)
+
+METRICS_PUBLISH_SECONDS = int(os.environ.get('METRICS_PUBLISH_SECONDS', '15'))
+
+# Latency bucket upper bounds in seconds (5ms .. 10s); above the last bucket only +Inf counts
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Shared cache key prefix for per-worker snapshots; entries outlive a few missed publishes
+_SHARED_KEY_PREFIX = 'metrics:'
+_SHARED_TTL_INTERVALS = 4
+
+_registry = {
+    'metrics': {},  # name -> Counter | Gauge | Histogram
+    'callbacks': [],  # (name, kind, help, label_names, fn)
+    'baselines': {},  # (name, label values) -> callback counter value inherited at fork
+    'lock': Lock()
+}
+
+_publisher = {
+    'thread': None,
+    'stop': None,  # Event that stops the publisher thread
+    'published': 0,
+    'last_published_at': None,
+    'lock': Lock()
+}
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, label_names=()):
+        """
+        Args:
+            name: metric name (counters end in _total, durations in _seconds)
+            help_text: one-line description for the # HELP line
+            label_names: label names every update must supply
+        """
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}  # label values tuple -> value
+        self._lock = Lock()
+
+        with _registry['lock']:
+            if name in _registry['metrics']:
+                raise ValueError(f"metric {name} is already registered")
+            _registry['metrics'][name] = self
+
+    def _key(self, labels):
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self):
+        """Get a copy of the values by label values tuple"""
+        with self._lock:
+            return dict(self._values)
+
+    def _reset(self):
+        self._values = {}
+        self._lock = Lock()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into fixed buckets, plus their sum and count"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        """
+        Args:
+            buckets: increasing bucket upper bounds (+Inf is implied)
+        """
+        self.buckets = tuple(buckets)
+        super().__init__(name, help_text, label_names)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)  # First bucket with bound >= value
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]  # per-bucket counts (last = +Inf), sum, count
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+
+
+def register_metric_callback(name, kind, help_text, label_names, fn):
+    """
+    Register a counter or gauge whose values are read from existing state at collection time
+    Several callbacks (and a regular metric) may contribute samples to the same name
+
+    Args:
+        name: metric name
+        kind: 'counter' or 'gauge'
+        help_text: one-line description
+        label_names: label names of the returned samples
+        fn: callable() -> dict of label values tuple -> value; must be cheap and not do I/O
+    """
+    with _registry['lock']:
+        _registry['callbacks'].append((name, kind, help_text, tuple(label_names), fn))
+
+
+# ============================================================================
+# APPLICATION METRICS
+# ============================================================================
+
+HTTP_REQUESTS = Counter('http_requests_total', 'HTTP requests by route, method and status', ['route', 'method', 'status'])
+HTTP_REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'HTTP request latency by route', ['route', 'method'])
+GRAPH_REQUESTS = Counter('graph_requests_total', 'Microsoft Graph requests by list and HTTP status', ['list', 'status'])
+GRAPH_REQUEST_SECONDS = Histogram('graph_request_duration_seconds', 'Microsoft Graph request latency by list', ['list'])
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups by cache and result (hit or miss)', ['cache', 'result'])
+LOADER_SECONDS = Histogram('loader_duration_seconds', 'Cache loader run time by loader and outcome', ['loader', 'outcome'],
+                           buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0))
+
+
+def observe_request(route, method, status, seconds):
+    """Record one finished HTTP request (called by utils/request_timing.py)"""
+    HTTP_REQUESTS.inc(route=route, method=method, status=status)
+    HTTP_REQUEST_SECONDS.observe(seconds, route=route, method=method)
+
+
+def record_cache_lookup(cache, hit):
+    """
+    Count a lookup in a cache that keeps no counters of its own
+    (named LRU caches are reported automatically)
+
+    Args:
+        cache: cache name (e.g. 'jwks', 'site_id')
+        hit: True if the lookup was answered from the cache
+    """
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+@contextmanager
+def observe_graph_request(list_name):
+    """
+    Time one Graph request; the block sets call['status'] to the HTTP status code
+    A block that raises (timeout, connection error) is counted as status 'error'
+
+    Args:
+        list_name: SharePoint list (or Graph resource, e.g. 'site') the request reads
+
+    Yields:
+        dict with a 'status' key
+    """
+    call = {'status': None}
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call['status'] = 'error'
+        raise
+    finally:
+        GRAPH_REQUEST_SECONDS.observe(time.perf_counter() - start, list=list_name)
+        GRAPH_REQUESTS.inc(list=list_name, status=call['status'] or 'unknown')
+
+
+def record_loader(loader, seconds, outcome):
+    """
+    Record an already measured loader run (for loaders that catch their own errors)
+
+    Args:
+        loader: loader name
+        seconds: run time
+        outcome: 'success' or 'error'
+    """
+    LOADER_SECONDS.observe(seconds, loader=loader, outcome=outcome)
+
+
+@contextmanager
+def observe_loader(loader):
+    """
+    Time one loader run (token acquisition, JWKS download, list sync, snapshot load)
+    The outcome is 'success' unless the block raises or sets run['outcome']
+
+    Args:
+        loader: loader name (e.g. 'jwks', 'resident_snapshot:credhub')
+
+    Yields:
+        dict with an 'outcome' key
+    """
+    run = {'outcome': 'success'}
+    start = time.perf_counter()
+    try:
+        yield run
+    except Exception:
+        run['outcome'] = 'error'
+        raise
+    finally:
+        record_loader(loader, time.perf_counter() - start, run['outcome'])
+
+
+def _named_cache_requests():
+    samples = {}
+    for cache in get_named_caches():
+        samples[(cache.name, 'hit')] = cache.hits
+        samples[(cache.name, 'miss')] = cache.misses
+    return samples
+
+
+def _shared_cache_operations():
+    state = get_shared_cache_state()
+    return {(name,): state[name] for name in ('hits', 'misses', 'loads', 'waits', 'fallbacks', 'errors')}
+
+
+register_metric_callback('cache_requests_total', 'counter', CACHE_REQUESTS.help, ['cache', 'result'], _named_cache_requests)
+register_metric_callback('cache_evictions_total', 'counter', 'LRU cache evictions by cache', ['cache'],
+                         lambda: {(cache.name,): cache.evictions for cache in get_named_caches()})
+register_metric_callback('cache_entries', 'gauge', 'Entries held by each LRU cache', ['cache'],
+                         lambda: {(cache.name,): len(cache) for cache in get_named_caches()})
+register_metric_callback('shared_cache_operations_total', 'counter',
+                         'Shared cache tier lookups by result (hits, misses, loads, waits, fallbacks, errors)', ['result'],
+                         _shared_cache_operations)
+
+
+# ============================================================================
+# COLLECTION AND EXPOSITION
+# ============================================================================
+
+def _callback_samples(name, kind, fn, baselines):
+    try:
+        samples = fn()
+    except Exception as e:
+        logger.warning(f"⚠️ Metrics callback for {name} failed: {e}")
+        return {}
+    if kind == 'counter':
+        # Counts inherited from the master before a fork belong to the master
+        samples = {labels: value - baselines.get((name, labels), 0) for labels, value in samples.items()}
+    return samples
+
+
+def collect_metrics():
+    """
+    Collect this worker's metrics
+
+    Returns:
+        dict of name -> {'type', 'help', 'label_names', 'buckets' (histograms),
+        'samples': {label values tuple -> value}}; histogram values are
+        (per-bucket counts, sum, count)
+    """
+    with _registry['lock']:
+        metrics = list(_registry['metrics'].values())
+        callbacks = list(_registry['callbacks'])
+        baselines = dict(_registry['baselines'])
+
+    families = {}
+    for metric in metrics:
+        families[metric.name] = {
+            'type': metric.kind,
+            'help': metric.help,
+            'label_names': metric.label_names,
+            'buckets': getattr(metric, 'buckets', None),
+            'samples': metric.samples()
+        }
+
+    for name, kind, help_text, label_names, fn in callbacks:
+        family = families.setdefault(name, {
+            'type': kind, 'help': help_text, 'label_names': label_names, 'buckets': None, 'samples': {}
+        })
+        for labels, value in _callback_samples(name, kind, fn, baselines).items():
+            family['samples'][labels] = family['samples'].get(labels, 0) + value
+    return families
+
+
+def _merge_worker_metrics(snapshots):
+    """Sum counters and histograms across workers; gauges get a worker label"""
+    merged = {}
+    for snapshot in snapshots:
+        worker = str(snapshot['pid'])
+        for name, family in snapshot['families'].items():
+            target = merged.get(name)
+            if target is None:
+                label_names = family['label_names'] + (('worker',) if family['type'] == 'gauge' else ())
+                target = dict(family, label_names=label_names, samples={})
+                merged[name] = target
+
+            for labels, value in family['samples'].items():
+                if family['type'] == 'gauge':
+                    target['samples'][labels + (worker,)] = value
+                elif family['type'] == 'histogram':
+                    current = target['samples'].get(labels)
+                    if current is None:
+                        target['samples'][labels] = (list(value[0]), value[1], value[2])
+                    else:
+                        counts = [a + b for a, b in zip(current[0], value[0])]
+                        target['samples'][labels] = (counts, current[1] + value[1], current[2] + value[2])
+                else:
+                    target['samples'][labels] = target['samples'].get(labels, 0) + value
+    return merged
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"' for name, value in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def format_prometheus(families):
+    """
+    Render metric families in the Prometheus text exposition format (version 0.0.4)
+
+    Args:
+        families: dict from collect_metrics (or merged across workers)
+
+    Returns:
+        str ending in a newline
+    """
+    lines = []
+    for name, family in sorted(families.items()):
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        names = family['label_names']
+        for labels, value in sorted(family['samples'].items()):
+            if family['type'] != 'histogram':
+                lines.append(f"{name}{_format_labels(names, labels)} {_format_value(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(family['buckets'], counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(names, labels, ('le', _format_value(float(bound))))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(names, labels, ('le', '+Inf'))} {count}")
+            lines.append(f"{name}_sum{_format_labels(names, labels)} {_format_value(float(total))}")
+            lines.append(f"{name}_count{_format_labels(names, labels)} {count}")
+    return '\n'.join(lines) + '\n'
+
+
+def publish_metrics(families=None):
+    """
+    Publish this worker's metrics to the shared cache tier for /metrics on any worker
+
+    Args:
+        families: already collected metrics (default: collect now)
+    """
+    shared_cache_set(f'{_SHARED_KEY_PREFIX}{os.getpid()}',
+                     {'pid': os.getpid(), 'families': families if families is not None else collect_metrics()},
+                     METRICS_PUBLISH_SECONDS * _SHARED_TTL_INTERVALS)
+    with _publisher['lock']:
+        _publisher['published'] += 1
+        _publisher['last_published_at'] = time.time()
+
+
+def render_metrics():
+    """
+    Render the metrics of every live worker on this host (Prometheus text format)
+    This worker's values are published first, so they are always current
+
+    Returns:
+        str: exposition text, including metrics_workers_reporting
+    """
+    families = collect_metrics()
+    snapshots = []
+    if shared_cache_available():
+        publish_metrics(families)
+        snapshots = [value for value, _ in shared_cache_get_prefix(_SHARED_KEY_PREFIX).values()]
+    if not snapshots:
+        snapshots = [{'pid': os.getpid(), 'families': families}]
+
+    merged = _merge_worker_metrics(snapshots)
+    merged['metrics_workers_reporting'] = {
+        'type': 'gauge', 'help': 'Worker processes whose metrics are included', 'label_names': (),
+        'buckets': None, 'samples': {(): len(snapshots)}
+    }
+    return format_prometheus(merged)
+
+
+# ============================================================================
+# PUBLISHER THREAD
+# ============================================================================
+
+def _publish_loop(stop_event):
+    """Periodic publish (daemon thread started by start_metrics_publisher)"""
+    while not stop_event.wait(METRICS_PUBLISH_SECONDS):
+        try:
+            publish_metrics()
+        except Exception as e:
+            logger.warning(f"⚠️ Metrics publish failed: {e}")
+
+
+def start_metrics_publisher():
+    """Start the periodic publisher thread (no-op if it is running or the shared tier is unavailable)"""
+    if not shared_cache_available():
+        logger.info("📊 Metrics: shared cache unavailable - /metrics reports the answering worker only")
+        return
+    with _publisher['lock']:
+        thread = _publisher['thread']
+        if thread is not None and thread.is_alive():
+            return
+        stop_event = Event()
+        _publisher['stop'] = stop_event
+        _publisher['thread'] = Thread(target=_publish_loop, args=(stop_event,), name='metrics-publisher', daemon=True)
+        _publisher['thread'].start()
+    logger.info(f"📊 Metrics publisher started (every {METRICS_PUBLISH_SECONDS}s)")
+
+
+def stop_metrics_publisher(timeout=None):
+    """Stop the publisher thread, waiting up to timeout seconds for it to exit"""
+    with _publisher['lock']:
+        thread = _publisher['thread']
+        stop_event = _publisher['stop']
+        _publisher['thread'] = None
+    if stop_event is not None:
+        stop_event.set()
+    if thread is not None and timeout is not None:
+        thread.join(timeout)
+
+
+def get_metrics_state():
+    """
+    Get metrics registry and publisher state for diagnostics
+
+    Returns:
+        dict with metrics (registered names), callbacks, publisher_running,
+        published and last_published_age_s
+    """
+    with _registry['lock']:
+        names = sorted(_registry['metrics'])
+        callbacks = len(_registry['callbacks'])
+    with _publisher['lock']:
+        thread = _publisher['thread']
+        last_published_at = _publisher['last_published_at']
+        return {
+            'metrics': names,
+            'callbacks': callbacks,
+            'publisher_running': thread is not None and thread.is_alive(),
+            'published': _publisher['published'],
+            'last_published_age_s': time.time() - last_published_at if last_published_at else None
+        }
+
+
+# ============================================================================
+# FORK HANDLING (gunicorn --preload)
+# ============================================================================
+# The master stops publishing and withdraws its entry before forking; each
+# worker starts from empty values (warm-up in the master is not its traffic)
+# and publishes under its own PID
+# ============================================================================
+
+def _stop_publisher_before_fork():
+    stop_metrics_publisher(timeout=10)
+    shared_cache_delete(f'{_SHARED_KEY_PREFIX}{os.getpid()}')
+
+
+def _reset_metrics_after_fork():
+    was_publishing = _publisher['stop'] is not None
+    _registry['lock'] = Lock()
+    _publisher.update({'thread': None, 'stop': None, 'published': 0, 'last_published_at': None, 'lock': Lock()})
+    for metric in _registry['metrics'].values():
+        metric._reset()
+
+    # Callback counters read process-wide state the child inherited - count from here
+    baselines = {}
+    for name, kind, _, _, fn in _registry['callbacks']:
+        if kind == 'counter':
+            for labels, value in _callback_samples(name, kind, fn, {}).items():
+                baselines[(name, labels)] = value
+    _registry['baselines'] = baselines
+
+    if was_publishing:
+        start_metrics_publisher()
+
+
+register_fork_hooks('metrics', _stop_publisher_before_fork, _reset_metrics_after_fork)
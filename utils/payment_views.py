@@ -0,0 +1,75 @@
+"""
+Precomputed payment-history views for resident records
+The enrolled payment window is derived once when residents are loaded or their
+enrollment changes and stored on the record, so templates read a ready list
+instead of parsing enrollment and payment dates on every render
+"""
+from datetime import datetime
+
+
+def get_enrollment_start(enrollment_history):
+    """
+    Get the first enrollment timestamp from an enrollment history
+
+    Returns:
+        str timestamp ('YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'), or None if never enrolled
+    """
+    for event in enrollment_history or []:
+        if event.get('action') == 'enrolled':
+            return event.get('timestamp')
+    return None
+
+
+def compute_enrolled_payments(payments, enrollment_history):
+    """Filter payments to only those that occurred during enrolled periods"""
+    if not payments or not enrollment_history:
+        return []
+
+    enrollment_date = get_enrollment_start(enrollment_history)
+    if not enrollment_date:
+        return []
+
+    # Parse enrollment date (could be datetime string or date string)
+    try:
+        if ' ' in enrollment_date:  # datetime format
+            enrollment_dt = datetime.strptime(enrollment_date, '%Y-%m-%d %H:%M:%S')
+        else:  # date only format
+            enrollment_dt = datetime.strptime(enrollment_date, '%Y-%m-%d')
+    except (ValueError, TypeError):
+        return list(payments)  # If we can't parse, return all payments
+
+    # Filter payments to only those on or after enrollment date
+    filtered_payments = []
+    for payment in payments:
+        payment_date_str = payment.get('payment_date')
+        if payment_date_str:
+            try:
+                payment_dt = datetime.strptime(payment_date_str, '%Y-%m-%d')
+                if payment_dt >= enrollment_dt:
+                    filtered_payments.append(payment)
+            except (ValueError, TypeError):
+                continue
+
+    return filtered_payments
+
+
+def refresh_payment_views(resident):
+    """
+    Recompute a resident's precomputed payment views in place
+    Call after the resident's payments or enrollment_history change
+
+    Sets:
+        enrolled_since: first enrollment timestamp (None if never enrolled)
+        enrolled_payments: payments made on or after enrolled_since
+    """
+    enrollment_history = resident.get('enrollment_history', [])
+    resident['enrolled_since'] = get_enrollment_start(enrollment_history)
+    resident['enrolled_payments'] = compute_enrolled_payments(resident.get('payments', []), enrollment_history)
+    return resident
+
+
+def attach_payment_views(residents):
+    """Compute payment views for every resident in a freshly loaded list"""
+    for resident in residents:
+        refresh_payment_views(resident)
+    return residents
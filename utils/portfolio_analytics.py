@@ -0,0 +1,292 @@
+"""
+Portfolio analytics for admin dashboards
+Aggregates resident data portfolio-wide, per property and per property x month
+These run once when a resident snapshot is built and the results are stored on
+the snapshot, so dashboards and JSON endpoints only do dictionary lookups
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_PROPERTY = 'Unassigned'
+HISTORY_FRAME_COLUMNS = [
+    'property', 'account', 'month', 'balance', 'days_late', 'amount',
+    'collected', 'scheduled', 'aged_30_59', 'aged_60_89', 'aged_90_plus'
+]
+TREND_MAX_MONTHS = 24
+
+
+def compute_portfolio_stats(source_residents, data_source='test', log_breakdown=True):
+    """
+    Calculate portfolio-wide dashboard statistics from resident data
+
+    Args:
+        source_residents: list of resident dicts
+        data_source: data source name (used for diagnostic logging only)
+        log_breakdown: log the outstanding balance breakdown (off for per-property roll-ups)
+
+    Returns:
+        dict with enrollment, delinquency, balance and aging statistics
+    """
+    # Calculate statistics from resident data
+    total_residents = len(source_residents)
+    enrolled_residents = [r for r in source_residents if r.get('enrolled', False)]
+
+    # Active leases - residents with active status
+    active_leases = [r for r in source_residents if r.get('resident_status', '').lower() in ['active', 'current', ''] or r.get('enrollment_status') == 'enrolled']
+
+    # Reporting this cycle - enrolled residents who are set to report
+    reporting_this_cycle = [r for r in source_residents if r.get('enrolled', False) and r.get('tradeline_created', False)]
+
+    # Account status breakdowns
+    current_accounts = [r for r in source_residents if r.get('account_status', '') == 'Current']
+
+    # Delinquent 30-89 days (early stage)
+    delinquent_30_89 = [r for r in source_residents if r.get('days_late', 0) >= 30 and r.get('days_late', 0) < 90]
+
+    # Severely delinquent 90+ days
+    delinquent_90_plus = [r for r in source_residents if r.get('days_late', 0) >= 90]
+
+    # Calculate total outstanding balance
+    total_outstanding = sum(r.get('total_balance', 0) if r.get('total_balance', 0) > 0 else r.get('amount_past_due', 0) for r in source_residents)
+
+    # Diagnostic logging for outstanding balances
+    residents_with_balance = [r for r in source_residents if r.get('total_balance', 0) > 0]
+    if log_breakdown and residents_with_balance:
+        logger.info(f"📊 OUTSTANDING BALANCE BREAKDOWN (Data Source: {data_source}):")
+        logger.info(f"   Total Outstanding: ${total_outstanding:,.2f}")
+        logger.info(f"   Residents with balance: {len(residents_with_balance)}")
+        for r in residents_with_balance[:10]:  # Log first 10
+            logger.info(f"      {r.get('name', 'Unknown')}: ${r.get('total_balance', 0):,.2f} (days_late={r.get('days_late', 0)})")
+        if len(residents_with_balance) > 10:
+            logger.info(f"      ... and {len(residents_with_balance) - 10} more")
+
+    # Calculate average days late (only for delinquent accounts)
+    delinquent_with_days = [r.get('days_late', 0) for r in source_residents if r.get('days_late', 0) > 0]
+    avg_days_late = sum(delinquent_with_days) / len(delinquent_with_days) if delinquent_with_days else 0
+
+    # Monthly revenue potential
+    total_monthly_revenue = sum(r.get('scheduled_monthly_payment', 0) for r in source_residents)
+
+    # Total last payment amounts
+    total_last_payments = sum(r.get('last_payment_amount', 0) for r in source_residents)
+
+    # Collection rate - calculate based on expected vs collected
+    expected_revenue = total_monthly_revenue
+    collection_rate = (total_last_payments / expected_revenue * 100) if expected_revenue > 0 else 0
+
+    # Aging bucket details
+    aged_30_59_residents = [r for r in source_residents if r.get('aged_30_59', 0) > 0 or (r.get('days_late', 0) >= 30 and r.get('days_late', 0) < 60)]
+    aged_30_59_amount = sum(r.get('aged_30_59', 0) if r.get('aged_30_59', 0) > 0 else r.get('amount_past_due', 0) for r in aged_30_59_residents)
+
+    aged_60_89_residents = [r for r in source_residents if r.get('aged_60_89', 0) > 0 or (r.get('days_late', 0) >= 60 and r.get('days_late', 0) < 90)]
+    aged_60_89_amount = sum(r.get('aged_60_89', 0) if r.get('aged_60_89', 0) > 0 else r.get('amount_past_due', 0) for r in aged_60_89_residents)
+
+    aged_90_plus_residents = [r for r in source_residents if r.get('aged_90_plus', 0) > 0 or r.get('days_late', 0) >= 90]
+    aged_90_plus_amount = sum(r.get('aged_90_plus', 0) if r.get('aged_90_plus', 0) > 0 else r.get('amount_past_due', 0) for r in aged_90_plus_residents)
+
+    return {
+        'total_residents': total_residents,
+        'enrolled_count': len(enrolled_residents),
+        'active_leases': len(active_leases),
+        'reporting_this_cycle': len(reporting_this_cycle),
+        'current_accounts': len(current_accounts),
+        'delinquent_30_89': len(delinquent_30_89),
+        'delinquent_90_plus': len(delinquent_90_plus),
+        'total_outstanding': total_outstanding,
+        'avg_days_late': round(avg_days_late, 1),
+        'total_monthly_revenue': total_monthly_revenue,
+        'total_last_payments': total_last_payments,
+        'collection_rate': round(collection_rate, 1),
+        # Aging details
+        'aged_30_59_count': len(aged_30_59_residents),
+        'aged_30_59_amount': aged_30_59_amount,
+        'aged_60_89_count': len(aged_60_89_residents),
+        'aged_60_89_amount': aged_60_89_amount,
+        'aged_90_plus_count': len(aged_90_plus_residents),
+        'aged_90_plus_amount': aged_90_plus_amount,
+    }
+
+
+def _property_name(resident):
+    """Normalized property name used as the roll-up key"""
+    return str(resident.get('property') or '').strip() or UNKNOWN_PROPERTY
+
+
+def compute_property_rollup(source_residents):
+    """
+    Group residents by property and compute the dashboard statistics for each
+
+    Args:
+        source_residents: list of resident dicts
+
+    Returns:
+        dict of property name -> stats dict (same keys as compute_portfolio_stats),
+        ordered by property name
+    """
+    residents_by_property = {}
+    for r in source_residents:
+        residents_by_property.setdefault(_property_name(r), []).append(r)
+
+    return {
+        property_name: compute_portfolio_stats(residents_by_property[property_name], log_breakdown=False)
+        for property_name in sorted(residents_by_property)
+    }
+
+
+def build_payment_history_frame(source_residents):
+    """
+    Flatten resident payment histories into one DataFrame
+
+    Residents on the same lease (CredHub) share a payment history, so rows are
+    de-duplicated per account and month to avoid double counting balances.
+    Records without aging-bucket amounts (test / SharePoint data) get their
+    balance bucketed by days late
+
+    Args:
+        source_residents: list of resident dicts with a 'payments' list
+
+    Returns:
+        DataFrame with columns property, account, month (YYYY-MM), balance,
+        days_late, amount, collected, scheduled, aged_30_59, aged_60_89
+        and aged_90_plus
+    """
+    rows = []
+    for r in source_residents:
+        property_name = _property_name(r)
+        account = r.get('lease_id') or f"resident-{r.get('id')}"
+        scheduled = r.get('scheduled_monthly_payment', 0)
+        for p in r.get('payments') or []:
+            rows.append((
+                property_name,
+                account,
+                p.get('as_of_date') or p.get('payment_date') or p.get('date_paid'),
+                p.get('total_balance', p.get('amount_past_due', 0)),
+                p.get('days_late', 0),
+                p.get('amount', 0),
+                p.get('last_payment_amount', p.get('amount', 0)),
+                p.get('scheduled_payment', scheduled),
+                p.get('aged_30_59'),
+                p.get('aged_60_89'),
+                p.get('aged_90_plus')
+            ))
+
+    import pandas as pd  # Imported on the first snapshot build - keeps pandas out of worker boot
+
+    frame = pd.DataFrame(rows, columns=['property', 'account', 'date'] + HISTORY_FRAME_COLUMNS[3:])
+    if frame.empty:
+        return pd.DataFrame(columns=HISTORY_FRAME_COLUMNS)
+
+    dates = pd.to_datetime(frame['date'].astype(str).str[:10], format='%Y-%m-%d', errors='coerce')
+    frame = frame.assign(month=dates.dt.strftime('%Y-%m')).drop(columns=['date'])
+    frame = frame.dropna(subset=['month'])[HISTORY_FRAME_COLUMNS].copy()
+    for column in ('balance', 'days_late', 'amount', 'collected', 'scheduled'):
+        frame[column] = pd.to_numeric(frame[column], errors='coerce').fillna(0)
+
+    # Fill missing aging buckets from days late, matching compute_portfolio_stats
+    days_late = frame['days_late']
+    bucket_ranges = {
+        'aged_30_59': (days_late >= 30) & (days_late < 60),
+        'aged_60_89': (days_late >= 60) & (days_late < 90),
+        'aged_90_plus': days_late >= 90
+    }
+    for column, in_bucket in bucket_ranges.items():
+        fallback = frame['balance'].where(in_bucket, 0)
+        frame[column] = pd.to_numeric(frame[column], errors='coerce').fillna(fallback)
+
+    return frame.drop_duplicates(subset=['account', 'month'], keep='first').reset_index(drop=True)
+
+
+def compute_property_month_rollup(history_frame):
+    """
+    Aggregate the payment history frame by property and month
+
+    Args:
+        history_frame: DataFrame from build_payment_history_frame
+
+    Returns:
+        dict of property name -> list of month dicts (oldest first) with
+        accounts, late_count, delinquent_30_89, delinquent_90_plus,
+        outstanding and billed
+    """
+    if history_frame.empty:
+        return {}
+
+    days_late = history_frame['days_late']
+    grouped = history_frame.assign(
+        late=(days_late > 0).astype(int),
+        delinquent_30_89=((days_late >= 30) & (days_late < 90)).astype(int),
+        delinquent_90_plus=(days_late >= 90).astype(int)
+    ).groupby(['property', 'month'], sort=True).agg(
+        accounts=('account', 'nunique'),
+        late_count=('late', 'sum'),
+        delinquent_30_89=('delinquent_30_89', 'sum'),
+        delinquent_90_plus=('delinquent_90_plus', 'sum'),
+        outstanding=('balance', 'sum'),
+        billed=('amount', 'sum')
+    ).reset_index()
+
+    rollup = {}
+    for row in grouped.itertuples(index=False):
+        rollup.setdefault(row.property, []).append({
+            'month': row.month,
+            'accounts': int(row.accounts),
+            'late_count': int(row.late_count),
+            'delinquent_30_89': int(row.delinquent_30_89),
+            'delinquent_90_plus': int(row.delinquent_90_plus),
+            'outstanding': round(float(row.outstanding), 2),
+            'billed': round(float(row.billed), 2)
+        })
+    return rollup
+
+
+def compute_trend_series(history_frame, months=TREND_MAX_MONTHS):
+    """
+    Build month-by-month portfolio delinquency series from the payment history frame
+
+    Args:
+        history_frame: DataFrame from build_payment_history_frame
+        months: number of most recent months to include
+
+    Returns:
+        dict with a 'months' label list and one aligned list per series:
+        outstanding, aged_30_59_count/amount, aged_60_89_count/amount,
+        aged_90_plus_count/amount and collection_rate
+    """
+    series_names = [
+        'outstanding',
+        'aged_30_59_count', 'aged_30_59_amount',
+        'aged_60_89_count', 'aged_60_89_amount',
+        'aged_90_plus_count', 'aged_90_plus_amount',
+        'collection_rate'
+    ]
+    if history_frame.empty:
+        return dict({'months': []}, **{name: [] for name in series_names})
+
+    monthly = history_frame.assign(
+        aged_30_59_count=(history_frame['aged_30_59'] > 0).astype(int),
+        aged_60_89_count=(history_frame['aged_60_89'] > 0).astype(int),
+        aged_90_plus_count=(history_frame['aged_90_plus'] > 0).astype(int)
+    ).groupby('month', sort=True).agg(
+        outstanding=('balance', 'sum'),
+        aged_30_59_count=('aged_30_59_count', 'sum'),
+        aged_30_59_amount=('aged_30_59', 'sum'),
+        aged_60_89_count=('aged_60_89_count', 'sum'),
+        aged_60_89_amount=('aged_60_89', 'sum'),
+        aged_90_plus_count=('aged_90_plus_count', 'sum'),
+        aged_90_plus_amount=('aged_90_plus', 'sum'),
+        collected=('collected', 'sum'),
+        scheduled=('scheduled', 'sum')
+    ).tail(months)
+
+    scheduled = monthly['scheduled']
+    monthly['collection_rate'] = (monthly['collected'] / scheduled.where(scheduled > 0) * 100).fillna(0).round(1)
+
+    series = {'months': monthly.index.tolist()}
+    for name in series_names:
+        column = monthly[name]
+        if name.endswith('_count'):
+            series[name] = column.astype(int).tolist()
+        else:
+            series[name] = column.astype(float).round(2).tolist()
+    return series
@@ -0,0 +1,178 @@
+"""
+Pre-fork support for gunicorn --preload
+With preload the master process imports the app once - startup warm-up
+(JWKS, Graph token, site ID, verification index) and any resident snapshots
+listed in PREFORK_SNAPSHOT_SOURCES run there - and the workers are forked
+from it, so they start warm and share the loaded data copy-on-write.
+
+Modules the app imports lazily (pandas, openpyxl, msal, Fernet - deferred to
+keep non-preloaded worker boot fast) are imported here first, so preloaded
+workers inherit them instead of each paying for the import on first use.
+
+Before the first fork, prepare_for_fork() stops every background thread (log
+listener, token renewal, index sync) so no lock is held mid-operation when
+the process is copied, then gc.freeze() moves everything loaded so far into
+the permanent generation: the cyclic GC never touches those objects again,
+so their pages are not dirtied (and copied) by collections in the workers.
+Each forked child restarts its own background threads through the hooks
+registered here (os.register_at_fork), whether or not the master prepared.
+
+Environment:
+    PREFORK_SNAPSHOT_SOURCES: resident snapshots to build in the master,
+        e.g. 'test,credhub' (default: none)
+    PREFORK_IMPORT_MODULES: lazily imported modules to import in the master
+        (comma-separated; default pandas, openpyxl export, msal, Fernet)
+"""
+import gc
+import os
+import importlib
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PREFORK_SNAPSHOT_SOURCES = [
+    name.strip().lower() for name in os.environ.get('PREFORK_SNAPSHOT_SOURCES', '').split(',') if name.strip()
+]
+
+PREFORK_IMPORT_MODULES = [
+    name.strip() for name in os.environ.get(
+        'PREFORK_IMPORT_MODULES', 'pandas,utils.excel_export,msal,cryptography.fernet'
+    ).split(',') if name.strip()
+]
+
+# Longest wait for background threads to finish their current work before forking
+PREFORK_THREAD_JOIN_SECONDS = 10
+
+_fork_hooks = []  # (name, before_fork, after_fork_in_child)
+
+_prefork_state = {
+    'prepared_at': None,
+    'prepare_ms': None,
+    'frozen_objects': 0,
+    'forked_from': None  # Parent PID when this process is a forked child
+}
+
+
+def register_fork_hooks(name, before_fork=None, after_fork_in_child=None, first=False):
+    """
+    Register a module's fork handling
+    After a fork, hooks run in registration order; before a fork, in reverse
+
+    Args:
+        name: module name for logs
+        before_fork: called by prepare_for_fork() in the master (stop background threads)
+        after_fork_in_child: called in every forked child (restart background threads,
+            drop per-process resources)
+        first: run this module's child hook before all others (and its
+            before-fork hook after them) - used by logging
+    """
+    hooks = (name, before_fork, after_fork_in_child)
+    if first:
+        _fork_hooks.insert(0, hooks)
+    else:
+        _fork_hooks.append(hooks)
+
+
+def _rss_mb():
+    """Resident set size of this process in MB (Linux; None elsewhere)"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _import_lazy_modules():
+    """Import PREFORK_IMPORT_MODULES in the master so every forked worker shares them"""
+    for name in PREFORK_IMPORT_MODULES:
+        import_start = time.time()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"⚠️ Pre-fork import of {name} failed (workers import it on first use): {e}")
+            continue
+        logger.info(f"📦 Pre-fork import: {name} in {(time.time() - import_start) * 1000:.1f}ms")
+
+
+def prepare_for_fork(warm=None):
+    """
+    Get the master process ready to fork workers (call once, from gunicorn when_ready)
+
+    Args:
+        warm: optional callable run after the lazy module imports (e.g. building resident snapshots)
+
+    Returns:
+        dict with prepare_ms, frozen_objects and rss_mb
+    """
+    prepare_start = time.time()
+    _import_lazy_modules()
+
+    if warm is not None:
+        try:
+            warm()
+        except Exception as e:
+            logger.error(f"❌ Pre-fork warm-up failed (workers will load on demand): {e}", exc_info=True)
+
+    for name, before_fork, _ in reversed(_fork_hooks):
+        if before_fork is None:
+            continue
+        try:
+            before_fork()
+        except Exception as e:
+            logger.error(f"❌ Pre-fork hook failed for {name}: {e}")
+
+    # One-off daemon threads (background refreshes) finish their current request
+    join_deadline = time.time() + PREFORK_THREAD_JOIN_SECONDS
+    for thread in threading.enumerate():
+        if thread is threading.current_thread() or thread is threading.main_thread():
+            continue
+        thread.join(timeout=max(0.0, join_deadline - time.time()))
+        if thread.is_alive():
+            logger.warning(f"⚠️ Thread {thread.name} still running at fork - its locks may be unusable in workers")
+
+    gc.collect()
+    gc.freeze()
+
+    _prefork_state['prepared_at'] = time.time()
+    _prefork_state['prepare_ms'] = (time.time() - prepare_start) * 1000
+    _prefork_state['frozen_objects'] = gc.get_freeze_count()
+    rss_mb = _rss_mb()
+    logger.info(f"🧊 PREFORK READY: frozen_objects={_prefork_state['frozen_objects']}, "
+                f"rss={rss_mb or 0:.1f}MB, prepare={_prefork_state['prepare_ms']:.1f}ms")
+    return {'prepare_ms': _prefork_state['prepare_ms'], 'frozen_objects': _prefork_state['frozen_objects'], 'rss_mb': rss_mb}
+
+
+def _after_fork_in_child():
+    _prefork_state['forked_from'] = os.getppid()
+    for name, _, after_fork_in_child in _fork_hooks:
+        if after_fork_in_child is None:
+            continue
+        try:
+            after_fork_in_child()
+        except Exception as e:
+            logger.error(f"❌ After-fork hook failed for {name}: {e}")
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def get_prefork_state():
+    """
+    Get pre-fork state for diagnostics
+
+    Returns:
+        dict with preloaded (forked from a prepared master), forked_from,
+        frozen_objects, prepare_ms and rss_mb of this process
+    """
+    return {
+        'preloaded': _prefork_state['prepared_at'] is not None,
+        'forked_from': _prefork_state['forked_from'],
+        'frozen_objects': gc.get_freeze_count(),
+        'prepare_ms': _prefork_state['prepare_ms'],
+        'rss_mb': _rss_mb()
+    }
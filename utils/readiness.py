@@ -0,0 +1,207 @@
+"""
+Startup warm-up runner and readiness registry
+Warm-up targets (JWKS, Graph token, site ID, admin directory, verification
+index, resident snapshots) run concurrently, each on its own daemon thread,
+under one global startup deadline. Targets that need the Graph token simply
+wait on its single-flight acquisition, so total warm-up time is the slowest
+dependency chain rather than the sum of every step.
+
+Targets still running when the deadline passes are not cancelled: they keep
+going in the background and record their result when they finish, while app
+startup continues. Every target's latest result is kept in the readiness
+registry for diagnostics.
+
+Modules also register readiness checks for the caches they own (JWKS, Graph
+token, site ID, ...). evaluate_readiness() runs them - in-memory state only,
+no network calls - and backs the /ready endpoint, so a load balancer only
+routes traffic to workers whose caches have been warmed. A check only applies
+when its dependency is configured, and passes once the cache has loaded: a
+failing refresh (Entra or Graph outage) must not take every instance out of
+rotation at once while the cached data still serves.
+
+Environment:
+    STARTUP_WARMUP_DEADLINE_MS: longest wait for warm-up at startup (default 20000)
+"""
+import os
+import time
+import logging
+from threading import Lock, Thread, Condition
+
+logger = logging.getLogger(__name__)
+
+STARTUP_WARMUP_DEADLINE_MS = int(os.environ.get('STARTUP_WARMUP_DEADLINE_MS', '20000'))
+
+_readiness_state = {
+    'targets': {},  # name -> {'status', 'started_at', 'finished_at', 'duration_ms', 'error', 'result'}
+    'warmup_started_at': None,
+    'warmup_finished_at': None,  # When startup stopped waiting (all done or deadline)
+    'deadline_ms': None,
+    'lock': Lock()
+}
+_target_finished = Condition(_readiness_state['lock'])
+
+_readiness_checks = []  # (name, check, required, enabled)
+_last_ready = {'ready': None}  # Last evaluate_readiness() outcome, to log transitions only
+
+
+def register_readiness_check(name, check, required=True, enabled=None):
+    """
+    Register a cache readiness check
+
+    Args:
+        name: check name (e.g. 'jwks')
+        check: callable() -> (ready: bool, detail: dict); must not do network I/O
+        required: False to report the check without letting it hold back readiness
+        enabled: optional callable() -> bool, evaluated on every readiness run;
+            the check is skipped while it returns False (dependency not configured)
+    """
+    _readiness_checks.append((name, check, required, enabled))
+
+
+def record_target_result(name, result, started_at=None):
+    """
+    Record a warm-up target's result in the readiness registry
+
+    Args:
+        name: target name (e.g. 'jwks')
+        result: warm-up result dict with at least success and error
+        started_at: time.time() the target started (defaults to now)
+    """
+    now = time.time()
+    with _target_finished:
+        entry = _readiness_state['targets'].setdefault(name, {})
+        entry.update({
+            'status': 'ready' if result.get('success') else 'failed',
+            'started_at': started_at or entry.get('started_at') or now,
+            'finished_at': now,
+            'duration_ms': result.get('duration_ms'),
+            'error': result.get('error'),
+            'result': result
+        })
+        _target_finished.notify_all()
+
+
+def _run_target(name, warmup):
+    started_at = time.time()
+    try:
+        result = warmup()
+    except Exception as e:
+        logger.error(f"❌ Warm-up target {name} raised: {e}", exc_info=True)
+        result = {'success': False, 'duration_ms': (time.time() - started_at) * 1000, 'error': str(e)}
+    record_target_result(name, result, started_at=started_at)
+
+
+def run_warmup_targets(targets, deadline_ms=None):
+    """
+    Run warm-up targets concurrently and wait for them until the deadline
+
+    Args:
+        targets: list of (name, warmup) - warmup() returns a result dict with
+            success, duration_ms and error (the warmup_* convention)
+        deadline_ms: global wait limit (default STARTUP_WARMUP_DEADLINE_MS)
+
+    Returns:
+        dict of name -> result dict; targets still running at the deadline get
+        {'success': False, 'pending': True, 'error': 'still running at startup deadline'}
+    """
+    deadline_ms = STARTUP_WARMUP_DEADLINE_MS if deadline_ms is None else deadline_ms
+    start = time.time()
+    expires_at = start + deadline_ms / 1000
+
+    with _target_finished:
+        _readiness_state['warmup_started_at'] = start
+        _readiness_state['warmup_finished_at'] = None
+        _readiness_state['deadline_ms'] = deadline_ms
+        for name, _ in targets:
+            _readiness_state['targets'][name] = {
+                'status': 'running', 'started_at': start, 'finished_at': None,
+                'duration_ms': None, 'error': None, 'result': None
+            }
+
+    for name, warmup in targets:
+        Thread(target=_run_target, args=(name, warmup), name=f'warmup-{name}', daemon=True).start()
+
+    names = [name for name, _ in targets]
+    with _target_finished:
+        while any(_readiness_state['targets'][name]['status'] == 'running' for name in names):
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                break
+            _target_finished.wait(remaining)
+        _readiness_state['warmup_finished_at'] = time.time()
+
+        results = {}
+        for name in names:
+            entry = _readiness_state['targets'][name]
+            if entry['status'] == 'running':
+                results[name] = {
+                    'success': False,
+                    'pending': True,
+                    'duration_ms': (time.time() - entry['started_at']) * 1000,
+                    'error': 'still running at startup deadline'
+                }
+            else:
+                results[name] = entry['result']
+    return results
+
+
+def get_readiness_state():
+    """
+    Get the readiness registry for diagnostics
+
+    Returns:
+        dict with warmup_ms (time startup waited), deadline_ms and targets:
+        name -> status ('running' | 'ready' | 'failed'), age_s, duration_ms, error
+    """
+    now = time.time()
+    with _readiness_state['lock']:
+        started_at = _readiness_state['warmup_started_at']
+        finished_at = _readiness_state['warmup_finished_at']
+        targets = {
+            name: {
+                'status': entry['status'],
+                'age_s': now - entry['finished_at'] if entry['finished_at'] else None,
+                'duration_ms': entry['duration_ms'],
+                'error': entry['error']
+            }
+            for name, entry in _readiness_state['targets'].items()
+        }
+        deadline_ms = _readiness_state['deadline_ms']
+
+    return {
+        'warmup_ms': (finished_at - started_at) * 1000 if started_at and finished_at else None,
+        'deadline_ms': deadline_ms,
+        'targets': targets
+    }
+
+
+def evaluate_readiness():
+    """
+    Run every registered readiness check
+
+    Returns:
+        dict with ready (all required checks pass), checks (name -> ready,
+        required and the check's detail) and warmup (name -> warm-up target status;
+        errors are left out because /ready is unauthenticated)
+    """
+    checks = {}
+    for name, check, required, enabled in _readiness_checks:
+        if enabled is not None and not enabled():
+            continue
+        try:
+            ready, detail = check()
+        except Exception as e:
+            ready, detail = False, {'error': type(e).__name__}
+        checks[name] = dict(detail, ready=bool(ready), required=required)
+
+    ready = all(entry['ready'] for entry in checks.values() if entry['required'])
+    if ready != _last_ready['ready']:
+        _last_ready['ready'] = ready
+        if ready:
+            logger.info("✅ READINESS: ready - all required caches warm")
+        else:
+            failing = [name for name, entry in checks.items() if entry['required'] and not entry['ready']]
+            logger.warning(f"⚠️ READINESS: not ready - waiting on {', '.join(failing)}")
+
+    warmup = {name: target['status'] for name, target in get_readiness_state()['targets'].items()}
+    return {'ready': ready, 'checks': checks, 'warmup': warmup}
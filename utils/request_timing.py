@@ -0,0 +1,235 @@
+"""
+Per-request timing spans
+Any module can time a block of work inside a request (auth middleware, cache
+lookups, Graph pages, template render); the spans are emitted as a
+Server-Timing response header, so admins see where time goes in the browser
+devtools Network > Timing tab, and aggregated in memory per route. Every
+request's total is also recorded in the metrics registry (utils/metrics.py)
+
+Usage:
+    with timing_span('graph_page', 'tenants') as span:
+        response = requests.get(...)
+        span['desc'] = f'tenants page {page}'
+
+Outside a request (startup warmup, background refresh threads) spans are no-ops
+
+Environment:
+    SERVER_TIMING: 'admin' (default) emits the header only for admin sessions,
+        'all' for every response, 'off' disables the header (route aggregation
+        is always collected)
+"""
+import os
+import re
+import time
+import logging
+from functools import wraps
+from contextlib import contextmanager
+from threading import Lock
+from flask import g, has_app_context, request, session, template_rendered, before_render_template
+from utils.metrics import observe_request
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_MODE = os.environ.get('SERVER_TIMING', 'admin').lower()
+
+# Span names must be HTTP tokens in the Server-Timing header
+_INVALID_NAME_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+
+_route_timings = {
+    'routes': {},  # endpoint -> {'requests', 'total_ms', 'max_ms', 'spans': {name -> {'calls', 'total_ms', 'max_ms'}}}
+    'lock': Lock()
+}
+
+
+def _active_spans():
+    """Get the span list for the current request, or None outside request timing"""
+    if not has_app_context():
+        return None
+    return g.get('_timing_spans')
+
+
+def record_span(name, duration_ms, description=None):
+    """
+    Add an already measured span to the current request (no-op outside a request)
+
+    Args:
+        name: span name (e.g. 'auth', 'graph_page')
+        duration_ms: elapsed time in milliseconds
+        description: optional detail shown next to the span in devtools
+    """
+    spans = _active_spans()
+    if spans is not None:
+        spans.append({'name': name, 'dur': duration_ms, 'desc': description})
+
+
+@contextmanager
+def timing_span(name, description=None):
+    """
+    Time the enclosed block as a span of the current request
+
+    Args:
+        name: span name
+        description: optional detail; can also be set via span['desc'] inside the block
+
+    Yields:
+        dict with a 'desc' key the block may update (e.g. to 'hit' or 'miss')
+    """
+    span = {'desc': description}
+    if _active_spans() is None:
+        yield span
+        return
+
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        record_span(name, (time.perf_counter() - start) * 1000, span['desc'])
+
+
+def timed_span(name):
+    """Decorator form of timing_span for whole functions"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            with timing_span(name):
+                return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+def format_server_timing(spans, total_ms):
+    """
+    Build a Server-Timing header value
+
+    Args:
+        spans: list of span dicts recorded during the request
+        total_ms: whole-request duration
+
+    Returns:
+        str like 'auth;dur=1.2, graph_page;dur=85.0;desc="tenants page 1", total;dur=90.3'
+    """
+    parts = []
+    for span in spans:
+        entry = f"{_INVALID_NAME_CHARS.sub('_', span['name'])};dur={span['dur']:.1f}"
+        if span['desc']:
+            entry += ';desc="' + str(span['desc']).replace('\\', '').replace('"', "'") + '"'
+        parts.append(entry)
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ', '.join(parts)
+
+
+def _aggregate_request(endpoint, spans, total_ms):
+    """Fold one request's spans into the per-route totals"""
+    with _route_timings['lock']:
+        route = _route_timings['routes'].get(endpoint)
+        if route is None:
+            route = {'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'spans': {}}
+            _route_timings['routes'][endpoint] = route
+
+        route['requests'] += 1
+        route['total_ms'] += total_ms
+        route['max_ms'] = max(route['max_ms'], total_ms)
+
+        for span in spans:
+            stats = route['spans'].get(span['name'])
+            if stats is None:
+                stats = {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+                route['spans'][span['name']] = stats
+            stats['calls'] += 1
+            stats['total_ms'] += span['dur']
+            stats['max_ms'] = max(stats['max_ms'], span['dur'])
+
+
+def get_route_timing_stats():
+    """
+    Get per-route timing aggregates, slowest routes (by average) first
+
+    Returns:
+        dict of endpoint -> {requests, avg_ms, max_ms, spans}, where each span has
+        calls, avg_per_request_ms (time per request spent in that span), avg_ms (per call)
+        and max_ms
+    """
+    with _route_timings['lock']:
+        snapshot = {
+            endpoint: (route['requests'], route['total_ms'], route['max_ms'], {
+                name: dict(stats) for name, stats in route['spans'].items()
+            })
+            for endpoint, route in _route_timings['routes'].items()
+        }
+
+    result = {}
+    for endpoint, (requests_count, total_ms, max_ms, spans) in snapshot.items():
+        span_stats = {
+            name: {
+                'calls': stats['calls'],
+                'avg_per_request_ms': round(stats['total_ms'] / requests_count, 2),
+                'avg_ms': round(stats['total_ms'] / stats['calls'], 2),
+                'max_ms': round(stats['max_ms'], 2)
+            }
+            for name, stats in sorted(spans.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        }
+        result[endpoint] = {
+            'requests': requests_count,
+            'avg_ms': round(total_ms / requests_count, 2),
+            'max_ms': round(max_ms, 2),
+            'spans': span_stats
+        }
+
+    return dict(sorted(result.items(), key=lambda item: item[1]['avg_ms'], reverse=True))
+
+
+def reset_route_timing_stats():
+    """Drop all per-route aggregates"""
+    with _route_timings['lock']:
+        _route_timings['routes'].clear()
+    logger.info("🔄 Route timing stats cleared")
+
+
+def _should_emit_header():
+    if SERVER_TIMING_MODE == 'all':
+        return True
+    if SERVER_TIMING_MODE == 'admin':
+        return session.get('role') == 'admin'
+    return False
+
+
+def _start_request_timing():
+    g._timing_spans = []
+    g._timing_start = time.perf_counter()
+
+
+def _finish_request_timing(response):
+    spans = g.pop('_timing_spans', None)
+    if spans is None:
+        return response
+
+    total_ms = (time.perf_counter() - g.pop('_timing_start')) * 1000
+    endpoint = request.endpoint or 'unmatched'
+    _aggregate_request(endpoint, spans, total_ms)
+    observe_request(endpoint, request.method, response.status_code, total_ms / 1000)
+
+    if _should_emit_header():
+        response.headers['Server-Timing'] = format_server_timing(spans, total_ms)
+    return response
+
+
+def _template_render_started(sender, template, context, **extra):
+    if _active_spans() is not None:
+        g._timing_render_start = time.perf_counter()
+
+
+def _template_render_finished(sender, template, context, **extra):
+    start = g.pop('_timing_render_start', None) if _active_spans() is not None else None
+    if start is not None:
+        record_span('render', (time.perf_counter() - start) * 1000, template.name)
+
+
+def init_request_timing(app):
+    """
+    Register request timing hooks on the Flask app
+    The start hook is placed first so spans cover every other before_request hook
+    """
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request_timing)
+    app.after_request(_finish_request_timing)
+    before_render_template.connect(_template_render_started, app)
+    template_rendered.connect(_template_render_finished, app)
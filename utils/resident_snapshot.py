@@ -0,0 +1,256 @@
+"""
+Resident snapshot cache for admin views
+Keeps the most recently loaded resident list per data source together with
+its precomputed portfolio and per-property aggregates and a version string, so dashboards and
+JSON endpoints can serve repeat requests without reloading or recomputing
+"""
+import os
+import logging
+import time
+import hashlib
+import json
+from threading import Lock
+from utils.lru_cache import LRUCache
+from utils.request_timing import timing_span
+from utils.shared_cache import shared_cache_get_or_load
+from utils.metrics import record_cache_lookup, observe_loader, register_metric_callback
+from utils.portfolio_analytics import (
+    compute_portfolio_stats, compute_property_rollup, build_payment_history_frame,
+    compute_property_month_rollup, compute_trend_series, TREND_MAX_MONTHS
+)
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# RESIDENT SNAPSHOT CACHING FOR PERFORMANCE
+# ============================================================================
+# Each data source ('test', 'sharepoint', 'credhub') gets one snapshot
+# Snapshots expire after a TTL or when explicitly invalidated (e.g. enrollment
+# changes). The version used for ETags is derived from the data, so every
+# worker serving the same residents reports the same version
+# ============================================================================
+
+RESIDENT_SNAPSHOT_TTL_SECONDS = int(os.environ.get('RESIDENT_SNAPSHOT_TTL_SECONDS', '300'))  # 5 minutes
+
+# Remote sources whose downloaded resident lists are shared with the other
+# workers on this host (one download per TTL instead of one per worker).
+# 'test' stays per-process: its records are edited in memory
+SHARED_SNAPSHOT_SOURCES = ('sharepoint', 'credhub')
+
+_resident_snapshot_cache = {
+    'snapshots': {},  # data_source -> snapshot dict
+    'data_generations': {},  # data_source -> count of invalidations (in-memory record edits)
+    'lock': Lock()
+}
+
+# Trend series are derived lazily from a snapshot's history frame, keyed by
+# (snapshot version, months) so a rebuilt snapshot never serves stale series
+_trend_series_cache = LRUCache(32, name='trend_series')
+
+
+def build_resident_snapshot(data_source, source_residents, source='request_path', loaded_at=None, store=True):
+    """
+    Build a new snapshot for a data source and store it in the cache
+
+    Args:
+        data_source: 'test', 'sharepoint' or 'credhub'
+        source_residents: list of resident dicts for this source
+        source: 'startup_warmup' or 'request_path' - tracks where the snapshot was built
+        loaded_at: shared-tier timestamp of the downloaded residents (None = loaded
+            by this process just now); the snapshot expires RESIDENT_SNAPSHOT_TTL_SECONDS
+            after it, and it names the version so workers sharing the download agree
+        store: False to build without caching it (e.g. an empty placeholder)
+
+    Returns:
+        snapshot dict
+    """
+    build_start = time.time()
+    source_residents = list(source_residents)
+    stats = compute_portfolio_stats(source_residents, data_source)
+    property_rollup = compute_property_rollup(source_residents)
+    history_frame = build_payment_history_frame(source_residents)
+    property_month_rollup = compute_property_month_rollup(history_frame)
+
+    if loaded_at is not None:
+        version = f"{data_source}-{int(loaded_at * 1000)}"
+    else:
+        # No shared download to name it by: hash the records, so identical data
+        # gets the same version in every worker and across restarts
+        digest = hashlib.sha256(json.dumps(source_residents, sort_keys=True, default=str).encode('utf-8'))
+        version = f"{data_source}-{digest.hexdigest()[:16]}"
+
+    with _resident_snapshot_cache['lock']:
+        now = time.time()
+        snapshot = {
+            'data_source': data_source,
+            'residents': source_residents,
+            'residents_by_id': {r.get('id'): r for r in source_residents},
+            'stats': stats,
+            'property_rollup': property_rollup,
+            'property_month_rollup': property_month_rollup,
+            'history_frame': history_frame,
+            'version': version,
+            'loaded_at': loaded_at or now,
+            'expires_at': (loaded_at or now) + RESIDENT_SNAPSHOT_TTL_SECONDS,
+            'source': source
+        }
+        if store:
+            _resident_snapshot_cache['snapshots'][data_source] = snapshot
+
+    build_ms = (time.time() - build_start) * 1000
+    logger.info(f"✅ Resident snapshot built: data_source={data_source}, residents={len(source_residents)}, version={snapshot['version']}, build={build_ms:.1f}ms")
+    return snapshot
+
+
+def get_resident_snapshot(data_source, loader, source='request_path'):
+    """
+    Get the cached resident snapshot for a data source, loading it on a miss
+
+    Args:
+        data_source: 'test', 'sharepoint' or 'credhub'
+        loader: callable returning a list of resident dicts (empty list on failure)
+        source: 'startup_warmup' or 'request_path'
+
+    Returns:
+        snapshot dict, or None if the loader returned no residents
+    """
+    with timing_span('snapshot', f'{data_source} miss') as span:
+        with _resident_snapshot_cache['lock']:
+            snapshot = _resident_snapshot_cache['snapshots'].get(data_source)
+            now = time.time()
+            if snapshot is not None and now < snapshot['expires_at']:
+                span['desc'] = f'{data_source} hit'
+                logger.info(f"✅ Resident snapshot cache HIT (data_source={data_source}, version={snapshot['version']}, age={now - snapshot['loaded_at']:.0f}s)")
+                record_cache_lookup(f'resident_snapshot:{data_source}', hit=True)
+                return snapshot
+
+    # Cache miss - load outside the lock so a slow Graph download does not block other sources
+    logger.info(f"⚠️ Resident snapshot cache MISS - loading data_source={data_source}")
+    record_cache_lookup(f'resident_snapshot:{data_source}', hit=False)
+    with timing_span('snapshot_load', data_source), observe_loader(f'resident_snapshot:{data_source}') as run:
+        if data_source in SHARED_SNAPSHOT_SOURCES:
+            source_residents, origin, loaded_at = shared_cache_get_or_load(
+                f'residents:{data_source}', lambda: loader() or None, ttl_seconds=RESIDENT_SNAPSHOT_TTL_SECONDS
+            )
+            if origin in ('shared', 'waited'):
+                logger.info(f"🔗 Residents for data_source={data_source} taken from shared cache")
+            elif origin == 'local':
+                loaded_at = None  # Not shared - its timestamp is this worker's own
+        else:
+            source_residents, loaded_at = loader(), None
+        if not source_residents:
+            logger.warning(f"⚠️ Resident snapshot load returned no residents (data_source={data_source})")
+            run['outcome'] = 'error'
+            return None
+
+        return build_resident_snapshot(data_source, source_residents, source=source, loaded_at=loaded_at)
+
+
+def get_snapshot_trend_series(snapshot, months=TREND_MAX_MONTHS):
+    """
+    Get month-by-month delinquency series for a snapshot, computing them once per version
+
+    Args:
+        snapshot: snapshot dict
+        months: number of most recent months (capped at TREND_MAX_MONTHS)
+
+    Returns:
+        dict from compute_trend_series
+    """
+    months = max(1, min(int(months), TREND_MAX_MONTHS))
+    key = (snapshot['version'], months)
+    series = _trend_series_cache.get(key)
+    if series is None:
+        compute_start = time.time()
+        series = compute_trend_series(snapshot['history_frame'], months)
+        _trend_series_cache.set(key, series)
+        logger.info(f"📈 Trend series computed: version={snapshot['version']}, months={len(series['months'])}, compute={(time.time() - compute_start) * 1000:.1f}ms")
+    return series
+
+
+def invalidate_resident_snapshot(data_source=None):
+    """
+    Drop cached snapshot(s) so the next access rebuilds with a new version
+    Call after in-memory resident records are modified
+
+    Args:
+        data_source: data source to invalidate, or None for all sources
+    """
+    with _resident_snapshot_cache['lock']:
+        generations = _resident_snapshot_cache['data_generations']
+        for source in ([data_source] if data_source else set(generations) | set(_resident_snapshot_cache['snapshots'])):
+            generations[source] = generations.get(source, 0) + 1
+        if data_source is None:
+            _resident_snapshot_cache['snapshots'].clear()
+        else:
+            _resident_snapshot_cache['snapshots'].pop(data_source, None)
+    logger.info(f"🔄 Resident snapshot invalidated: data_source={data_source or 'all'}")
+
+
+def get_resident_data_generation(data_source):
+    """
+    Get a cheap version of a data source's resident records, for cache keys that
+    must change when records are edited but should not build a snapshot to find out
+
+    Returns:
+        int incremented by every invalidate_resident_snapshot() covering the source
+    """
+    with _resident_snapshot_cache['lock']:
+        return _resident_snapshot_cache['data_generations'].get(data_source, 0)
+
+
+def get_resident_snapshot_state(data_source):
+    """
+    Get current snapshot cache state for diagnostics
+
+    Returns:
+        dict with cache state information
+    """
+    with _resident_snapshot_cache['lock']:
+        now = time.time()
+        snapshot = _resident_snapshot_cache['snapshots'].get(data_source)
+
+        if snapshot is None:
+            return {
+                'present': False,
+                'source': None,
+                'version': None,
+                'age_s': 0,
+                'ttl_remaining_s': 0,
+                'expired': False
+            }
+
+        return {
+            'present': True,
+            'source': snapshot.get('source', 'unknown'),
+            'version': snapshot['version'],
+            'age_s': now - snapshot['loaded_at'],
+            'ttl_remaining_s': max(0, snapshot['expires_at'] - now),
+            'expired': now >= snapshot['expires_at']
+        }
+
+
+def _snapshot_age_metrics():
+    with _resident_snapshot_cache['lock']:
+        now = time.time()
+        return {
+            (f'resident_snapshot:{data_source}',): now - snapshot['loaded_at']
+            for data_source, snapshot in _resident_snapshot_cache['snapshots'].items()
+        }
+
+
+register_metric_callback('cache_age_seconds', 'gauge', 'Age of each snapshot cache since it was loaded', ['cache'], _snapshot_age_metrics)
+
+
+def snapshot_etag(snapshot, resource):
+    """
+    Build a strong ETag for a resource served from a snapshot
+
+    Args:
+        snapshot: snapshot dict
+        resource: resource name (e.g. 'stats', 'residents') so each payload gets its own tag
+
+    Returns:
+        str: hex digest usable as an ETag value
+    """
+    return hashlib.sha256(f"{resource}:{snapshot['version']}".encode('utf-8')).hexdigest()[:32]
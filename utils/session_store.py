@@ -0,0 +1,127 @@
+"""
+Server-side session store
+With signed cookie sessions every assignment to the session - even of an
+unchanged value - re-serializes and re-signs the whole session into a new
+Set-Cookie header. Here the cookie only carries a signed session ID; the
+resolved identity, role and resident ID live in Flask-Session backed by the
+host-wide SQLite tier (utils/shared_cache.py), shared by all workers on the host.
+
+Sessions are written only when a value actually changes (update_session) and
+are not refreshed on every request, so a steady-state request neither writes
+the store nor sends a cookie. A session therefore expires
+PERMANENT_SESSION_LIFETIME after its last change; the Easy Auth middleware
+rebuilds it from the principal headers on the next request.
+
+Everything in the session can be re-derived from Easy Auth, so a lost store
+(instance restart, request landing on another instance) only costs one
+identity resolution. cachelib's FileSystemCache was not used: it replaces a
+file per write, and on ext4 a rename over an existing file forces a flush
+(~40-60ms per session change here), where a WAL commit does not.
+
+Environment:
+    SESSION_BACKEND: 'sqlite' (default) or 'cookie' (signed cookie sessions);
+        falls back to cookies when the shared cache tier is disabled
+"""
+import os
+import logging
+from threading import Lock
+from cachelib import BaseCache
+from utils.shared_cache import shared_cache_get, shared_cache_set, shared_cache_delete, shared_cache_available, get_shared_cache_state
+
+logger = logging.getLogger(__name__)
+
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'sqlite').lower()
+
+_session_store_state = {
+    'backend': 'cookie',
+    'writes_skipped': 0,  # update_session calls where every value was unchanged
+    'writes': 0,  # update_session calls that changed the session
+    'lock': Lock()
+}
+
+
+class SharedCacheSessionStore(BaseCache):
+    """cachelib interface over the shared SQLite tier, for Flask-Session's cachelib backend"""
+
+    def get(self, key):
+        cached = shared_cache_get(key)
+        return cached[0] if cached is not None else None
+
+    def set(self, key, value, timeout=None):
+        shared_cache_set(key, value, timeout or self.default_timeout)
+        return True
+
+    def delete(self, key):
+        shared_cache_delete(key)
+        return True
+
+
+def init_session_store(app):
+    """
+    Configure the Flask session backend (call after the SESSION_COOKIE_* settings)
+
+    Args:
+        app: Flask app
+    """
+    if SESSION_BACKEND != 'sqlite':
+        logger.info("🍪 Sessions: signed cookies (SESSION_BACKEND=cookie)")
+        return
+
+    if not shared_cache_available():
+        shared_state = get_shared_cache_state()
+        logger.warning(f"⚠️ Sessions: shared cache unavailable ({shared_state['disabled_reason']}) - using signed cookies")
+        return
+
+    from flask_session import Session
+
+    app.config['SESSION_TYPE'] = 'cachelib'
+    app.config['SESSION_CACHELIB'] = SharedCacheSessionStore(
+        default_timeout=int(app.permanent_session_lifetime.total_seconds())
+    )
+    app.config['SESSION_PERMANENT'] = True
+    app.config['SESSION_USE_SIGNER'] = True
+    # Write the store (and send the cookie) only when the session changed
+    app.config['SESSION_REFRESH_EACH_REQUEST'] = False
+    Session(app)
+
+    _session_store_state['backend'] = 'sqlite'
+    logger.info(f"🗄️ Sessions: server-side store in {get_shared_cache_state()['path']}")
+
+
+def update_session(session, permanent=False, **values):
+    """
+    Set session values, touching the session only for values that changed
+    Any assignment marks the session modified, which means a store write and a
+    new Set-Cookie header - identical values are skipped
+
+    Args:
+        session: Flask session
+        permanent: mark the session permanent (PERMANENT_SESSION_LIFETIME applies)
+        **values: session keys and values
+
+    Returns:
+        bool: True if the session changed
+    """
+    changed = False
+    if permanent and not session.permanent:
+        session.permanent = True
+        changed = True
+    for key, value in values.items():
+        if key not in session or session[key] != value:
+            session[key] = value
+            changed = True
+
+    with _session_store_state['lock']:
+        _session_store_state['writes' if changed else 'writes_skipped'] += 1
+    return changed
+
+
+def get_session_store_state():
+    """
+    Get session store state for diagnostics
+
+    Returns:
+        dict with backend ('sqlite' or 'cookie'), writes and writes_skipped
+    """
+    with _session_store_state['lock']:
+        return {name: value for name, value in _session_store_state.items() if name != 'lock'}
@@ -0,0 +1,369 @@
+"""
+Host-wide shared cache tier for gunicorn workers
+Every worker process keeps its own in-memory caches, so without sharing N
+workers mean N Graph token acquisitions, N JWKS fetches and N CredHub
+downloads. Entries here live in a SQLite database in WAL mode on local disk
+that all workers on the host read; a refresh is claimed with a short lease,
+so one worker loads each entry while the others wait briefly and pick up
+its result.
+
+The in-memory caches stay the first tier; this module is only consulted on
+their misses and refreshes. Any SQLite problem turns the tier into a pass-through
+(the caller's loader runs locally), never into a failed request.
+
+Values are pickled, so whoever can write the database can run code in the
+app: the default location is a directory private to the app user
+(credit-boost-<uid> in the temp dir, mode 0700), and the database and its
+-wal/-shm files are refused unless they are owned by the app user with no
+group/other permissions. SQLite creates -wal/-shm with the database's mode,
+and they are created under a 0077 umask as well.
+
+Environment:
+    SHARED_CACHE_ENABLED: 'true' (default) or 'false'
+    SHARED_CACHE_PATH: database file (default: shared-cache.sqlite3 in a private
+        credit-boost-<uid> directory in the temp dir)
+    SHARED_CACHE_LEASE_SECONDS: how long a worker may hold a refresh claim (default 60)
+"""
+import os
+import stat
+import time
+import pickle
+import sqlite3
+import logging
+import tempfile
+import threading
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_ENABLED = os.environ.get('SHARED_CACHE_ENABLED', 'true').lower() == 'true'
+# Ownership checks need POSIX uids; elsewhere (local Windows runs) the per-user temp dir is relied on
+_UID = os.getuid() if hasattr(os, 'getuid') else None
+_DEFAULT_DIR = os.path.join(tempfile.gettempdir(), f'credit-boost-{_UID}' if _UID is not None else 'credit-boost')
+SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH') or os.path.join(_DEFAULT_DIR, 'shared-cache.sqlite3')
+SHARED_CACHE_LEASE_SECONDS = int(os.environ.get('SHARED_CACHE_LEASE_SECONDS', '60'))
+
+# Poll interval while waiting for another worker's refresh
+_WAIT_POLL_SECONDS = 0.05
+# Expired entries are deleted at most this often (server-side sessions add a row per sign-in)
+_PRUNE_INTERVAL_SECONDS = 600
+
+_shared_cache_state = {
+    'disabled_reason': None if SHARED_CACHE_ENABLED else 'SHARED_CACHE_ENABLED=false',
+    'hits': 0,
+    'misses': 0,
+    'loads': 0,  # Loader runs while holding the refresh lease
+    'waits': 0,  # Lookups answered by waiting for another worker's refresh
+    'fallbacks': 0,  # Loader runs without the lease (wait ran out or SQLite error)
+    'errors': 0,
+    'pruned': 0,  # Expired entries deleted
+    'last_prune_at': 0.0,
+    'lock': Lock()
+}
+
+# One connection per thread, reopened after a fork (SQLite connections must not cross processes)
+_connections = threading.local()
+# Serializes the umask change around opening a connection
+_open_lock = Lock()
+
+
+class UnsafeCachePathError(Exception):
+    """Raised when the cache directory or database is not private to the app user"""
+
+
+def _check_private(path, st, max_mode):
+    if _UID is None:
+        return
+    if st.st_uid != _UID:
+        raise UnsafeCachePathError(f"{path} is owned by uid {st.st_uid}, not {_UID}")
+    if stat.S_IMODE(st.st_mode) & ~max_mode:
+        raise UnsafeCachePathError(f"{path} has mode {stat.S_IMODE(st.st_mode):o}, broader than {max_mode:o}")
+
+
+def _prepare_database_file():
+    """Create (or verify) the private directory, the database and its WAL files"""
+    if SHARED_CACHE_PATH == os.path.join(_DEFAULT_DIR, 'shared-cache.sqlite3'):
+        try:
+            os.mkdir(_DEFAULT_DIR, 0o700)
+        except FileExistsError:
+            pass
+        # lstat: a symlink planted at the predictable name is refused, not followed
+        dir_stat = os.lstat(_DEFAULT_DIR)
+        if not stat.S_ISDIR(dir_stat.st_mode):
+            raise UnsafeCachePathError(f"{_DEFAULT_DIR} is not a directory")
+        _check_private(_DEFAULT_DIR, dir_stat, 0o700)
+
+    # Create the file with owner-only permissions; an existing file is checked, never trusted
+    fd = os.open(SHARED_CACHE_PATH, os.O_CREAT | os.O_RDWR | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    try:
+        _check_private(SHARED_CACHE_PATH, os.fstat(fd), 0o600)
+    finally:
+        os.close(fd)
+    for suffix in ('-wal', '-shm'):
+        try:
+            _check_private(SHARED_CACHE_PATH + suffix, os.lstat(SHARED_CACHE_PATH + suffix), 0o600)
+        except FileNotFoundError:
+            pass
+
+
+def _count(name):
+    with _shared_cache_state['lock']:
+        _shared_cache_state[name] += 1
+
+
+def _connection():
+    """Get this thread's connection, or None if the shared tier is unavailable"""
+    if _shared_cache_state['disabled_reason'] is not None:
+        return None
+
+    conn = getattr(_connections, 'conn', None)
+    if conn is not None and _connections.pid == os.getpid():
+        return conn
+
+    try:
+        with _open_lock:
+            previous_umask = os.umask(0o077)
+            try:
+                _prepare_database_file()
+                conn = sqlite3.connect(SHARED_CACHE_PATH, timeout=5, isolation_level=None, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+                conn.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)')
+                conn.execute('CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)')
+            finally:
+                os.umask(previous_umask)
+    except (sqlite3.Error, OSError, UnsafeCachePathError) as e:
+        with _shared_cache_state['lock']:
+            _shared_cache_state['disabled_reason'] = str(e)
+        logger.error(f"❌ Shared cache unavailable at {SHARED_CACHE_PATH} - workers will not share caches: {e}")
+        return None
+
+    _connections.conn = conn
+    _connections.pid = os.getpid()
+    return conn
+
+
+def shared_cache_available():
+    """True if the shared tier can be used (opens this thread's connection)"""
+    return _connection() is not None
+
+
+def _prune_expired(conn, now):
+    """Delete expired entries, at most once per _PRUNE_INTERVAL_SECONDS per process"""
+    with _shared_cache_state['lock']:
+        if now - _shared_cache_state['last_prune_at'] < _PRUNE_INTERVAL_SECONDS:
+            return
+        _shared_cache_state['last_prune_at'] = now
+    deleted = conn.execute('DELETE FROM entries WHERE expires_at <= ?', (now,)).rowcount
+    with _shared_cache_state['lock']:
+        _shared_cache_state['pruned'] += deleted
+
+
+def _owner():
+    return f"{os.getpid()}:{threading.get_ident()}"
+
+
+def shared_cache_get(key):
+    """
+    Read a fresh entry
+
+    Args:
+        key: entry key (e.g. 'token:graph')
+
+    Returns:
+        tuple: (value, stored_at) or None if missing, expired or the tier is unavailable
+    """
+    conn = _connection()
+    if conn is None:
+        return None
+
+    try:
+        row = conn.execute('SELECT value, stored_at FROM entries WHERE key = ? AND expires_at > ?', (key, time.time())).fetchone()
+        if row is None:
+            _count('misses')
+            return None
+        value = pickle.loads(row[0])
+    except (sqlite3.Error, pickle.UnpicklingError, EOFError) as e:
+        _count('errors')
+        logger.warning(f"⚠️ Shared cache read failed for {key}: {e}")
+        return None
+
+    _count('hits')
+    return value, row[1]
+
+
+def shared_cache_set(key, value, ttl_seconds):
+    """
+    Store an entry for ttl_seconds (no-op if the tier is unavailable)
+
+    Returns:
+        float stored_at written with the entry (what other workers read back), or None if not stored
+    """
+    conn = _connection()
+    if conn is None:
+        return None
+
+    now = time.time()
+    try:
+        conn.execute('INSERT OR REPLACE INTO entries (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)',
+                     (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now, now + ttl_seconds))
+        _prune_expired(conn, now)
+    except (sqlite3.Error, pickle.PicklingError) as e:
+        _count('errors')
+        logger.warning(f"⚠️ Shared cache write failed for {key}: {e}")
+        return None
+    return now
+
+
+def shared_cache_get_prefix(prefix):
+    """
+    Read every fresh entry whose key starts with prefix (e.g. one per worker)
+
+    Args:
+        prefix: key prefix (e.g. 'metrics:')
+
+    Returns:
+        dict of key -> (value, stored_at); empty if the tier is unavailable
+    """
+    conn = _connection()
+    if conn is None:
+        return {}
+
+    # Range scan on the primary key: every key that starts with prefix sorts in [prefix, upper)
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    try:
+        rows = conn.execute('SELECT key, value, stored_at FROM entries WHERE key >= ? AND key < ? AND expires_at > ?',
+                            (prefix, upper, time.time())).fetchall()
+    except sqlite3.Error as e:
+        _count('errors')
+        logger.warning(f"⚠️ Shared cache read failed for {prefix}*: {e}")
+        return {}
+
+    entries = {}
+    for key, value, stored_at in rows:
+        try:
+            entries[key] = (pickle.loads(value), stored_at)
+        except (pickle.UnpicklingError, EOFError) as e:
+            _count('errors')
+            logger.warning(f"⚠️ Shared cache read failed for {key}: {e}")
+    return entries
+
+
+def shared_cache_delete(key):
+    """Remove an entry so the next lookup on any worker reloads it"""
+    conn = _connection()
+    if conn is None:
+        return
+
+    try:
+        conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+    except sqlite3.Error as e:
+        _count('errors')
+        logger.warning(f"⚠️ Shared cache delete failed for {key}: {e}")
+
+
+def _try_acquire_lease(conn, key):
+    """Claim the refresh of key for this thread unless another live claim exists"""
+    now = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        row = conn.execute('SELECT owner, expires_at FROM leases WHERE key = ?', (key,)).fetchone()
+        if row is not None and row[1] > now and row[0] != _owner():
+            conn.execute('COMMIT')
+            return False
+        conn.execute('INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)',
+                     (key, _owner(), now + SHARED_CACHE_LEASE_SECONDS))
+        conn.execute('COMMIT')
+        return True
+    except sqlite3.Error:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def _release_lease(conn, key):
+    try:
+        conn.execute('DELETE FROM leases WHERE key = ? AND owner = ?', (key, _owner()))
+    except sqlite3.Error as e:
+        _count('errors')
+        logger.warning(f"⚠️ Shared cache lease release failed for {key}: {e}")
+
+
+def shared_cache_get_or_load(key, loader, ttl_seconds, wait_seconds=None):
+    """
+    Get an entry, letting exactly one worker on the host run the loader on a miss
+
+    - Fresh entry: returned
+    - Miss: this worker claims the refresh lease and runs loader, or, if another
+      worker holds the lease, waits up to wait_seconds for its result
+    - Wait ran out, the tier is unavailable, or the loaded value could not be
+      stored: loader result is 'local' (other workers do not share it)
+
+    Args:
+        key: entry key
+        loader: callable returning the value, or None for "nothing to cache"; exceptions propagate
+        ttl_seconds: entry lifetime, or a callable(value) returning it
+        wait_seconds: longest wait for another worker's refresh (default SHARED_CACHE_LEASE_SECONDS)
+
+    Returns:
+        tuple: (value or None, origin: 'shared' | 'loaded' | 'waited' | 'local', stored_at: float);
+        stored_at is the entry's shared timestamp except for 'local' results
+    """
+    cached = shared_cache_get(key)
+    if cached is not None:
+        return cached[0], 'shared', cached[1]
+
+    conn = _connection()
+    wait_until = time.time() + (SHARED_CACHE_LEASE_SECONDS if wait_seconds is None else wait_seconds)
+
+    while conn is not None:
+        try:
+            acquired = _try_acquire_lease(conn, key)
+        except sqlite3.Error as e:
+            _count('errors')
+            logger.warning(f"⚠️ Shared cache lease failed for {key}: {e}")
+            break
+
+        if acquired:
+            try:
+                # The previous lease holder may have stored the entry just before releasing it
+                cached = shared_cache_get(key)
+                if cached is not None:
+                    return cached[0], 'shared', cached[1]
+
+                _count('loads')
+                value = loader()
+                if value is None:
+                    return None, 'loaded', time.time()
+                stored_at = shared_cache_set(key, value, ttl_seconds(value) if callable(ttl_seconds) else ttl_seconds)
+                if stored_at is None:
+                    return value, 'local', time.time()
+                return value, 'loaded', stored_at
+            finally:
+                _release_lease(conn, key)
+
+        if time.time() >= wait_until:
+            logger.warning(f"⚠️ Shared cache: gave up waiting for another worker to refresh {key}")
+            break
+
+        time.sleep(_WAIT_POLL_SECONDS)
+        cached = shared_cache_get(key)
+        if cached is not None:
+            _count('waits')
+            return cached[0], 'waited', cached[1]
+
+    _count('fallbacks')
+    return loader(), 'local', time.time()
+
+
+def get_shared_cache_state():
+    """
+    Get shared cache tier counters for diagnostics
+
+    Returns:
+        dict with enabled, path, disabled_reason and hit/miss/load/wait/fallback/error/pruned counters
+    """
+    with _shared_cache_state['lock']:
+        state = {name: value for name, value in _shared_cache_state.items() if name != 'lock'}
+    state['enabled'] = state['disabled_reason'] is None
+    state['path'] = SHARED_CACHE_PATH
+    return state
@@ -6,17 +6,21 @@ Reads data from three SharePoint lists using Microsoft Graph API:
 3. Credit Boost - Statements (15cdc70e-ba08-4f9b-9ba2-79d66e8c6552) - Payment history
 """
 import os
+import logging
 import io
 from datetime import datetime, timedelta
-import msal
 import requests
 from dotenv import load_dotenv
 from utils.encryption import mask_ssn, get_last4_ssn
-import pandas as pd
+from utils.payment_views import attach_payment_views
+from utils.request_timing import timing_span
+from utils.metrics import observe_graph_request
 import random
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 def load_statements_from_sharepoint_list(access_token, site_id):
     """
@@ -44,13 +48,15 @@ def load_tenants_from_sharepoint(access_token, site_id):
             "Accept": "application/json"
         }
         
-        print(f"Loading items from SharePoint List: Credit Boost - Tenants")
-        items_response = requests.get(list_items_url, headers=headers)
+        logger.info(f"Loading items from SharePoint List: Credit Boost - Tenants")
+        with timing_span('graph_page', 'tenants'), observe_graph_request('tenants') as call:
+            items_response = requests.get(list_items_url, headers=headers)
+            call['status'] = items_response.status_code
         items_response.raise_for_status()
         items_data = items_response.json()
         
         items = items_data.get("value", [])
-        print(f"✓ Loaded {len(items)} tenant records from SharePoint List")
+        logger.info(f"✓ Loaded {len(items)} tenant records from SharePoint List")
         
         tenants_dict = {}
         
@@ -102,11 +108,11 @@ def load_tenants_from_sharepoint(access_token, site_id):
                 'LastSyncAt': parse_sp_date(fields.get('LastSyncAt', ''))
             }
         
-        print(f"✓ Organized {len(tenants_dict)} tenants")
+        logger.info(f"✓ Organized {len(tenants_dict)} tenants")
         return tenants_dict
         
     except Exception as e:
-        print(f"Error loading tenants from SharePoint: {e}")
+        logger.error(f"Error loading tenants from SharePoint: {e}")
         import traceback
         traceback.print_exc()
         return {}
@@ -128,13 +134,15 @@ def load_accounts_from_sharepoint(access_token, site_id):
             "Accept": "application/json"
         }
         
-        print(f"Loading items from SharePoint List: Credit Boost - Accounts")
-        items_response = requests.get(list_items_url, headers=headers)
+        logger.info(f"Loading items from SharePoint List: Credit Boost - Accounts")
+        with timing_span('graph_page', 'accounts'), observe_graph_request('accounts') as call:
+            items_response = requests.get(list_items_url, headers=headers)
+            call['status'] = items_response.status_code
         items_response.raise_for_status()
         items_data = items_response.json()
         
         items = items_data.get("value", [])
-        print(f"✓ Loaded {len(items)} account records from SharePoint List")
+        logger.info(f"✓ Loaded {len(items)} account records from SharePoint List")
         
         accounts_dict = {}
         
@@ -179,11 +187,11 @@ def load_accounts_from_sharepoint(access_token, site_id):
                 'LastSyncAt': parse_sp_date(fields.get('LastSyncAt', ''))
             }
         
-        print(f"✓ Organized {len(accounts_dict)} accounts")
+        logger.info(f"✓ Organized {len(accounts_dict)} accounts")
         return accounts_dict
         
     except Exception as e:
-        print(f"Error loading accounts from SharePoint: {e}")
+        logger.error(f"Error loading accounts from SharePoint: {e}")
         import traceback
         traceback.print_exc()
         return {}
@@ -205,13 +213,15 @@ def load_statements_from_sharepoint(access_token, site_id):
             "Accept": "application/json"
         }
         
-        print(f"Loading items from SharePoint List: Credit Boost - Statements")
-        items_response = requests.get(list_items_url, headers=headers)
+        logger.info(f"Loading items from SharePoint List: Credit Boost - Statements")
+        with timing_span('graph_page', 'statements'), observe_graph_request('statements') as call:
+            items_response = requests.get(list_items_url, headers=headers)
+            call['status'] = items_response.status_code
         items_response.raise_for_status()
         items_data = items_response.json()
         
         items = items_data.get("value", [])
-        print(f"✓ Loaded {len(items)} statement records from SharePoint List")
+        logger.info(f"✓ Loaded {len(items)} statement records from SharePoint List")
         
         statements_by_resident = {}
         
@@ -304,11 +314,11 @@ def load_statements_from_sharepoint(access_token, site_id):
                 reverse=True
             )
         
-        print(f"✓ Organized statements for {len(statements_by_resident)} residents")
+        logger.info(f"✓ Organized statements for {len(statements_by_resident)} residents")
         return statements_by_resident
         
     except Exception as e:
-        print(f"Error loading statements from SharePoint: {e}")
+        logger.error(f"Error loading statements from SharePoint: {e}")
         import traceback
         traceback.print_exc()
         return {}
@@ -358,33 +368,33 @@ def load_residents_and_payments_from_sharepoint_list(access_token, site_id):
             
             residents_dict[resident_id] = combined_data
         
-        print(f"✓ Combined {len(residents_dict)} residents with tenant and account data")
+        logger.info(f"✓ Combined {len(residents_dict)} residents with tenant and account data")
         
         # Debug: Show sample data
         if residents_dict:
             sample_resident_id = list(residents_dict.keys())[0]
-            print(f"DEBUG - Sample combined resident info for ID {sample_resident_id}:")
-            print(f"  Name: {residents_dict[sample_resident_id].get('FirstName')} {residents_dict[sample_resident_id].get('LastName')}")
-            print(f"  Property: {residents_dict[sample_resident_id].get('Property')}")
-            print(f"  Unit: {residents_dict[sample_resident_id].get('Unit')}")
-            print(f"  Account ID: {residents_dict[sample_resident_id].get('AccountID')}")
-            print(f"  Bloom Consumer ID: {residents_dict[sample_resident_id].get('BloomConsumerID')}")
+            logger.debug(f"DEBUG - Sample combined resident info for ID {sample_resident_id}:")
+            logger.debug(f"  Name: {residents_dict[sample_resident_id].get('FirstName')} {residents_dict[sample_resident_id].get('LastName')}")
+            logger.debug(f"  Property: {residents_dict[sample_resident_id].get('Property')}")
+            logger.debug(f"  Unit: {residents_dict[sample_resident_id].get('Unit')}")
+            logger.debug(f"  Account ID: {residents_dict[sample_resident_id].get('AccountID')}")
+            logger.debug(f"  Bloom Consumer ID: {residents_dict[sample_resident_id].get('BloomConsumerID')}")
             
         if statements:
             sample_resident_id = list(statements.keys())[0]
             sample_payments = statements[sample_resident_id]
-            print(f"DEBUG - Sample statement for Resident ID {sample_resident_id}:")
+            logger.debug(f"DEBUG - Sample statement for Resident ID {sample_resident_id}:")
             if sample_payments:
-                print(f"  Month: {sample_payments[0].get('month')}")
-                print(f"  Amount: {sample_payments[0].get('amount')}")
-                print(f"  Date: {sample_payments[0].get('date_paid')}")
-                print(f"  Status: {sample_payments[0].get('status')}")
-                print(f"  Furnishment Status: {sample_payments[0].get('furnishment_status')}")
+                logger.debug(f"  Month: {sample_payments[0].get('month')}")
+                logger.debug(f"  Amount: {sample_payments[0].get('amount')}")
+                logger.debug(f"  Date: {sample_payments[0].get('date_paid')}")
+                logger.debug(f"  Status: {sample_payments[0].get('status')}")
+                logger.debug(f"  Furnishment Status: {sample_payments[0].get('furnishment_status')}")
         
         return residents_dict, statements
         
     except Exception as e:
-        print(f"Error loading from SharePoint List: {e}")
+        logger.error(f"Error loading from SharePoint List: {e}")
         import traceback
         traceback.print_exc()
         return {}, {}
@@ -406,17 +416,18 @@ def load_residents_from_sharepoint_list():
     tenant_id = os.environ.get('AZURE_TENANT_ID')
     
     if not all([client_id, client_secret, tenant_id]):
-        print("Warning: Azure credentials not found in .env file")
+        logger.warning("Warning: Azure credentials not found in .env file")
         return []
     
     try:
         # Authenticate using MSAL (Microsoft Authentication Library)
-        print(f"Authenticating with Microsoft Graph API...")
-        print(f"Tenant ID: {tenant_id}")
+        logger.info(f"Authenticating with Microsoft Graph API...")
+        logger.info(f"Tenant ID: {tenant_id}")
         
         authority = f"https://login.microsoftonline.com/{tenant_id}"
         scope = ["https://graph.microsoft.com/.default"]
         
+        import msal  # Imported on first list load (the Graph startup warm-up may already have loaded it)
         app = msal.ConfidentialClientApplication(
             client_id,
             authority=authority,
@@ -424,15 +435,16 @@ def load_residents_from_sharepoint_list():
         )
         
         # Acquire token
-        result = app.acquire_token_for_client(scopes=scope)
+        with timing_span('graph_token'):
+            result = app.acquire_token_for_client(scopes=scope)
         
         if "access_token" not in result:
-            print(f"Error acquiring token: {result.get('error')}")
-            print(f"Error description: {result.get('error_description')}")
+            logger.error(f"Error acquiring token: {result.get('error')}")
+            logger.error(f"Error description: {result.get('error_description')}")
             return []
         
         access_token = result["access_token"]
-        print(f"✓ Successfully authenticated with Microsoft Graph API")
+        logger.info(f"✓ Successfully authenticated with Microsoft Graph API")
         
         # Get Site ID first - need to resolve the site URL to site ID
         site_hostname = "peakcampus.sharepoint.com"
@@ -445,18 +457,20 @@ def load_residents_from_sharepoint_list():
             "Accept": "application/json"
         }
         
-        print(f"Resolving SharePoint site: {site_hostname}{site_path}")
-        site_response = requests.get(site_url, headers=headers)
+        logger.info(f"Resolving SharePoint site: {site_hostname}{site_path}")
+        with timing_span('graph_site'), observe_graph_request('site') as call:
+            site_response = requests.get(site_url, headers=headers)
+            call['status'] = site_response.status_code
         site_response.raise_for_status()
         site_data = site_response.json()
         site_id = site_data["id"]
         
-        print(f"✓ Site ID: {site_id}")
+        logger.info(f"✓ Site ID: {site_id}")
         
         # Load resident and payment data from three SharePoint lists
         residents_data, statements_by_resident = load_residents_and_payments_from_sharepoint_list(access_token, site_id)
         
-        print(f"✓ Loaded data for {len(residents_data)} residents from SharePoint Lists")
+        logger.info(f"✓ Loaded data for {len(residents_data)} residents from SharePoint Lists")
         
         # Transform to resident dictionaries
         residents = []
@@ -513,8 +527,8 @@ def load_residents_from_sharepoint_list():
             
             # Debug: Print DOB value if first resident
             if idx == 0:
-                print(f"DEBUG - First resident DOB field value: {dob_value}")
-                print(f"DEBUG - First resident all fields: {list(resident_data.keys())}")
+                logger.debug(f"DEBUG - First resident DOB field value: {dob_value}")
+                logger.debug(f"DEBUG - First resident all fields: {list(resident_data.keys())}")
             
             dob = parse_sp_date(dob_value)
             
@@ -542,8 +556,8 @@ def load_residents_from_sharepoint_list():
             
             # Debug: Print resident ID matching for first few residents
             if idx < 3:
-                print(f"DEBUG - Resident {idx}: ID='{sp_resident_id}'")
-                print(f"DEBUG - Available Resident IDs in statements: {list(statements_by_resident.keys())[:10]}")
+                logger.debug(f"DEBUG - Resident {idx}: ID='{sp_resident_id}'")
+                logger.debug(f"DEBUG - Available Resident IDs in statements: {list(statements_by_resident.keys())[:10]}")
             
             # Get payment statements for this resident
             resident_payments = statements_by_resident.get(sp_resident_id, [])
@@ -555,10 +569,10 @@ def load_residents_from_sharepoint_list():
                 monthly_rent = resident_payments[0]['scheduled_payment']
             
             if idx < 3:
-                print(f"DEBUG - Resident {idx}: Scheduled Payment={monthly_rent}")
-                print(f"DEBUG - Found {len(resident_payments)} payments for Resident ID {sp_resident_id}")
+                logger.debug(f"DEBUG - Resident {idx}: Scheduled Payment={monthly_rent}")
+                logger.debug(f"DEBUG - Found {len(resident_payments)} payments for Resident ID {sp_resident_id}")
                 if resident_payments:
-                    print(f"DEBUG - Latest payment: {resident_payments[0]}")
+                    logger.debug(f"DEBUG - Latest payment: {resident_payments[0]}")
             
             # Calculate payment-related fields from real data
             if resident_payments:
@@ -648,11 +662,11 @@ def load_residents_from_sharepoint_list():
             
             residents.append(resident)
         
-        print(f"✓ Successfully loaded {len(residents)} residents from SharePoint List")
-        return residents
+        logger.info(f"✓ Successfully loaded {len(residents)} residents from SharePoint List")
+        return attach_payment_views(residents)
         
     except Exception as e:
-        print(f"Error loading from SharePoint List: {e}")
+        logger.error(f"Error loading from SharePoint List: {e}")
         import traceback
         traceback.print_exc()
         return []
@@ -818,7 +832,12 @@ def generate_credhub_payment_history(all_snapshots, monthly_rent, is_enrolled_an
             'report_date': as_of_date.strftime('%Y-%m-%d') if reported else None,
             # Additional CredHub fields for reference
             'total_balance': total_balance,
-            'as_of_date': as_of_date.strftime('%Y-%m-%d')
+            'as_of_date': as_of_date.strftime('%Y-%m-%d'),
+            'aged_30_59': aged_30_59,
+            'aged_60_89': aged_60_89,
+            'aged_90_plus': aged_90_119 + aged_120_149 + aged_150_179 + aged_180_plus,
+            'last_payment_amount': last_payment_amount,
+            'scheduled_payment': monthly_rent
         }
         
         payments.append(payment_record)
@@ -845,16 +864,17 @@ def load_residents_from_credhub_lists():
     tenant_id = os.environ.get('AZURE_TENANT_ID')
     
     if not all([client_id, client_secret, tenant_id]):
-        print("Warning: Azure credentials not found in .env file")
+        logger.warning("Warning: Azure credentials not found in .env file")
         return []
     
     try:
         # Authenticate using MSAL (Microsoft Authentication Library)
-        print(f"Authenticating with Microsoft Graph API...")
+        logger.info(f"Authenticating with Microsoft Graph API...")
         
         authority = f"https://login.microsoftonline.com/{tenant_id}"
         scope = ["https://graph.microsoft.com/.default"]
         
+        import msal
         app = msal.ConfidentialClientApplication(
             client_id,
             authority=authority,
@@ -862,15 +882,16 @@ def load_residents_from_credhub_lists():
         )
         
         # Acquire token
-        result = app.acquire_token_for_client(scopes=scope)
+        with timing_span('graph_token'):
+            result = app.acquire_token_for_client(scopes=scope)
         
         if "access_token" not in result:
-            print(f"Error acquiring token: {result.get('error')}")
-            print(f"Error description: {result.get('error_description')}")
+            logger.error(f"Error acquiring token: {result.get('error')}")
+            logger.error(f"Error description: {result.get('error_description')}")
             return []
         
         access_token = result["access_token"]
-        print(f"✓ Successfully authenticated with Microsoft Graph API")
+        logger.info(f"✓ Successfully authenticated with Microsoft Graph API")
         
         # Get Site ID
         site_hostname = "peakcampus.sharepoint.com"
@@ -882,49 +903,51 @@ def load_residents_from_credhub_lists():
             "Accept": "application/json"
         }
         
-        print(f"Resolving SharePoint site: {site_hostname}{site_path}")
-        site_response = requests.get(site_url, headers=headers)
+        logger.info(f"Resolving SharePoint site: {site_hostname}{site_path}")
+        with timing_span('graph_site'), observe_graph_request('site') as call:
+            site_response = requests.get(site_url, headers=headers)
+            call['status'] = site_response.status_code
         site_response.raise_for_status()
         site_data = site_response.json()
         site_id = site_data["id"]
-        print(f"✓ Site ID: {site_id}")
+        logger.info(f"✓ Site ID: {site_id}")
         
         # Load all lists
-        print("\n=== Loading CredHub Lists ===")
+        logger.info("=== Loading CredHub Lists ===")
         
         # 1. Load Program Participants
-        print("Loading Program Participants...")
+        logger.info("Loading Program Participants...")
         participants_dict = load_credhub_participants(access_token, site_id)
-        print(f"✓ Loaded {len(participants_dict)} participants")
+        logger.info(f"✓ Loaded {len(participants_dict)} participants")
         
         # 2. Load Leases
-        print("Loading Leases...")
+        logger.info("Loading Leases...")
         leases_dict = load_credhub_leases(access_token, site_id)
-        print(f"✓ Loaded {len(leases_dict)} leases")
+        logger.info(f"✓ Loaded {len(leases_dict)} leases")
         
         # 3. Load Lease Residents (junction table)
-        print("Loading Lease Residents...")
+        logger.info("Loading Lease Residents...")
         lease_residents = load_credhub_lease_residents(access_token, site_id)
-        print(f"✓ Loaded {len(lease_residents)} lease-resident associations")
+        logger.info(f"✓ Loaded {len(lease_residents)} lease-resident associations")
         
         # 4. Load Monthly Financial Snapshots
-        print("Loading Monthly Financial Snapshots...")
+        logger.info("Loading Monthly Financial Snapshots...")
         snapshots_dict, all_snapshots_by_lease = load_credhub_financial_snapshots(access_token, site_id)
-        print(f"✓ Loaded {len(snapshots_dict)} current financial snapshots")
-        print(f"✓ Loaded {sum(len(s) for s in all_snapshots_by_lease.values())} total snapshot records for payment history")
+        logger.info(f"✓ Loaded {len(snapshots_dict)} current financial snapshots")
+        logger.info(f"✓ Loaded {sum(len(s) for s in all_snapshots_by_lease.values())} total snapshot records for payment history")
         
         # 5. Load Reporting Cycles (optional for now)
-        print("Loading Reporting Cycles...")
+        logger.info("Loading Reporting Cycles...")
         cycles_dict = load_credhub_reporting_cycles(access_token, site_id)
-        print(f"✓ Loaded {len(cycles_dict)} reporting cycles")
+        logger.info(f"✓ Loaded {len(cycles_dict)} reporting cycles")
         
         # 6. Load CredHub Job Runs (optional for now)
-        print("Loading CredHub Job Runs...")
+        logger.info("Loading CredHub Job Runs...")
         job_runs = load_credhub_job_runs(access_token, site_id)
-        print(f"✓ Loaded {len(job_runs)} job runs")
+        logger.info(f"✓ Loaded {len(job_runs)} job runs")
         
         # Now join the data and create resident records
-        print("\n=== Assembling Resident Data ===")
+        logger.info("=== Assembling Resident Data ===")
         residents = []
         resident_counter = 1
         
@@ -1109,15 +1132,15 @@ def load_residents_from_credhub_lists():
             residents.append(resident)
             resident_counter += 1
         
-        print(f"✓ Assembled {len(residents)} resident records")
-        return residents
+        logger.info(f"✓ Assembled {len(residents)} resident records")
+        return attach_payment_views(residents)
         
     except requests.exceptions.HTTPError as e:
-        print(f"HTTP Error loading CredHub data: {e}")
-        print(f"Response: {e.response.text if hasattr(e, 'response') else 'N/A'}")
+        logger.error(f"HTTP Error loading CredHub data: {e}")
+        logger.error(f"Response: {e.response.text if hasattr(e, 'response') else 'N/A'}")
         return []
     except Exception as e:
-        print(f"Error loading CredHub data: {e}")
+        logger.error(f"Error loading CredHub data: {e}")
         import traceback
         traceback.print_exc()
         return []
@@ -1141,7 +1164,9 @@ def load_credhub_participants(access_token, site_id):
         # Handle pagination
         while list_items_url:
             page_count += 1
-            items_response = requests.get(list_items_url, headers=headers)
+            with timing_span('graph_page', f'credhub_participants page {page_count}'), observe_graph_request('credhub_participants') as call:
+                items_response = requests.get(list_items_url, headers=headers)
+                call['status'] = items_response.status_code
             items_response.raise_for_status()
             items_data = items_response.json()
             
@@ -1157,12 +1182,12 @@ def load_credhub_participants(access_token, site_id):
             list_items_url = items_data.get("@odata.nextLink")
         
         if page_count > 1:
-            print(f"  (Loaded across {page_count} pages)")
+            logger.info(f"  (Loaded across {page_count} pages)")
         
         return participants_dict
         
     except Exception as e:
-        print(f"Error loading Program Participants: {e}")
+        logger.error(f"Error loading Program Participants: {e}")
         return {}
 
 
@@ -1184,7 +1209,9 @@ def load_credhub_leases(access_token, site_id):
         # Handle pagination
         while list_items_url:
             page_count += 1
-            items_response = requests.get(list_items_url, headers=headers)
+            with timing_span('graph_page', f'credhub_leases page {page_count}'), observe_graph_request('credhub_leases') as call:
+                items_response = requests.get(list_items_url, headers=headers)
+                call['status'] = items_response.status_code
             items_response.raise_for_status()
             items_data = items_response.json()
             
@@ -1200,12 +1227,12 @@ def load_credhub_leases(access_token, site_id):
             list_items_url = items_data.get("@odata.nextLink")
         
         if page_count > 1:
-            print(f"  (Loaded across {page_count} pages)")
+            logger.info(f"  (Loaded across {page_count} pages)")
         
         return leases_dict
         
     except Exception as e:
-        print(f"Error loading Leases: {e}")
+        logger.error(f"Error loading Leases: {e}")
         return {}
 
 
@@ -1227,7 +1254,9 @@ def load_credhub_lease_residents(access_token, site_id):
         # Handle pagination
         while list_items_url:
             page_count += 1
-            items_response = requests.get(list_items_url, headers=headers)
+            with timing_span('graph_page', f'credhub_lease_residents page {page_count}'), observe_graph_request('credhub_lease_residents') as call:
+                items_response = requests.get(list_items_url, headers=headers)
+                call['status'] = items_response.status_code
             items_response.raise_for_status()
             items_data = items_response.json()
             
@@ -1241,12 +1270,12 @@ def load_credhub_lease_residents(access_token, site_id):
             list_items_url = items_data.get("@odata.nextLink")
         
         if page_count > 1:
-            print(f"  (Loaded across {page_count} pages)")
+            logger.info(f"  (Loaded across {page_count} pages)")
         
         return lease_residents
         
     except Exception as e:
-        print(f"Error loading Lease Residents: {e}")
+        logger.error(f"Error loading Lease Residents: {e}")
         return []
 
 
@@ -1275,7 +1304,9 @@ def load_credhub_financial_snapshots(access_token, site_id):
         # Handle pagination
         while list_items_url:
             page_count += 1
-            items_response = requests.get(list_items_url, headers=headers)
+            with timing_span('graph_page', f'credhub_financial_snapshots page {page_count}'), observe_graph_request('credhub_financial_snapshots') as call:
+                items_response = requests.get(list_items_url, headers=headers)
+                call['status'] = items_response.status_code
             items_response.raise_for_status()
             items_data = items_response.json()
             
@@ -1305,7 +1336,7 @@ def load_credhub_financial_snapshots(access_token, site_id):
             list_items_url = items_data.get("@odata.nextLink")
         
         if page_count > 1:
-            print(f"  (Loaded across {page_count} pages)")
+            logger.info(f"  (Loaded across {page_count} pages)")
         
         # Sort all snapshots by date (most recent first)
         for lease_id in all_snapshots_by_lease:
@@ -1317,7 +1348,7 @@ def load_credhub_financial_snapshots(access_token, site_id):
         return snapshots_dict, all_snapshots_by_lease
         
     except Exception as e:
-        print(f"Error loading Financial Snapshots: {e}")
+        logger.error(f"Error loading Financial Snapshots: {e}")
         return {}, {}
 
 
@@ -1339,7 +1370,9 @@ def load_credhub_reporting_cycles(access_token, site_id):
         # Handle pagination
         while list_items_url:
             page_count += 1
-            items_response = requests.get(list_items_url, headers=headers)
+            with timing_span('graph_page', f'credhub_reporting_cycles page {page_count}'), observe_graph_request('credhub_reporting_cycles') as call:
+                items_response = requests.get(list_items_url, headers=headers)
+                call['status'] = items_response.status_code
             items_response.raise_for_status()
             items_data = items_response.json()
             
@@ -1355,12 +1388,12 @@ def load_credhub_reporting_cycles(access_token, site_id):
             list_items_url = items_data.get("@odata.nextLink")
         
         if page_count > 1:
-            print(f"  (Loaded across {page_count} pages)")
+            logger.info(f"  (Loaded across {page_count} pages)")
         
         return cycles_dict
         
     except Exception as e:
-        print(f"Error loading Reporting Cycles: {e}")
+        logger.error(f"Error loading Reporting Cycles: {e}")
         return {}
 
 
@@ -1382,7 +1415,9 @@ def load_credhub_job_runs(access_token, site_id):
         # Handle pagination
         while list_items_url:
             page_count += 1
-            items_response = requests.get(list_items_url, headers=headers)
+            with timing_span('graph_page', f'credhub_job_runs page {page_count}'), observe_graph_request('credhub_job_runs') as call:
+                items_response = requests.get(list_items_url, headers=headers)
+                call['status'] = items_response.status_code
             items_response.raise_for_status()
             items_data = items_response.json()
             
@@ -1396,11 +1431,11 @@ def load_credhub_job_runs(access_token, site_id):
             list_items_url = items_data.get("@odata.nextLink")
         
         if page_count > 1:
-            print(f"  (Loaded across {page_count} pages)")
+            logger.info(f"  (Loaded across {page_count} pages)")
         
         return job_runs
         
     except Exception as e:
-        print(f"Error loading CredHub Job Runs: {e}")
+        logger.error(f"Error loading CredHub Job Runs: {e}")
         return []
 
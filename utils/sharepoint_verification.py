@@ -4,53 +4,127 @@ Used when Entrata test environment is unavailable
 """
 import os
 import logging
-import msal
 import requests
 import time
 import base64
 import json
 from datetime import datetime
-from threading import Lock
+from threading import Lock, Thread, Event
+from urllib.parse import urlparse, quote
+from utils.lru_cache import LRUCache
+from utils.request_timing import timing_span
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.token_manager import TokenManager, TokenAcquisitionError
+from utils.shared_cache import shared_cache_get, shared_cache_set
+from utils.prefork import register_fork_hooks
+from utils.readiness import register_readiness_check
+from utils.metrics import observe_graph_request, record_cache_lookup, record_loader, register_metric_callback
 
 logger = logging.getLogger(__name__)
 
 # ============================================================================
 # GRAPH TOKEN CACHING FOR PERFORMANCE
 # ============================================================================
-# Cache Microsoft Graph access tokens to avoid repeated MSAL token acquisitions
-# Tokens are valid for 60+ minutes, cache with safety margin
+# Microsoft Graph access tokens are held by background token managers that
+# renew them well before expiry (see utils/token_manager.py), so requests
+# only read a ready token instead of queueing behind an MSAL call
 # ============================================================================
 
-_graph_token_cache = {
-    'token': None,
-    'expires_at': None,
-    'cached_at': None,
-    'source': None,  # 'startup_warmup' or 'request_path'
+# ============================================================================
+# SHAREPOINT SITE ID CACHING FOR PERFORMANCE
+# ============================================================================
+# Cache resolved SharePoint site IDs to avoid repeated Graph API lookups
+# Site IDs are stable and don't change frequently
+# ============================================================================
+
+_sharepoint_site_cache = {
+    'sites': {},  # Cache key (hostname:path) -> {'site_id', 'cached_at', 'source'}
     'lock': Lock()
 }
 
-# Separate token cache for External ID tenant Graph API calls
-_external_id_graph_token_cache = {
-    'token': None,
+# Resolved site IDs are also shared with the other workers on this host for a day
+SITE_ID_SHARED_TTL_SECONDS = 86400
+
+# ============================================================================
+# GRAPH EMAIL LOOKUP CACHING FOR PERFORMANCE
+# ============================================================================
+# External ID local accounts carry no email claim, so their email is looked up
+# in Graph by OID. Results are cached per OID; misses (no email / errors) are
+# cached briefly so a failing lookup is not retried on every page load
+# ============================================================================
+
+GRAPH_EMAIL_CACHE_TTL_SECONDS = int(os.environ.get('GRAPH_EMAIL_CACHE_TTL_SECONDS', '3600'))  # 1 hour
+GRAPH_EMAIL_NEGATIVE_TTL_SECONDS = int(os.environ.get('GRAPH_EMAIL_NEGATIVE_TTL_SECONDS', '60'))
+GRAPH_EMAIL_CACHE_MAX_ENTRIES = int(os.environ.get('GRAPH_EMAIL_CACHE_MAX_ENTRIES', '10000'))
+
+_graph_email_cache = LRUCache(GRAPH_EMAIL_CACHE_MAX_ENTRIES, ttl_seconds=GRAPH_EMAIL_CACHE_TTL_SECONDS, name='graph_email')
+_GRAPH_EMAIL_NOT_FOUND = ''  # Cached marker for lookups that returned no email
+
+# ============================================================================
+# ADMIN DIRECTORY CACHING FOR PERFORMANCE
+# ============================================================================
+# The SharePoint admin list is loaded once into a set of active admin emails
+# Expired directories keep serving while a background thread refreshes them,
+# up to a hard staleness limit after which a synchronous reload is required
+# ============================================================================
+
+ADMIN_DIRECTORY_TTL_SECONDS = int(os.environ.get('ADMIN_DIRECTORY_TTL_SECONDS', '300'))  # 5 minutes
+ADMIN_DIRECTORY_MAX_STALE_SECONDS = int(os.environ.get('ADMIN_DIRECTORY_MAX_STALE_SECONDS', '3600'))  # 1 hour
+
+_admin_directory_cache = {
+    'active_emails': None,  # frozenset of lowercase emails for active admins
+    'inactive_emails': frozenset(),  # listed but not active (for logging only)
+    'loaded_at': None,
     'expires_at': None,
-    'cached_at': None,
-    'lifetime': None,
-    'source': None,
+    'source': None,  # 'startup_warmup', 'request_path' or 'background_refresh'
+    'refreshing': False,  # True while a background refresh thread is running
+    'version': 0,  # Incremented whenever the directory contents change or are invalidated
     'lock': Lock()
 }
 
+
 # ============================================================================
-# SHAREPOINT SITE ID CACHING FOR PERFORMANCE
+# VERIFICATION INDEX FOR PERFORMANCE
 # ============================================================================
-# Cache resolved SharePoint site IDs to avoid repeated Graph API lookups
-# Site IDs are stable and don't change frequently
+# Sign-up verification matches email + name + DOB against the verification
+# list. The list is indexed in memory by email (names pre-normalized, DOBs
+# parsed) at startup and kept fresh by a background Graph delta sync, so a
+# verification call is a dict lookup instead of a Graph round trip.
+# A stale index (no successful sync within VERIFICATION_INDEX_MAX_STALE_SECONDS)
+# is not used; verification then queries the list live.
 # ============================================================================
 
-_sharepoint_site_cache = {
-    'site_id': None,
-    'site_key': None,  # Cache key: hostname:path
-    'cached_at': None,
-    'source': None,  # 'startup_warmup' or 'request_path'
+VERIFICATION_INDEX_ENABLED = os.environ.get('VERIFICATION_INDEX_ENABLED', 'true').lower() == 'true'
+VERIFICATION_INDEX_SYNC_SECONDS = int(os.environ.get('VERIFICATION_INDEX_SYNC_SECONDS', '60'))
+VERIFICATION_INDEX_MAX_STALE_SECONDS = int(os.environ.get('VERIFICATION_INDEX_MAX_STALE_SECONDS', '600'))  # 10 minutes
+
+# Live verification queries: email columns read from list records and used for
+# server-side $filter (comma-separated, in priority order; each must be indexed
+# in SharePoint), page size for paged scans/index loads, and the time budget for
+# a paged scan (the custom extension must answer within 2 seconds)
+VERIFICATION_EMAIL_COLUMNS = [
+    column.strip()
+    for column in os.environ.get('VERIFICATION_EMAIL_COLUMN', 'Email,EmailAddress,email').split(',')
+    if column.strip()
+]
+VERIFICATION_LIST_PAGE_SIZE = int(os.environ.get('VERIFICATION_LIST_PAGE_SIZE', '500'))
+VERIFICATION_LIVE_QUERY_BUDGET_MS = int(os.environ.get('VERIFICATION_LIVE_QUERY_BUDGET_MS', '1500'))
+
+_verification_list_query = {
+    'filter_supported': {}  # email column -> False once Graph rejects $filter on it, True once accepted
+}
+
+_verification_index_cache = {
+    'entries': None,  # email -> {item_id -> candidate dict}
+    'item_emails': {},  # item_id -> email (to apply delta updates and deletions)
+    'delta_link': None,  # @odata.deltaLink from the last sync
+    'delta_supported': None,  # False once Graph rejects list item delta (full rescans instead)
+    'synced_at': None,  # Last successful sync
+    'source': None,  # 'startup_warmup', 'background_sync' or 'request_path'
+    'syncing': False,  # True while a sync is running
+    'sync_thread': None,  # Periodic background sync thread
+    'sync_stop': None,  # Event that stops the sync thread
+    'last_error': None,
     'lock': Lock()
 }
 
@@ -61,44 +135,40 @@ def get_graph_token_cache_state():
     Call at request start to see if warm-up populated cache
     
     Returns:
-        dict with cache state information
+        dict with cache state information (including background renewal state)
     """
-    with _graph_token_cache['lock']:
-        now = time.time()
-        
-        if _graph_token_cache['token'] is None:
-            return {
-                'present': False,
-                'source': None,
-                'age_s': 0,
-                'ttl_remaining_s': 0,
-                'expired': False
-            }
-        
-        cached_at = _graph_token_cache.get('cached_at', 0)
-        expires_at = _graph_token_cache.get('expires_at', 0)
-        
-        return {
-            'present': True,
-            'source': _graph_token_cache.get('source', 'unknown'),
-            'age_s': now - cached_at if cached_at else 0,
-            'ttl_remaining_s': max(0, expires_at - now) if expires_at else 0,
-            'expired': now >= expires_at if expires_at else True
-        }
+    return _graph_token_manager.state()
+
+
+def get_external_id_graph_token_state():
+    """
+    Get current External ID Graph token state for diagnostics
+    
+    Returns:
+        dict with cache state information (including background renewal state)
+    """
+    return _external_id_graph_token_manager.state()
 
 
-def get_site_id_cache_state():
+def get_site_id_cache_state(cache_key=None):
     """
     Get current Site ID cache state for diagnostics
     Call at request start to see if warm-up populated cache
     
+    Args:
+        cache_key: hostname:path of the site to inspect (defaults to the verification site)
+    
     Returns:
         dict with cache state information
     """
+    if cache_key is None:
+        cache_key = get_verification_site_config()['cache_key']
+    
     with _sharepoint_site_cache['lock']:
         now = time.time()
+        entry = _sharepoint_site_cache['sites'].get(cache_key)
         
-        if _sharepoint_site_cache['site_id'] is None:
+        if entry is None:
             return {
                 'present': False,
                 'source': None,
@@ -106,12 +176,12 @@ def get_site_id_cache_state():
                 'age_s': 0
             }
         
-        cached_at = _sharepoint_site_cache.get('cached_at', 0)
+        cached_at = entry.get('cached_at', 0)
         
         return {
             'present': True,
-            'source': _sharepoint_site_cache.get('source', 'unknown'),
-            'site_key': _sharepoint_site_cache.get('site_key'),
+            'source': entry.get('source', 'unknown'),
+            'site_key': cache_key,
             'age_s': now - cached_at if cached_at else 0
         }
 
@@ -168,7 +238,7 @@ def get_verification_site_config():
     Ensures consistency between warm-up target and actual verification site
     
     Returns:
-        dict with hostname, path, and formatted URL
+        dict with hostname, path, list ID and formatted URL
     """
     site_hostname = os.environ.get('SHAREPOINT_VERIFICATION_SITE_HOSTNAME', 'peakcampus-my.sharepoint.com')
     site_path = os.environ.get('SHAREPOINT_VERIFICATION_SITE_PATH', '/personal/pbatson_peakmade_com')
@@ -176,6 +246,7 @@ def get_verification_site_config():
     return {
         'hostname': site_hostname,
         'path': site_path,
+        'list_id': os.environ.get('SHAREPOINT_VERIFICATION_LIST_ID', 'f2ebd72a-6c00-448c-bf07-19f9afbad017'),
         'url': f"https://{site_hostname}{site_path}",
         'cache_key': f"{site_hostname}:{site_path}"
     }
@@ -250,12 +321,53 @@ def warmup_site_id():
         }
 
 
-def get_sharepoint_access_token(source='request_path'):
+def _acquire_graph_token(timeout):
+    """
+    Acquire a workforce tenant Graph token via MSAL client credentials
+    A new MSAL app per acquisition so renewals get a fresh token rather than MSAL's cached one
+    
+    Returns:
+        tuple: (access_token, expires_in_s)
+    """
+    client_id = os.environ.get('AZURE_CLIENT_ID')
+    client_secret = os.environ.get('AZURE_CLIENT_SECRET')
+    tenant_id = os.environ.get('AZURE_TENANT_ID')
+    
+    if not all([client_id, client_secret, tenant_id]):
+        logger.error("❌ Azure credentials not configured")
+        raise TokenAcquisitionError("Azure credentials not configured")
+    
+    authority = f"https://login.microsoftonline.com/{tenant_id}"
+    scope = ["https://graph.microsoft.com/.default"]
+    
+    import msal  # Imported on first acquisition (startup warm-up) - keeps msal out of module import
+    app = msal.ConfidentialClientApplication(
+        client_id,
+        authority=authority,
+        client_credential=client_secret,
+        timeout=timeout
+    )
+    
+    with timing_span('graph_token'):
+        result = app.acquire_token_for_client(scopes=scope)
+    
+    if "access_token" not in result:
+        logger.error(f"❌ Token acquisition failed: {result.get('error')}")
+        raise TokenAcquisitionError(result.get('error') or 'no access_token in response')
+    
+    return result["access_token"], result.get("expires_in", 3600)  # Default 1 hour
+
+
+def get_sharepoint_access_token(source='request_path', deadline=None):
     """
     Get access token for SharePoint/Microsoft Graph API with caching
+    The token is normally ready (renewed in the background); it is only acquired
+    here on a cold start or after renewals failed until the token expired
     
     Args:
         source: 'startup_warmup' or 'request_path' - tracks where cache was populated
+        deadline: optional Deadline; a token acquisition uses the remaining budget as
+            its timeout and raises DeadlineExceeded if none is left
     
     Returns:
         tuple: (access_token: str or None, metrics: dict)
@@ -268,80 +380,131 @@ def get_sharepoint_access_token(source='request_path'):
         'token_cache_source': None
     }
     
-    with _graph_token_cache['lock']:
+    snapshot = _graph_token_manager.current()
+    if snapshot is not None:
         now = time.time()
-        
-        # Check cache validity (with 5-minute safety margin)
-        if _graph_token_cache['token'] is not None and _graph_token_cache['expires_at'] is not None:
-            if now < (_graph_token_cache['expires_at'] - 300):  # Refresh 5 min before expiry
-                cached_at = _graph_token_cache.get('cached_at', now)
-                cache_age = now - cached_at
-                ttl_remaining = _graph_token_cache['expires_at'] - now
-                cache_source = _graph_token_cache.get('source', 'unknown')
-                logger.info(f"✅ Graph token cache HIT (source={cache_source}, age={cache_age:.0f}s, ttl_remaining={ttl_remaining:.0f}s)")
-                metrics['graph_token_cache_hit'] = True
-                metrics['token_cache_age_s'] = cache_age
-                metrics['token_ttl_remaining_s'] = ttl_remaining
-                metrics['token_cache_source'] = cache_source
-                return _graph_token_cache['token'], metrics
-        
-        # Cache miss - acquire new token
-        logger.info(f"⚠️ Graph token cache MISS - acquiring new token")
-        token_start = time.time()
-        
-        client_id = os.environ.get('AZURE_CLIENT_ID')
-        client_secret = os.environ.get('AZURE_CLIENT_SECRET')
-        tenant_id = os.environ.get('AZURE_TENANT_ID')
-        
-        if not all([client_id, client_secret, tenant_id]):
-            logger.error("❌ Azure credentials not configured")
-            metrics['token_acquisition_ms'] = (time.time() - token_start) * 1000
-            return None, metrics
-        
-        try:
-            authority = f"https://login.microsoftonline.com/{tenant_id}"
-            scope = ["https://graph.microsoft.com/.default"]
-            
-            app = msal.ConfidentialClientApplication(
-                client_id,
-                authority=authority,
-                client_credential=client_secret
-            )
-            
-            result = app.acquire_token_for_client(scopes=scope)
-            
-            metrics['token_acquisition_ms'] = (time.time() - token_start) * 1000
-            
-            if "access_token" not in result:
-                logger.error(f"❌ Token acquisition failed: {result.get('error')}")
-                return None, metrics
-            
-            # Update cache
-            access_token = result["access_token"]
-            expires_in = result.get("expires_in", 3600)  # Default 1 hour
-            _graph_token_cache['token'] = access_token
-            _graph_token_cache['expires_at'] = now + expires_in
-            _graph_token_cache['cached_at'] = now
-            _graph_token_cache['lifetime'] = expires_in
-            _graph_token_cache['source'] = source
-            
-            logger.info(f"✅ Graph token acquired: {metrics['token_acquisition_ms']:.1f}ms, TTL={expires_in}s, source={source}")
+        metrics['graph_token_cache_hit'] = True
+        metrics['token_cache_age_s'] = now - snapshot.cached_at
+        metrics['token_ttl_remaining_s'] = snapshot.expires_at - now
+        metrics['token_cache_source'] = snapshot.source
+        logger.info(f"✅ Graph token cache HIT (source={snapshot.source}, age={metrics['token_cache_age_s']:.0f}s, ttl_remaining={metrics['token_ttl_remaining_s']:.0f}s)")
+        return snapshot.access_token, metrics
+    
+    logger.info(f"⚠️ Graph token cache MISS - acquiring new token")
+    if deadline is not None:
+        deadline.check('token')
+    
+    snapshot, metrics['token_acquisition_ms'], error = _graph_token_manager.get(
+        source=source,
+        timeout=deadline.timeout(10) if deadline is not None else None
+    )
+    
+    if snapshot is None:
+        logger.error(f"❌ Authentication error: {error}")
+        return None, metrics
+    
+    metrics['token_ttl_remaining_s'] = snapshot.expires_at - time.time()
+    metrics['token_cache_source'] = snapshot.source
+    logger.info(f"✅ Graph token acquired: {metrics['token_acquisition_ms']:.1f}ms, TTL={snapshot.lifetime:.0f}s, source={snapshot.source}")
+    return snapshot.access_token, metrics
+
+
+def _log_external_id_token_diagnostics(access_token):
+    """Log the decoded (unverified) claims of a new External ID Graph token"""
+    try:
+        # Split token (header.payload.signature)
+        parts = access_token.split('.')
+        if len(parts) == 3:
+            # Decode payload (add padding if needed)
+            payload_base64 = parts[1]
+            padding = len(payload_base64) % 4
+            if padding:
+                payload_base64 += '=' * (4 - padding)
+            payload = json.loads(base64.urlsafe_b64decode(payload_base64))
             
-            metrics['token_ttl_remaining_s'] = expires_in
-            metrics['token_cache_source'] = source
+            logger.info(f"🔍 TOKEN DIAGNOSTICS (decoded payload):")
+            logger.info(f"   tid (tenant): {payload.get('tid', 'N/A')[:16]}...")
+            logger.info(f"   aud (audience): {payload.get('aud', 'N/A')}")
+            logger.info(f"   appid: {payload.get('appid', 'N/A')[:16]}...")
+            logger.info(f"   iss (issuer): {payload.get('iss', 'N/A')}")
+            logger.info(f"   roles: {payload.get('roles', [])}")
+            logger.info(f"   scp (scopes): {payload.get('scp', 'N/A')}")
             
-            return access_token, metrics
-        
-        except Exception as e:
-            metrics['token_acquisition_ms'] = (time.time() - token_start) * 1000
-            logger.error(f"❌ Authentication error: {e}")
-            return None, metrics
+            # Check for User.Read.All permission
+            roles = payload.get('roles', [])
+            if 'User.Read.All' in roles:
+                logger.info(f"   ✅ User.Read.All permission PRESENT")
+            else:
+                logger.warning(f"   ⚠️ User.Read.All permission NOT FOUND in roles")
+                logger.warning(f"   Available roles: {roles}")
+    except Exception as decode_error:
+        logger.warning(f"⚠️ Could not decode token for diagnostics: {decode_error}")
+
+
+def _acquire_external_id_graph_token(timeout):
+    """
+    Acquire a Graph token for the External ID tenant via MSAL client credentials
+    
+    Returns:
+        tuple: (access_token, expires_in_s)
+    """
+    # Check for External ID Graph app registration credentials
+    # Priority 1: Dedicated Graph app in External ID tenant
+    client_id = os.environ.get('EXTERNAL_ID_GRAPH_CLIENT_ID') or os.environ.get('AZURE_CLIENT_ID')
+    client_secret = os.environ.get('EXTERNAL_ID_GRAPH_CLIENT_SECRET') or os.environ.get('AZURE_CLIENT_SECRET')
+    tenant_id = os.environ.get('AUTH_EXTENSION_TENANT_ID')
+    
+    logger.info(f"🔍 GRAPH TOKEN ACQUISITION CONTEXT:")
+    logger.info(f"   Tenant ID: {tenant_id[:16] if tenant_id else 'NOT SET'}...")
+    logger.info(f"   Client ID: {client_id[:16] if client_id else 'NOT SET'}...")
+    logger.info(f"   Client Secret: {'SET' if client_secret else 'NOT SET'}")
+    logger.info(f"   Tenant Type: External ID (CIAM)")
+    logger.info(f"   Target API: Microsoft Graph (https://graph.microsoft.com)")
+    
+    if not all([client_id, client_secret, tenant_id]):
+        logger.error("❌ External ID Graph credentials not configured")
+        logger.error("   Required: EXTERNAL_ID_GRAPH_CLIENT_ID + EXTERNAL_ID_GRAPH_CLIENT_SECRET")
+        logger.error("   Or fallback: AZURE_CLIENT_ID + AZURE_CLIENT_SECRET")
+        logger.error("   Plus: AUTH_EXTENSION_TENANT_ID")
+        raise TokenAcquisitionError("External ID Graph credentials not configured")
+    
+    authority = f"https://login.microsoftonline.com/{tenant_id}"
+    scope = ["https://graph.microsoft.com/.default"]
+    
+    logger.info(f"   Authority URL: {authority}")
+    logger.info(f"   Scopes: {scope}")
+    logger.info(f"   Flow: Client Credentials (application permissions)")
+    
+    import msal
+    app = msal.ConfidentialClientApplication(
+        client_id,
+        authority=authority,
+        client_credential=client_secret,
+        timeout=timeout
+    )
+    
+    with timing_span('graph_token'):
+        result = app.acquire_token_for_client(scopes=scope)
+    
+    if "access_token" not in result:
+        logger.error(f"❌ Token acquisition failed: {result.get('error')} - {result.get('error_description', '')}")
+        raise TokenAcquisitionError(result.get('error') or 'no access_token in response')
+    
+    _log_external_id_token_diagnostics(result["access_token"])
+    return result["access_token"], result.get("expires_in", 3600)
+
+
+_graph_token_manager = TokenManager('graph', _acquire_graph_token)
+
+# Separate token for External ID tenant Graph API calls
+_external_id_graph_token_manager = TokenManager('external_id_graph', _acquire_external_id_graph_token)
 
 
 def get_external_id_graph_token(source='request_path'):
     """
     Acquire Microsoft Graph token for External ID tenant user lookups.
     This is separate from the workforce tenant Graph token.
+    Renewed in the background like the workforce token
     
     Returns:
         tuple: (access_token, metrics_dict)
@@ -353,128 +516,69 @@ def get_external_id_graph_token(source='request_path'):
         'ttl_remaining_s': 0.0
     }
     
-    with _external_id_graph_token_cache['lock']:
+    snapshot = _external_id_graph_token_manager.current()
+    if snapshot is not None:
         now = time.time()
-        
-        # Check cache
-        if _external_id_graph_token_cache['token'] and _external_id_graph_token_cache['expires_at']:
-            if now < (_external_id_graph_token_cache['expires_at'] - 300):
-                cached_at = _external_id_graph_token_cache.get('cached_at', now)
-                cache_age = now - cached_at
-                ttl_remaining = _external_id_graph_token_cache['expires_at'] - now
-                logger.info(f"✅ External ID Graph token cache HIT (age={cache_age:.0f}s, ttl={ttl_remaining:.0f}s)")
-                metrics['cache_hit'] = True
-                metrics['cache_age_s'] = cache_age
-                metrics['ttl_remaining_s'] = ttl_remaining
-                return _external_id_graph_token_cache['token'], metrics
-        
-        # Cache miss - acquire new token
-        logger.info(f"⚠️ External ID Graph token cache MISS - acquiring new token")
-        token_start = time.time()
-        
-        # Check for External ID Graph app registration credentials
-        # Priority 1: Dedicated Graph app in External ID tenant
-        client_id = os.environ.get('EXTERNAL_ID_GRAPH_CLIENT_ID') or os.environ.get('AZURE_CLIENT_ID')
-        client_secret = os.environ.get('EXTERNAL_ID_GRAPH_CLIENT_SECRET') or os.environ.get('AZURE_CLIENT_SECRET')
-        tenant_id = os.environ.get('AUTH_EXTENSION_TENANT_ID')
-        
-        logger.info(f"🔍 GRAPH TOKEN ACQUISITION CONTEXT:")
-        logger.info(f"   Tenant ID: {tenant_id[:16] if tenant_id else 'NOT SET'}...")
-        logger.info(f"   Client ID: {client_id[:16] if client_id else 'NOT SET'}...")
-        logger.info(f"   Client Secret: {'SET' if client_secret else 'NOT SET'}")
-        logger.info(f"   Tenant Type: External ID (CIAM)")
-        logger.info(f"   Target API: Microsoft Graph (https://graph.microsoft.com)")
-        
-        if not all([client_id, client_secret, tenant_id]):
-            logger.error("❌ External ID Graph credentials not configured")
-            logger.error("   Required: EXTERNAL_ID_GRAPH_CLIENT_ID + EXTERNAL_ID_GRAPH_CLIENT_SECRET")
-            logger.error("   Or fallback: AZURE_CLIENT_ID + AZURE_CLIENT_SECRET")
-            logger.error("   Plus: AUTH_EXTENSION_TENANT_ID")
-            metrics['acquisition_ms'] = (time.time() - token_start) * 1000
-            return None, metrics
-        
-        try:
-            authority = f"https://login.microsoftonline.com/{tenant_id}"
-            scope = ["https://graph.microsoft.com/.default"]
-            
-            logger.info(f"   Authority URL: {authority}")
-            logger.info(f"   Scopes: {scope}")
-            logger.info(f"   Flow: Client Credentials (application permissions)")
-            
-            app = msal.ConfidentialClientApplication(
-                client_id,
-                authority=authority,
-                client_credential=client_secret
-            )
-            
-            result = app.acquire_token_for_client(scopes=scope)
-            
-            metrics['acquisition_ms'] = (time.time() - token_start) * 1000
-            
-            if "access_token" not in result:
-                logger.error(f"❌ Token acquisition failed: {result.get('error')} - {result.get('error_description', '')}")
-                return None, metrics
-            
-            access_token = result["access_token"]
-            expires_in = result.get("expires_in", 3600)
-            
-            # Decode token for diagnostics (without verification)
-            try:
-                # Split token (header.payload.signature)
-                parts = access_token.split('.')
-                if len(parts) == 3:
-                    # Decode payload (add padding if needed)
-                    payload_base64 = parts[1]
-                    padding = len(payload_base64) % 4
-                    if padding:
-                        payload_base64 += '=' * (4 - padding)
-                    payload = json.loads(base64.urlsafe_b64decode(payload_base64))
-                    
-                    logger.info(f"🔍 TOKEN DIAGNOSTICS (decoded payload):")
-                    logger.info(f"   tid (tenant): {payload.get('tid', 'N/A')[:16]}...")
-                    logger.info(f"   aud (audience): {payload.get('aud', 'N/A')}")
-                    logger.info(f"   appid: {payload.get('appid', 'N/A')[:16]}...")
-                    logger.info(f"   iss (issuer): {payload.get('iss', 'N/A')}")
-                    logger.info(f"   roles: {payload.get('roles', [])}")
-                    logger.info(f"   scp (scopes): {payload.get('scp', 'N/A')}")
-                    
-                    # Check for User.Read.All permission
-                    roles = payload.get('roles', [])
-                    if 'User.Read.All' in roles:
-                        logger.info(f"   ✅ User.Read.All permission PRESENT")
-                    else:
-                        logger.warning(f"   ⚠️ User.Read.All permission NOT FOUND in roles")
-                        logger.warning(f"   Available roles: {roles}")
-            except Exception as decode_error:
-                logger.warning(f"⚠️ Could not decode token for diagnostics: {decode_error}")
-            
-            # Cache the token
-            _external_id_graph_token_cache['token'] = access_token
-            _external_id_graph_token_cache['expires_at'] = now + expires_in
-            _external_id_graph_token_cache['cached_at'] = now
-            _external_id_graph_token_cache['lifetime'] = expires_in
-            _external_id_graph_token_cache['source'] = source
-            
-            logger.info(f"✅ External ID Graph token acquired: {metrics['acquisition_ms']:.1f}ms, TTL={expires_in}s")
-            
-            metrics['ttl_remaining_s'] = expires_in
-            
-            return access_token, metrics
-            
-        except Exception as e:
-            metrics['acquisition_ms'] = (time.time() - token_start) * 1000
-            logger.error(f"❌ External ID Graph token acquisition error: {e}")
-            return None, metrics
+        metrics['cache_hit'] = True
+        metrics['cache_age_s'] = now - snapshot.cached_at
+        metrics['ttl_remaining_s'] = snapshot.expires_at - now
+        logger.info(f"✅ External ID Graph token cache HIT (age={metrics['cache_age_s']:.0f}s, ttl={metrics['ttl_remaining_s']:.0f}s)")
+        return snapshot.access_token, metrics
+    
+    logger.info(f"⚠️ External ID Graph token cache MISS - acquiring new token")
+    snapshot, metrics['acquisition_ms'], error = _external_id_graph_token_manager.get(source=source)
+    
+    if snapshot is None:
+        logger.error(f"❌ External ID Graph token acquisition error: {error}")
+        return None, metrics
+    
+    metrics['ttl_remaining_s'] = snapshot.expires_at - time.time()
+    logger.info(f"✅ External ID Graph token acquired: {metrics['acquisition_ms']:.1f}ms, TTL={snapshot.lifetime:.0f}s")
+    return snapshot.access_token, metrics
 
 
 def get_user_email_from_graph(object_id):
     """
-    Get user's email from Microsoft Graph API using object identifier.
+    Get user's email from Microsoft Graph API using object identifier, with caching.
     Queries the External ID (CIAM) tenant to retrieve email from user identities.
     
     Args:
         object_id: User's object identifier from Easy Auth token claims
     
+    Returns:
+        str: User's email address or None if not found
+    """
+    if not object_id or object_id == 'unknown':
+        logger.warning("⚠️ Invalid object_id for Graph lookup")
+        return None
+    
+    cached_email = _graph_email_cache.get(object_id)
+    if cached_email is not None:
+        logger.info(f"✅ Graph email cache HIT for OID {object_id[:8]}...")
+        return cached_email or None
+    
+    email = _lookup_user_email_from_graph(object_id)
+    if email:
+        _graph_email_cache.set(object_id, email)
+    else:
+        _graph_email_cache.set(object_id, _GRAPH_EMAIL_NOT_FOUND, ttl_seconds=GRAPH_EMAIL_NEGATIVE_TTL_SECONDS)
+    return email
+
+
+def get_graph_email_cache_state():
+    """
+    Get Graph email lookup cache counters for diagnostics
+    
+    Returns:
+        dict with size, capacity, hits, misses, evictions and hit ratio
+    """
+    return _graph_email_cache.stats()
+
+
+def _lookup_user_email_from_graph(object_id):
+    """
+    Query Graph for a user's email (uncached - use get_user_email_from_graph)
+    
     Returns:
         str: User's email address or None if not found
     """
@@ -515,7 +619,9 @@ def get_user_email_from_graph(object_id):
             "Content-Type": "application/json"
         }
         
-        response = requests.get(graph_url, headers=headers, timeout=10)
+        with timing_span('graph_user'), observe_graph_request('users') as call:
+            response = requests.get(graph_url, headers=headers, timeout=10)
+            call['status'] = response.status_code
         
         logger.info(f"📥 GRAPH API RESPONSE: {response.status_code}")
         
@@ -584,7 +690,7 @@ def get_user_email_from_graph(object_id):
         return None
 
 
-def get_cached_site_id(site_hostname, site_path, access_token, source='request_path'):
+def get_cached_site_id(site_hostname, site_path, access_token, source='request_path', deadline=None):
     """
     Get SharePoint site ID with caching
     
@@ -593,6 +699,8 @@ def get_cached_site_id(site_hostname, site_path, access_token, source='request_p
         site_path: SharePoint site path
         access_token: Graph API access token
         source: 'startup_warmup' or 'request_path' - tracks where cache was populated
+        deadline: optional Deadline; resolution uses the remaining budget as its
+            timeout and raises DeadlineExceeded if none is left
     
     Returns:
         tuple: (site_id: str or None, cache_hit: bool, resolution_ms: float, cache_age_s: float)
@@ -601,14 +709,31 @@ def get_cached_site_id(site_hostname, site_path, access_token, source='request_p
     
     with _sharepoint_site_cache['lock']:
         # Check cache
-        if _sharepoint_site_cache['site_id'] is not None and _sharepoint_site_cache['site_key'] == cache_key:
-            cache_age = time.time() - _sharepoint_site_cache.get('cached_at', time.time())
-            cache_source = _sharepoint_site_cache.get('source', 'unknown')
+        entry = _sharepoint_site_cache['sites'].get(cache_key)
+        if entry is not None:
+            cache_age = time.time() - entry.get('cached_at', time.time())
+            cache_source = entry.get('source', 'unknown')
             logger.info(f"✅ Site ID cache HIT for {cache_key} (source={cache_source}, age={cache_age:.0f}s)")
-            return _sharepoint_site_cache['site_id'], True, 0.0, cache_age
+            record_cache_lookup('site_id', hit=True)
+            return entry['site_id'], True, 0.0, cache_age
+        
+        # Another worker on this host may already have resolved it
+        shared = shared_cache_get(f'site_id:{cache_key}')
+        if shared is not None:
+            _sharepoint_site_cache['sites'][cache_key] = {
+                'site_id': shared[0],
+                'cached_at': shared[1],
+                'source': f'{source}:shared_cache'
+            }
+            logger.info(f"🔗 Site ID for {cache_key} taken from shared cache")
+            record_cache_lookup('site_id', hit=True)
+            return shared[0], True, 0.0, time.time() - shared[1]
         
         # Cache miss - resolve site
         logger.info(f"⚠️ Site ID cache MISS - resolving {cache_key}")
+        record_cache_lookup('site_id', hit=False)
+        if deadline is not None:
+            deadline.check('site')
         site_start = time.time()
         
         try:
@@ -621,7 +746,9 @@ def get_cached_site_id(site_hostname, site_path, access_token, source='request_p
             
             logger.info(f"🔗 Graph endpoint: {site_url}")
             
-            site_response = requests.get(site_url, headers=headers, timeout=10)
+            with timing_span('graph_site'), observe_graph_request('site') as call:
+                site_response = requests.get(site_url, headers=headers, timeout=deadline.timeout(10) if deadline is not None else 10)
+                call['status'] = site_response.status_code
             resolution_ms = (time.time() - site_start) * 1000
             
             logger.info(f"📊 Graph site resolution: {site_response.status_code} in {resolution_ms:.1f}ms")
@@ -633,10 +760,13 @@ def get_cached_site_id(site_hostname, site_path, access_token, source='request_p
             site_id = site_data["id"]
             
             # Update cache
-            _sharepoint_site_cache['site_id'] = site_id
-            _sharepoint_site_cache['site_key'] = cache_key
-            _sharepoint_site_cache['cached_at'] = time.time()
-            _sharepoint_site_cache['source'] = source
+            _sharepoint_site_cache['sites'][cache_key] = {
+                'site_id': site_id,
+                'cached_at': time.time(),
+                'source': source
+            }
+            
+            shared_cache_set(f'site_id:{cache_key}', site_id, SITE_ID_SHARED_TTL_SECONDS)
             
             logger.info(f"✅ Site ID cached: {site_id}, source={source}")
             
@@ -648,186 +778,634 @@ def get_cached_site_id(site_hostname, site_path, access_token, source='request_p
             return None, False, resolution_ms, 0.0
 
 
-def verify_resident_sharepoint(email, first_name, last_name, date_of_birth):
+INVALID_DOB_MESSAGE = 'Invalid date of birth format. Please use MM-DD-YYYY or MMDDYYYY.'
+
+
+def parse_signup_date_of_birth(date_of_birth):
     """
-    Verify a resident exists in SharePoint test list with matching details
+    Parse a sign-up form date of birth
+    Accepts MM-DD-YYYY (sign-up form), YYYY-MM-DD, MM/DD/YYYY and MMDDYYYY;
+    datetime objects are returned unchanged
     
-    Args:
-        email: Resident email address
-        first_name: Resident first name
-        last_name: Resident last name
-        date_of_birth: Date of birth (YYYY-MM-DD format or datetime object)
-        
     Returns:
-        dict with 'verified': bool, 'resident_id': str/None, 'message': str, 'timings': dict
+        datetime, or None if the value cannot be parsed
     """
-    # Track timing for each stage
-    timings = {}
-    overall_start = time.time()
+    if not isinstance(date_of_birth, str):
+        return date_of_birth
     
-    # Normalize inputs
-    email = email.lower().strip()
-    first_name = first_name.strip()
-    last_name = last_name.strip()
+    dob_input = date_of_birth.strip()
+    for date_format in ('%m-%d-%Y', '%Y-%m-%d', '%m/%d/%Y'):
+        try:
+            return datetime.strptime(dob_input, date_format)
+        except ValueError:
+            continue
     
-    # Parse DOB if string - support multiple formats
-    if isinstance(date_of_birth, str):
-        dob = None
-        dob_input = date_of_birth.strip()
-        
-        # Try MM-DD-YYYY format (user input from sign-up form)
+    # MMDDYYYY format (no separators - 8 digits)
+    if len(dob_input) == 8 and dob_input.isdigit():
+        try:
+            return datetime.strptime(dob_input, '%m%d%Y')
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_sharepoint_date(date_val):
+    """Parse a SharePoint date/datetime field value into a date (None if missing or unparseable)"""
+    if not date_val:
+        return None
+    if isinstance(date_val, datetime):
+        return date_val.date()
+    if isinstance(date_val, str):
         try:
-            dob = datetime.strptime(dob_input, '%m-%d-%Y')
+            parsed = datetime.fromisoformat(date_val.replace('Z', '+00:00'))
+            return parsed.date()
         except ValueError:
-            # Try YYYY-MM-DD format (ISO standard)
             try:
-                dob = datetime.strptime(dob_input, '%Y-%m-%d')
+                if 'T' in date_val:
+                    return datetime.strptime(date_val.split('T')[0], '%Y-%m-%d').date()
+                return datetime.strptime(date_val, '%Y-%m-%d').date()
             except ValueError:
-                # Try MM/DD/YYYY format (possible SharePoint format)
-                try:
-                    dob = datetime.strptime(dob_input, '%m/%d/%Y')
-                except ValueError:
-                    # Try MMDDYYYY format (no separators - 8 digits)
-                    try:
-                        if len(dob_input) == 8 and dob_input.isdigit():
-                            dob = datetime.strptime(dob_input, '%m%d%Y')
-                        else:
-                            raise ValueError("Not 8-digit format")
-                    except ValueError:
-                        logger.error(f"❌ Invalid date format: {date_of_birth}")
-                        return {
-                            'verified': False,
-                            'resident_id': None,
-                            'message': 'Invalid date of birth format. Please use MM-DD-YYYY or MMDDYYYY.',
-                            'timings': timings
-                        }
-    else:
-        dob = date_of_birth
+                return None
+    return None
+
+
+def _verification_candidate(fields):
+    """
+    Normalize a verification list record for matching
     
-    # Get access token with caching
-    access_token, token_metrics = get_sharepoint_access_token()
-    timings.update(token_metrics)
+    Returns:
+        dict with email, first_name, last_name (lowercase), dob (date or None) and resident_id
+    """
+    email = next((fields[column] for column in VERIFICATION_EMAIL_COLUMNS if fields.get(column)), '')
+    return {
+        'email': str(email).lower().strip(),
+        'first_name': (fields.get('FirstName') or '').strip().lower(),
+        'last_name': (fields.get('LastName') or '').strip().lower(),
+        'dob': _parse_sharepoint_date(fields.get('DateofBirth') or fields.get('DateOfBirth') or fields.get('DOB')),
+        'resident_id': str(fields.get('ResidentID', '') or fields.get('ID', ''))
+    }
+
+
+def _match_verification_candidates(candidates, email, first_name, last_name, dob):
+    """
+    Find the first candidate matching email, name (case-insensitive) and DOB
+    A candidate without a parseable DOB matches on email and name alone
     
-    if not access_token:
-        return {
-            'verified': False,
-            'resident_id': None,
-            'message': 'Unable to verify at this time. Please try again later.',
-            'timings': timings
-        }
+    Returns:
+        resident_id (str) of the match, or None
+    """
+    first_name = first_name.lower()
+    last_name = last_name.lower()
     
-    try:
-        # Get SharePoint site for verification list
-        # Use shared config to ensure consistency with startup warm-up
-        site_config = get_verification_site_config()
-        site_hostname = site_config['hostname']
-        site_path = site_config['path']
-        
-        logger.info(f"🎯 Verification target site: {site_config['url']}")
-        logger.info(f"   Site hostname: {site_hostname}")
-        logger.info(f"   Site path: {site_path}")
-        logger.info(f"   Cache key: {site_config['cache_key']}")
+    for candidate in candidates:
+        # Skip if email doesn't match
+        if candidate['email'] != email:
+            continue
         
-        # Get site ID with caching
-        site_id, site_cache_hit, site_resolution_ms, site_cache_age = get_cached_site_id(site_hostname, site_path, access_token)
-        timings['site_id_cache_hit'] = site_cache_hit
-        timings['site_resolution_ms'] = site_resolution_ms
-        timings['site_cache_age_s'] = site_cache_age
+        if candidate['first_name'] != first_name or candidate['last_name'] != last_name:
+            logger.info(f"Email match but name mismatch: {candidate['first_name']} {candidate['last_name']} vs {first_name} {last_name}")
+            continue
         
-        if not site_id:
-            overall_elapsed = (time.time() - overall_start) * 1000
-            timings['total_verification_ms'] = overall_elapsed
-            return {
-                'verified': False,
-                'resident_id': None,
-                'message': 'Unable to verify at this time. Please try again later.',
-                'timings': timings
-            }
+        if candidate['dob'] and candidate['dob'] != dob.date():
+            logger.info(f"Email/name match but DOB mismatch: {candidate['dob']} vs {dob.date()}")
+            continue
         
-        # Get verification list ID
-        list_id = os.environ.get('SHAREPOINT_VERIFICATION_LIST_ID', 'f2ebd72a-6c00-448c-bf07-19f9afbad017')
+        return candidate['resident_id']
+    
+    return None
+
+
+def _fetch_verification_pages(url, headers):
+    """
+    Fetch a verification list items (or delta) URL, following @odata.nextLink
+    
+    Returns:
+        tuple: (items list or None on failure, @odata.deltaLink or None, HTTP status of the failing/last page)
+    """
+    items = []
+    delta_link = None
+    page_count = 0
+    
+    while url:
+        page_count += 1
+        with timing_span('graph_page', f'verification index page {page_count}'), observe_graph_request('verification') as call:
+            response = requests.get(url, headers=headers, timeout=10)
+            call['status'] = response.status_code
+        
+        if response.status_code != 200:
+            logger.error(f"❌ Error {response.status_code} reading verification list (page {page_count})")
+            logger.error(f"   Response: {response.text[:500]}")
+            return None, None, response.status_code
+        
+        data = response.json()
+        items.extend(data.get('value', []))
+        url = data.get('@odata.nextLink')
+        delta_link = data.get('@odata.deltaLink', delta_link)
+    
+    return items, delta_link, 200
+
+
+def _apply_verification_items(entries, item_emails, items):
+    """Apply list items (full or delta) to an index in place; deleted items are removed"""
+    for item in items:
+        item_id = item.get('id')
+        if not item_id:
+            continue
+        
+        old_email = item_emails.pop(item_id, None)
+        if old_email is not None:
+            email_entries = entries.get(old_email, {})
+            email_entries.pop(item_id, None)
+            if not email_entries:
+                entries.pop(old_email, None)
+        
+        # Delta responses mark deletions with @removed (or a 'deleted' facet)
+        if '@removed' in item or 'deleted' in item:
+            continue
+        
+        candidate = _verification_candidate(item.get('fields', {}))
+        if candidate['email']:
+            entries.setdefault(candidate['email'], {})[item_id] = candidate
+            item_emails[item_id] = candidate['email']
+
+
+def sync_verification_index(source='background_sync'):
+    """
+    Build or update the verification index from the verification list
+    
+    - First sync (or after Graph expires the delta token): full load via list item delta
+    - Later syncs: only changes since the stored delta link
+    - If Graph rejects list item delta: full paged rescan on every sync
+    
+    On failure the previous index is kept (it stops being used once stale)
+    
+    Args:
+        source: 'startup_warmup', 'background_sync' or 'request_path'
+    
+    Returns:
+        bool: True if the index was synced
+    """
+    with _verification_index_cache['lock']:
+        if _verification_index_cache['syncing']:
+            return False
+        _verification_index_cache['syncing'] = True
+        delta_link = _verification_index_cache['delta_link']
+        delta_supported = _verification_index_cache['delta_supported']
+    
+    sync_start = time.time()
+    
+    try:
+        access_token, _ = get_sharepoint_access_token(source=source)
+        if not access_token:
+            raise RuntimeError('no access token')
         
-        # Query SharePoint list - with timing
-        # NOTE: Graph API filtering on custom lists is unreliable, so we fetch all items and filter in memory
-        # This is acceptable for small verification lists (<100 residents)
-        # For larger lists, consider: $filter=fields/Email eq '{email}' if supported
-        list_items_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/lists/{list_id}/items?expand=fields&$top=100"
+        site_config = get_verification_site_config()
+        site_id, _, _, _ = get_cached_site_id(site_config['hostname'], site_config['path'], access_token, source=source)
+        if not site_id:
+            raise RuntimeError(f"site not resolved: {site_config['cache_key']}")
         
         headers = {
             "Authorization": f"Bearer {access_token}",
             "Accept": "application/json"
         }
-        
-        logger.info(f"🔗 Graph endpoint: {list_items_url}")
-        
-        list_start = time.time()
-        items_response = requests.get(list_items_url, headers=headers, timeout=10)
-        list_elapsed = (time.time() - list_start) * 1000
-        timings['list_query_ms'] = list_elapsed
-        
-        logger.info(f"📊 Graph list query: {items_response.status_code} in {list_elapsed:.1f}ms")
-        if 'request-id' in items_response.headers:
-            logger.info(f"📊 Graph request-id: {items_response.headers['request-id']}")
-        
-        items_response.raise_for_status()
-        items_data = items_response.json()
-        
-        items = items_data.get("value", [])
-        logger.info(f"📊 Graph returned {len(items)} records")
-        
-        # Helper to parse SharePoint dates
-        def parse_sp_date(date_val):
-            if not date_val:
-                return None
-            if isinstance(date_val, datetime):
-                return date_val.date()
-            if isinstance(date_val, str):
-                try:
-                    parsed = datetime.fromisoformat(date_val.replace('Z', '+00:00'))
-                    return parsed.date()
-                except:
-                    try:
-                        if 'T' in date_val:
-                            return datetime.strptime(date_val.split('T')[0], '%Y-%m-%d').date()
-                        return datetime.strptime(date_val, '%Y-%m-%d').date()
-                    except:
-                        return None
-            return None
-        
-        # Search for matching resident
-        for item in items:
-            fields = item.get("fields", {})
-            
-            # Get email (try multiple field names)
-            resident_email = (
-                fields.get('Email', '') or 
-                fields.get('EmailAddress', '') or 
-                fields.get('email', '')
-            ).lower().strip()
-            
-            # Skip if email doesn't match
-            if resident_email != email:
-                continue
-            
-            # Check name match (case-insensitive)
-            resident_first = fields.get('FirstName', '').strip().lower()
-            resident_last = fields.get('LastName', '').strip().lower()
-            
-            if resident_first != first_name.lower() or resident_last != last_name.lower():
-                logger.info(f"Email match but name mismatch: {resident_first} {resident_last} vs {first_name} {last_name}")
+        list_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/lists/{site_config['list_id']}/items"
+        
+        items = None
+        full = True
+        
+        if delta_link:
+            items, new_delta_link, status = _fetch_verification_pages(delta_link, headers)
+            if items is not None:
+                full = False
+            elif status == 410:
+                logger.info("🔄 Verification list delta token expired - resyncing in full")
+            else:
+                raise RuntimeError(f"delta sync failed with HTTP {status}")
+        
+        if full and delta_supported is not False:
+            items, new_delta_link, status = _fetch_verification_pages(f"{list_url}/delta?expand=fields", headers)
+            if items is None:
+                if status not in (400, 404, 501):
+                    raise RuntimeError(f"delta load failed with HTTP {status}")
+                logger.warning(f"⚠️ List item delta not supported (HTTP {status}) - falling back to full rescans")
+                delta_supported = False
+            else:
+                delta_supported = True
+        
+        if full and delta_supported is False:
+            items, new_delta_link, status = _fetch_verification_pages(f"{list_url}?expand=fields&$top={VERIFICATION_LIST_PAGE_SIZE}", headers)
+            if items is None:
+                raise RuntimeError(f"list load failed with HTTP {status}")
+        
+        if full:
+            # Build the new index off-lock, then swap it in
+            entries, item_emails = {}, {}
+            _apply_verification_items(entries, item_emails, items)
+        
+        with _verification_index_cache['lock']:
+            if full:
+                _verification_index_cache['entries'] = entries
+                _verification_index_cache['item_emails'] = item_emails
+            else:
+                _apply_verification_items(_verification_index_cache['entries'], _verification_index_cache['item_emails'], items)
+            _verification_index_cache['delta_link'] = new_delta_link
+            _verification_index_cache['delta_supported'] = delta_supported
+            _verification_index_cache['synced_at'] = time.time()
+            _verification_index_cache['source'] = source
+            _verification_index_cache['last_error'] = None
+            email_count = len(_verification_index_cache['entries'])
+        
+        sync_ms = (time.time() - sync_start) * 1000
+        logger.info(f"✅ Verification index {'loaded' if full else 'delta-synced'}: items={len(items)}, emails={email_count}, duration={sync_ms:.1f}ms, source={source}")
+        record_loader('verification_index', sync_ms / 1000, 'success')
+        return True
+    
+    except Exception as e:
+        with _verification_index_cache['lock']:
+            _verification_index_cache['last_error'] = str(e)
+        logger.error(f"❌ Verification index sync failed ({source}): {e}")
+        record_loader('verification_index', time.time() - sync_start, 'error')
+        return False
+    
+    finally:
+        with _verification_index_cache['lock']:
+            _verification_index_cache['syncing'] = False
+
+
+def _verification_index_sync_loop(stop_event):
+    """Periodic background sync (daemon thread started by start_verification_index_sync)"""
+    while not stop_event.wait(VERIFICATION_INDEX_SYNC_SECONDS):
+        sync_verification_index(source='background_sync')
+
+
+def start_verification_index_sync():
+    """Start the periodic background sync thread (no-op if it is running)"""
+    with _verification_index_cache['lock']:
+        thread = _verification_index_cache['sync_thread']
+        if thread is not None and thread.is_alive():
+            return
+        stop_event = Event()
+        _verification_index_cache['sync_stop'] = stop_event
+        _verification_index_cache['sync_thread'] = Thread(
+            target=_verification_index_sync_loop, args=(stop_event,), name='verification-index-sync', daemon=True
+        )
+        _verification_index_cache['sync_thread'].start()
+
+
+def stop_verification_index_sync(timeout=None):
+    """Stop the periodic background sync thread, waiting up to timeout seconds for it to exit"""
+    with _verification_index_cache['lock']:
+        thread = _verification_index_cache['sync_thread']
+        stop_event = _verification_index_cache['sync_stop']
+        _verification_index_cache['sync_thread'] = None
+    if stop_event is not None:
+        stop_event.set()
+    if thread is not None and timeout is not None:
+        thread.join(timeout)
+
+
+def get_verification_candidates(email):
+    """
+    Look up verification list records for an email in the in-memory index
+    
+    Args:
+        email: normalized (lowercase, stripped) email
+    
+    Returns:
+        list of candidate dicts (empty if the email is not listed), or None if the
+        index is disabled, not built or stale (caller should query the list live)
+    """
+    if not VERIFICATION_INDEX_ENABLED:
+        return None
+    
+    with _verification_index_cache['lock']:
+        entries = _verification_index_cache['entries']
+        synced_at = _verification_index_cache['synced_at']
+        
+        if entries is not None and time.time() - synced_at < VERIFICATION_INDEX_MAX_STALE_SECONDS:
+            record_cache_lookup('verification_index', hit=True)
+            return list(entries.get(email, {}).values())
+        
+        # Missing or stale - kick off a sync for later calls (this call goes live)
+        start_sync = not _verification_index_cache['syncing']
+    
+    record_cache_lookup('verification_index', hit=False)
+    if start_sync:
+        logger.info("🔄 Verification index missing or stale - syncing in background")
+        Thread(target=sync_verification_index, kwargs={'source': 'background_sync'}, daemon=True).start()
+    
+    return None
+
+
+def get_verification_index_state():
+    """
+    Get current verification index state for diagnostics
+    
+    Returns:
+        dict with index state information
+    """
+    with _verification_index_cache['lock']:
+        entries = _verification_index_cache['entries']
+        synced_at = _verification_index_cache['synced_at']
+        sync_age = time.time() - synced_at if synced_at else 0
+        
+        return {
+            'present': entries is not None,
+            'enabled': VERIFICATION_INDEX_ENABLED,
+            'source': _verification_index_cache['source'],
+            'email_count': len(entries) if entries is not None else 0,
+            'record_count': len(_verification_index_cache['item_emails']),
+            'sync_age_s': sync_age,
+            'stale': entries is None or sync_age >= VERIFICATION_INDEX_MAX_STALE_SECONDS,
+            'delta_supported': _verification_index_cache['delta_supported'],
+            'syncing': _verification_index_cache['syncing'],
+            'last_error': _verification_index_cache['last_error']
+        }
+
+
+def warmup_verification_index():
+    """
+    Build the verification index on application startup and start the periodic
+    background delta sync
+    
+    Returns:
+        dict with warmup results: success (bool), duration_ms (float), email_count (int), error (str or None)
+    """
+    if not VERIFICATION_INDEX_ENABLED:
+        return {'success': False, 'duration_ms': 0.0, 'email_count': 0, 'error': 'Verification index disabled'}
+    
+    logger.info("🔥 verification_index_warmup_started")
+    warmup_start = time.time()
+    
+    synced = sync_verification_index(source='startup_warmup')
+    duration_ms = (time.time() - warmup_start) * 1000
+    
+    # Keep syncing even if the first load failed - the index builds once Graph is reachable
+    start_verification_index_sync()
+    
+    if synced:
+        email_count = get_verification_index_state()['email_count']
+        logger.info(f"✅ verification_index_warmup_succeeded: duration={duration_ms:.1f}ms, emails={email_count}")
+        return {
+            'success': True,
+            'duration_ms': duration_ms,
+            'email_count': email_count,
+            'error': None
+        }
+    
+    logger.warning(f"⚠️ verification_index_warmup_failed: duration={duration_ms:.1f}ms")
+    return {
+        'success': False,
+        'duration_ms': duration_ms,
+        'email_count': 0,
+        'error': get_verification_index_state()['last_error'] or 'Verification index load failed'
+    }
+
+
+def _find_verification_match_live(site_id, list_id, access_token, email, first_name, last_name, dob, timings, deadline):
+    """
+    Query the verification list in Graph for a matching record
+    
+    - Server-side $filter on each (indexed) email column in VERIFICATION_EMAIL_COLUMNS:
+      one small response per column regardless of list size
+    - If Graph rejects the filter on any column (missing or not indexed) and no
+      filtered query matched: paged scan of the whole list, stopping at the first
+      match or when VERIFICATION_LIVE_QUERY_BUDGET_MS or the request deadline runs out
+    
+    Args:
+        timings: dict updated with list_query_ms, list_query_mode and list_pages
+        deadline: request Deadline; each page uses the remaining budget as its timeout
+    
+    Returns:
+        tuple: (resident_id or None, complete: bool) - complete is False when the
+        budget ran out before every page was checked
+    """
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json"
+    }
+    list_items_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/lists/{list_id}/items"
+    list_start = time.time()
+    page_count = 0
+    mode = 'filter'
+    
+    try:
+        filter_support = _verification_list_query['filter_supported']
+        escaped_email = email.replace("'", "''")
+        
+        for column in VERIFICATION_EMAIL_COLUMNS:
+            if filter_support.get(column) is False:
                 continue
             
-            # Check DOB match
-            resident_dob_raw = fields.get('DateofBirth') or fields.get('DateOfBirth') or fields.get('DOB')
-            resident_dob = parse_sp_date(resident_dob_raw)
+            filter_expr = quote(f"fields/{column} eq '{escaped_email}'")
+            url = f"{list_items_url}?expand=fields&$filter={filter_expr}"
+            logger.info(f"🔗 Graph endpoint: {list_items_url} (filtered on {column})")
+            column_pages = 0
             
-            if resident_dob and resident_dob != dob.date():
-                logger.info(f"Email/name match but DOB mismatch: {resident_dob} vs {dob.date()}")
-                continue
+            while url:
+                page_count += 1
+                column_pages += 1
+                deadline.check('list')
+                with timing_span('graph_page', f'verification filter {column}'), observe_graph_request('verification') as call:
+                    items_response = requests.get(url, headers=headers, timeout=deadline.timeout(10))
+                    call['status'] = items_response.status_code
+                
+                if 'request-id' in items_response.headers:
+                    logger.info(f"📊 Graph request-id: {items_response.headers['request-id']}")
+                
+                if items_response.status_code == 400 and column_pages == 1:
+                    # Missing or non-indexed columns cannot be filtered - remember and skip
+                    logger.warning(f"⚠️ Graph rejected $filter on {column} (index the column, or remove it from VERIFICATION_EMAIL_COLUMN if the list has no such column)")
+                    logger.warning(f"   Response: {items_response.text[:300]}")
+                    filter_support[column] = False
+                    break
+                
+                items_response.raise_for_status()
+                filter_support[column] = True
+                items_data = items_response.json()
+                
+                candidates = [_verification_candidate(item.get("fields", {})) for item in items_data.get("value", [])]
+                resident_id = _match_verification_candidates(candidates, email, first_name, last_name, dob)
+                if resident_id is not None:
+                    return resident_id, True
+                
+                url = items_data.get("@odata.nextLink")
+        
+        # A filter miss is only conclusive when every email column could be filtered;
+        # otherwise the record may carry its email in an unfiltered column
+        unfiltered = [column for column in VERIFICATION_EMAIL_COLUMNS if filter_support.get(column) is False]
+        if not unfiltered:
+            return None, True
+        logger.info(f"🔍 No filtered match; scanning for records with email in unfiltered column(s): {', '.join(unfiltered)}")
+        
+        mode = 'scan'
+        url = f"{list_items_url}?expand=fields&$top={VERIFICATION_LIST_PAGE_SIZE}"
+        logger.info(f"🔗 Graph endpoint: {url} (paged scan)")
+        
+        while url:
+            if (time.time() - list_start) * 1000 >= VERIFICATION_LIVE_QUERY_BUDGET_MS or deadline.expired():
+                return None, False
+            
+            page_count += 1
+            with timing_span('graph_page', f'verification scan page {page_count}'), observe_graph_request('verification') as call:
+                items_response = requests.get(url, headers=headers, timeout=deadline.timeout(10))
+                call['status'] = items_response.status_code
+            items_response.raise_for_status()
+            items_data = items_response.json()
+            
+            candidates = [_verification_candidate(item.get("fields", {})) for item in items_data.get("value", [])]
+            resident_id = _match_verification_candidates(candidates, email, first_name, last_name, dob)
+            if resident_id is not None:
+                return resident_id, True
+            
+            url = items_data.get("@odata.nextLink")
+        
+        return None, True
+    
+    finally:
+        timings['list_query_ms'] = (time.time() - list_start) * 1000
+        timings['list_query_mode'] = mode
+        timings['list_pages'] = page_count
+        logger.info(f"📊 Graph list query: mode={mode}, pages={page_count} in {timings['list_query_ms']:.1f}ms")
+
+
+def _verification_unavailable(timings, overall_start, deadline):
+    """Result for a verification that could not complete (service error or budget exhausted; never cached)"""
+    timings['total_verification_ms'] = (time.time() - overall_start) * 1000
+    return {
+        'verified': False,
+        'resident_id': None,
+        'message': 'Unable to verify at this time. Please try again later.',
+        'timings': timings,
+        'service_error': True,
+        'deadline_exceeded': deadline.exceeded_stage is not None or deadline.expired()
+    }
+
+
+def verify_resident_sharepoint(email, first_name, last_name, date_of_birth, deadline=None):
+    """
+    Verify a resident exists in SharePoint test list with matching details
+    Checks the in-memory verification index first; queries the list live only when
+    the index is stale or has no record for the email (it may be newer than the
+    last sync). Listed records that do not match name/DOB are a mismatch from memory
+    
+    Args:
+        email: Resident email address
+        first_name: Resident first name
+        last_name: Resident last name
+        date_of_birth: Date of birth (YYYY-MM-DD format or datetime object)
+        deadline: optional request Deadline; token, site and list stages get the
+            remaining budget and record their usage in it
+        
+    Returns:
+        dict with 'verified': bool, 'resident_id': str/None, 'message': str, 'timings': dict
+        and 'deadline_exceeded': bool (True when verification stopped because the budget ran out)
+    """
+    # Track timing for each stage
+    timings = {}
+    overall_start = time.time()
+    deadline = deadline or Deadline()
+    
+    # Normalize inputs
+    email = email.lower().strip()
+    first_name = first_name.strip()
+    last_name = last_name.strip()
+    
+    # Parse DOB if string - support multiple formats
+    dob = parse_signup_date_of_birth(date_of_birth)
+    if dob is None:
+        logger.error(f"❌ Invalid date format: {date_of_birth}")
+        return {
+            'verified': False,
+            'resident_id': None,
+            'message': INVALID_DOB_MESSAGE,
+            'timings': timings
+        }
+    
+    # Consult the in-memory verification index first (no Graph round trip)
+    index_lookup_start = time.time()
+    candidates = get_verification_candidates(email)
+    if candidates is not None:
+        resident_id = _match_verification_candidates(candidates, email, first_name, last_name, dob)
+        timings['index_lookup_ms'] = (time.time() - index_lookup_start) * 1000
+        
+        if resident_id is not None:
+            overall_elapsed = (time.time() - overall_start) * 1000
+            timings['verification_source'] = 'index'
+            timings['total_verification_ms'] = overall_elapsed
             
-            # Match found!
-            resident_id = str(fields.get('ResidentID', '') or fields.get('ID', ''))
+            logger.info(f"✅ Resident verified via verification index: {email} (ID: {resident_id})")
+            logger.info(f"⏱️ Total SharePoint verification: {overall_elapsed:.1f}ms")
             
+            return {
+                'verified': True,
+                'resident_id': resident_id,
+                'message': 'Resident verified successfully',
+                'timings': timings,
+                'deadline_exceeded': False
+            }
+        
+        if candidates:
+            # The email is listed but name/DOB differ (usually a typo) - a live
+            # query would read the same records, so answer from the index
+            overall_elapsed = (time.time() - overall_start) * 1000
+            timings['verification_source'] = 'index'
+            timings['total_verification_ms'] = overall_elapsed
+            
+            logger.info(f"❌ Verification index records for {email} do not match the name/DOB provided")
+            return {
+                'verified': False,
+                'resident_id': None,
+                'message': 'The data you provided could not be verified.',
+                'timings': timings,
+                'deadline_exceeded': False
+            }
+        
+        # The record may have been added since the last sync - confirm against the live list
+        logger.info(f"⚠️ Email {email} not in verification index - confirming with live list query")
+    
+    timings['verification_source'] = 'live'
+    
+    # Get access token with caching
+    try:
+        with deadline.stage('token'):
+            access_token, token_metrics = get_sharepoint_access_token(deadline=deadline)
+        timings.update(token_metrics)
+    except DeadlineExceeded:
+        access_token = None
+    
+    if not access_token:
+        return _verification_unavailable(timings, overall_start, deadline)
+    
+    try:
+        # Get SharePoint site for verification list
+        # Use shared config to ensure consistency with startup warm-up
+        site_config = get_verification_site_config()
+        site_hostname = site_config['hostname']
+        site_path = site_config['path']
+        
+        logger.info(f"🎯 Verification target site: {site_config['url']}")
+        logger.info(f"   Site hostname: {site_hostname}")
+        logger.info(f"   Site path: {site_path}")
+        logger.info(f"   Cache key: {site_config['cache_key']}")
+        
+        # Get site ID with caching
+        with deadline.stage('site'):
+            site_id, site_cache_hit, site_resolution_ms, site_cache_age = get_cached_site_id(site_hostname, site_path, access_token, deadline=deadline)
+        timings['site_id_cache_hit'] = site_cache_hit
+        timings['site_resolution_ms'] = site_resolution_ms
+        timings['site_cache_age_s'] = site_cache_age
+        
+        if not site_id:
+            return _verification_unavailable(timings, overall_start, deadline)
+        
+        # Query SharePoint list - filtered on the email column when possible, paged scan otherwise
+        with deadline.stage('list'):
+            resident_id, complete = _find_verification_match_live(
+                site_id, site_config['list_id'], access_token, email, first_name, last_name, dob, timings, deadline
+            )
+        
+        if resident_id is not None:
             overall_elapsed = (time.time() - overall_start) * 1000
             timings['total_verification_ms'] = overall_elapsed
             
@@ -838,9 +1416,15 @@ def verify_resident_sharepoint(email, first_name, last_name, date_of_birth):
                 'verified': True,
                 'resident_id': resident_id,
                 'message': 'Resident verified successfully',
-                'timings': timings
+                'timings': timings,
+                'deadline_exceeded': False
             }
         
+        if not complete:
+            # Part of the list was never checked - do not report a definite mismatch
+            logger.warning(f"⚠️ Verification list scan ran out of budget before a match for {email}")
+            return _verification_unavailable(timings, overall_start, deadline)
+        
         # No match found
         overall_elapsed = (time.time() - overall_start) * 1000
         timings['total_verification_ms'] = overall_elapsed
@@ -850,36 +1434,314 @@ def verify_resident_sharepoint(email, first_name, last_name, date_of_birth):
             'verified': False,
             'resident_id': None,
             'message': 'The data you provided could not be verified.',
-            'timings': timings
+            'timings': timings,
+            'deadline_exceeded': False
         }
     
+    except DeadlineExceeded as e:
+        logger.warning(f"⏳ {e}")
+        return _verification_unavailable(timings, overall_start, deadline)
     except requests.exceptions.RequestException as e:
-        overall_elapsed = (time.time() - overall_start) * 1000
-        timings['total_verification_ms'] = overall_elapsed
-        
         logger.error(f"❌ SharePoint API error: {e}")
-        return {
-            'verified': False,
-            'resident_id': None,
-            'message': 'Unable to verify at this time. Please try again later.',
-            'timings': timings
-        }
+        return _verification_unavailable(timings, overall_start, deadline)
     except Exception as e:
-        overall_elapsed = (time.time() - overall_start) * 1000
-        timings['total_verification_ms'] = overall_elapsed
-        
         logger.error(f"❌ Verification error: {e}")
+        return _verification_unavailable(timings, overall_start, deadline)
+
+
+def get_admin_site_config():
+    """
+    Get SharePoint site configuration for the admin list (main app site)
+    
+    Returns:
+        dict with hostname, path, list ID and cache key
+    """
+    site_url = os.environ.get('SHAREPOINT_SITE_URL', 'https://peakcampus.sharepoint.com/sites/BaseCampApps')
+    parsed = urlparse(site_url)
+    
+    return {
+        'hostname': parsed.hostname,
+        'path': parsed.path,
+        'list_id': os.environ.get('SHAREPOINT_ADMIN_LIST_ID', 'c07805eb-b91c-47df-ac6e-b8dc811862c0'),
+        'cache_key': f"{parsed.hostname}:{parsed.path}"
+    }
+
+
+def _is_active_admin_record(fields):
+    """Interpret the Active/IsActive field of an admin list record"""
+    active = fields.get('Active', fields.get('IsActive', ''))
+    
+    # Handle different active value formats
+    if isinstance(active, bool):
+        return active
+    if isinstance(active, str):
+        return active.lower() in ['yes', 'true', '1', 'active']
+    return active == 1
+
+
+def load_admin_directory(source='request_path'):
+    """
+    Download the SharePoint admin list (all pages) and split it into active/inactive emails
+    
+    Args:
+        source: 'startup_warmup', 'request_path' or 'background_refresh'
+    
+    Returns:
+        tuple: (active_emails: frozenset, inactive_emails: frozenset), or None on failure
+    """
+    load_start = time.time()
+    
+    access_token, _ = get_sharepoint_access_token(source=source)
+    if not access_token:
+        logger.error("❌ Unable to load admin directory - no access token")
+        return None
+    
+    site_config = get_admin_site_config()
+    site_id, _, _, _ = get_cached_site_id(site_config['hostname'], site_config['path'], access_token, source=source)
+    if not site_id:
+        logger.error(f"❌ Unable to load admin directory - site not resolved: {site_config['cache_key']}")
+        return None
+    
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json"
+    }
+    list_items_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/lists/{site_config['list_id']}/items?expand=fields&$top=500"
+    
+    active_emails = set()
+    inactive_emails = set()
+    page_count = 0
+    
+    try:
+        while list_items_url:
+            page_count += 1
+            with timing_span('graph_page', f'admin list page {page_count}'), observe_graph_request('admins') as call:
+                items_response = requests.get(list_items_url, headers=headers, timeout=10)
+                call['status'] = items_response.status_code
+            
+            if items_response.status_code == 401:
+                logger.error(f"❌ 401 Unauthorized accessing admin list")
+                logger.error(f"   Response: {items_response.text[:500]}")
+                return None
+            
+            if items_response.status_code == 404:
+                logger.error(f"❌ 404 Not Found - admin list does not exist")
+                logger.error(f"   List ID: {site_config['list_id']}")
+                logger.error(f"   Response: {items_response.text[:500]}")
+                return None
+            
+            if items_response.status_code != 200:
+                logger.error(f"❌ Error {items_response.status_code} accessing admin list")
+                logger.error(f"   Response: {items_response.text[:500]}")
+                return None
+            
+            items_data = items_response.json()
+            
+            for item in items_data.get("value", []):
+                fields = item.get("fields", {})
+                
+                # Get email (try multiple field names)
+                admin_email = (
+                    fields.get('Email', '') or 
+                    fields.get('EmailAddress', '') or 
+                    fields.get('email', '')
+                ).lower().strip()
+                
+                if not admin_email:
+                    continue
+                
+                if _is_active_admin_record(fields):
+                    active_emails.add(admin_email)
+                else:
+                    inactive_emails.add(admin_email)
+            
+            # Check for next page
+            list_items_url = items_data.get("@odata.nextLink")
+    
+    except requests.exceptions.RequestException as e:
+        logger.error(f"❌ SharePoint API error loading admin directory: {e}")
+        return None
+    
+    # An email listed as both active and inactive counts as active
+    inactive_emails -= active_emails
+    
+    load_ms = (time.time() - load_start) * 1000
+    logger.info(f"✅ Admin directory loaded: active={len(active_emails)}, inactive={len(inactive_emails)}, pages={page_count}, duration={load_ms:.1f}ms, source={source}")
+    return frozenset(active_emails), frozenset(inactive_emails)
+
+
+def refresh_admin_directory(source='request_path'):
+    """
+    Reload the admin directory and store it in the cache
+    On failure the previous directory is kept (it still expires at its staleness limit)
+    
+    Returns:
+        bool: True if the directory was refreshed
+    """
+    load_start = time.time()
+    try:
+        result = load_admin_directory(source=source)
+    except Exception as e:
+        logger.error(f"❌ Admin directory refresh error: {e}")
+        result = None
+    record_loader('admin_directory', time.time() - load_start, 'success' if result is not None else 'error')
+    
+    with _admin_directory_cache['lock']:
+        if source == 'background_refresh':
+            _admin_directory_cache['refreshing'] = False
+        if result is None:
+            return False
+        
+        now = time.time()
+        if result != (_admin_directory_cache['active_emails'], _admin_directory_cache['inactive_emails']):
+            _admin_directory_cache['version'] += 1
+        _admin_directory_cache['active_emails'], _admin_directory_cache['inactive_emails'] = result
+        _admin_directory_cache['loaded_at'] = now
+        _admin_directory_cache['expires_at'] = now + ADMIN_DIRECTORY_TTL_SECONDS
+        _admin_directory_cache['source'] = source
+        return True
+
+
+def get_admin_directory():
+    """
+    Get the cached admin directory, refreshing it when expired
+    
+    - Fresh: returned directly
+    - Expired but within ADMIN_DIRECTORY_MAX_STALE_SECONDS: returned while a
+      single background thread refreshes it
+    - Missing or too stale: reloaded synchronously
+    
+    Returns:
+        tuple: (active_emails, inactive_emails) frozensets, or None if unavailable
+    """
+    start_refresh = False
+    
+    with _admin_directory_cache['lock']:
+        now = time.time()
+        active_emails = _admin_directory_cache['active_emails']
+        
+        if active_emails is not None:
+            directory = (active_emails, _admin_directory_cache['inactive_emails'])
+            
+            if now < _admin_directory_cache['expires_at']:
+                return directory
+            
+            if now - _admin_directory_cache['loaded_at'] < ADMIN_DIRECTORY_MAX_STALE_SECONDS:
+                if not _admin_directory_cache['refreshing']:
+                    _admin_directory_cache['refreshing'] = True
+                    start_refresh = True
+            else:
+                directory = None
+        else:
+            directory = None
+    
+    if start_refresh:
+        logger.info("🔄 Admin directory expired - refreshing in background")
+        Thread(target=refresh_admin_directory, kwargs={'source': 'background_refresh'}, daemon=True).start()
+    
+    record_cache_lookup('admin_directory', hit=directory is not None)
+    if directory is not None:
+        return directory
+    
+    # Nothing usable cached - load on the request path
+    logger.info("⚠️ Admin directory cache MISS - loading synchronously")
+    refresh_admin_directory(source='request_path')
+    
+    with _admin_directory_cache['lock']:
+        if _admin_directory_cache['active_emails'] is None:
+            return None
+        if time.time() - _admin_directory_cache['loaded_at'] >= ADMIN_DIRECTORY_MAX_STALE_SECONDS:
+            return None
+        return _admin_directory_cache['active_emails'], _admin_directory_cache['inactive_emails']
+
+
+def invalidate_admin_directory():
+    """Drop the cached admin directory so the next check reloads it"""
+    with _admin_directory_cache['lock']:
+        _admin_directory_cache['active_emails'] = None
+        _admin_directory_cache['inactive_emails'] = frozenset()
+        _admin_directory_cache['loaded_at'] = None
+        _admin_directory_cache['expires_at'] = None
+        _admin_directory_cache['version'] += 1
+    logger.info("🔄 Admin directory invalidated")
+
+
+def get_admin_directory_version():
+    """Get the admin directory version (changes whenever the admin list contents change)"""
+    with _admin_directory_cache['lock']:
+        return _admin_directory_cache['version']
+
+
+def get_admin_directory_state():
+    """
+    Get current admin directory cache state for diagnostics
+    
+    Returns:
+        dict with cache state information
+    """
+    with _admin_directory_cache['lock']:
+        now = time.time()
+        
+        if _admin_directory_cache['active_emails'] is None:
+            return {
+                'present': False,
+                'source': None,
+                'admin_count': 0,
+                'age_s': 0,
+                'ttl_remaining_s': 0,
+                'expired': False,
+                'refreshing': _admin_directory_cache['refreshing'],
+                'version': _admin_directory_cache['version']
+            }
+        
         return {
-            'verified': False,
-            'resident_id': None,
-            'message': 'Unable to verify at this time. Please try again later.',
-            'timings': timings
+            'present': True,
+            'source': _admin_directory_cache.get('source', 'unknown'),
+            'admin_count': len(_admin_directory_cache['active_emails']),
+            'age_s': now - _admin_directory_cache['loaded_at'],
+            'ttl_remaining_s': max(0, _admin_directory_cache['expires_at'] - now),
+            'expired': now >= _admin_directory_cache['expires_at'],
+            'refreshing': _admin_directory_cache['refreshing'],
+            'version': _admin_directory_cache['version']
+        }
+
+
+def warmup_admin_directory():
+    """
+    Warm up the admin directory cache on application startup
+    
+    Returns:
+        dict with warmup results: success (bool), duration_ms (float), admin_count (int), error (str or None)
+    """
+    logger.info("🔥 admin_directory_warmup_started")
+    warmup_start = time.time()
+    
+    refreshed = refresh_admin_directory(source='startup_warmup')
+    duration_ms = (time.time() - warmup_start) * 1000
+    
+    if refreshed:
+        admin_count = get_admin_directory_state()['admin_count']
+        logger.info(f"✅ admin_directory_warmup_succeeded: duration={duration_ms:.1f}ms, admins={admin_count}")
+        return {
+            'success': True,
+            'duration_ms': duration_ms,
+            'admin_count': admin_count,
+            'error': None
         }
+    
+    logger.warning(f"⚠️ admin_directory_warmup_failed: duration={duration_ms:.1f}ms")
+    return {
+        'success': False,
+        'duration_ms': duration_ms,
+        'admin_count': 0,
+        'error': 'Admin directory load failed'
+    }
 
 
 def check_admin_authorization(email):
     """
     Check if user is authorized as admin via SharePoint admin list
+    Uses the cached admin directory (set lookup, no Graph calls on a cache hit)
     
     Args:
         email: User email address
@@ -896,142 +1758,107 @@ def check_admin_authorization(email):
         logger.info(f"✅ Admin authorized via hardcoded list: {email}")
         return True
     
-    # Get access token
-    access_token, _ = get_sharepoint_access_token()
-    if not access_token:
-        logger.error("❌ Unable to verify admin authorization - no access token")
+    directory = get_admin_directory()
+    if directory is None:
+        logger.error("❌ Unable to verify admin authorization - admin directory unavailable")
         return False
     
-    try:
-        # Get SharePoint site (main app site for admin list)
-        site_url = os.environ.get('SHAREPOINT_SITE_URL', 'https://peakcampus.sharepoint.com/sites/BaseCampApps')
-        # Extract hostname and path from full URL
-        from urllib.parse import urlparse
-        parsed = urlparse(site_url)
-        site_hostname = parsed.hostname
-        site_path = parsed.path
-        
-        graph_site_url = f"https://graph.microsoft.com/v1.0/sites/{site_hostname}:{site_path}"
-        
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/json"
-        }
-        
-        logger.info(f"Resolving SharePoint site for admin list: {site_hostname}{site_path}")
-        logger.info(f"Graph API URL: {graph_site_url}")
-        site_response = requests.get(graph_site_url, headers=headers, timeout=10)
-        
-        logger.info(f"Site resolution response status: {site_response.status_code}")
-        
-        if site_response.status_code == 401:
-            logger.error(f"❌ 401 Unauthorized accessing SharePoint site")
-            logger.error(f"   Graph URL: {graph_site_url}")
-            logger.error(f"   Response: {site_response.text[:500]}")
-            logger.error(f"   Required permission: Sites.Read.All or Sites.FullControl.All")
-            return False
-        
-        if site_response.status_code != 200:
-            logger.error(f"❌ Error {site_response.status_code} accessing SharePoint site")
-            logger.error(f"   Graph URL: {graph_site_url}")
-            logger.error(f"   Response: {site_response.text[:500]}")
-            return False
-        
-        site_data = site_response.json()
-        site_id = site_data.get("id")
-        
-        if not site_id:
-            logger.error(f"❌ Site ID not found in response")
-            logger.error(f"   Response keys: {list(site_data.keys())}")
-            return False
-        
-        logger.info(f"✅ Site ID resolved: {site_id[:40]}...")
-        
-        # Get admin list ID from environment
-        admin_list_id = os.environ.get('SHAREPOINT_ADMIN_LIST_ID', 'c07805eb-b91c-47df-ac6e-b8dc811862c0')
-        
-        logger.info(f"🔍 Checking admin authorization for {email}")
-        logger.info(f"   Site ID: {site_id[:40]}...")
-        logger.info(f"   List ID: {admin_list_id}")
-        
-        # Query SharePoint admin list
-        list_items_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/lists/{admin_list_id}/items?expand=fields"
-        logger.info(f"   Graph URL: {list_items_url}")
-        
-        items_response = requests.get(list_items_url, headers=headers, timeout=10)
-        logger.info(f"📥 List query response status: {items_response.status_code}")
-        
-        if items_response.status_code == 401:
-            logger.error(f"❌ 401 Unauthorized accessing admin list")
-            logger.error(f"   Response: {items_response.text[:500]}")
-            return False
-        
-        if items_response.status_code == 404:
-            logger.error(f"❌ 404 Not Found - admin list does not exist")
-            logger.error(f"   List ID: {admin_list_id}")
-            logger.error(f"   Response: {items_response.text[:500]}")
-            return False
-        
-        if items_response.status_code != 200:
-            logger.error(f"❌ Error {items_response.status_code} accessing admin list")
-            logger.error(f"   Response: {items_response.text[:500]}")
-            return False
-        
-        items_data = items_response.json()
-        
-        items = items_data.get("value", [])
-        logger.info(f"✅ Found {len(items)} admin records in SharePoint list")
-        
-        # Log sample fields for debugging (first item only)
-        if len(items) > 0:
-            sample_fields = items[0].get("fields", {})
-            logger.info(f"📋 Sample admin record field names: {list(sample_fields.keys())}")
-        
-        # Search for matching admin
-        for item in items:
-            fields = item.get("fields", {})
-            
-            # Get email (try multiple field names)
-            admin_email = (
-                fields.get('Email', '') or 
-                fields.get('EmailAddress', '') or 
-                fields.get('email', '')
-            ).lower().strip()
-            
-            if not admin_email:
-                logger.debug(f"   Skipping record with no email")
-                continue
-            
-            logger.debug(f"   Comparing: list_email='{admin_email}' vs user_email='{email}'")
-            
-            # Check if email matches
-            if admin_email == email:
-                # Check if active (try multiple field names and values)
-                active = fields.get('Active', fields.get('IsActive', ''))
-                
-                # Handle different active value formats
-                is_active = False
-                if isinstance(active, bool):
-                    is_active = active
-                elif isinstance(active, str):
-                    is_active = active.lower() in ['yes', 'true', '1', 'active']
-                elif active == 1:
-                    is_active = True
-                
-                if is_active:
-                    logger.info(f"✅ Admin authorized: {email}")
-                    return True
-                else:
-                    logger.info(f"❌ Admin found but not active: {email}")
-                    return False
-        
-        # No match found
-        logger.info(f"❌ Email not found in admin list: {email}")
-        return False
+    active_emails, inactive_emails = directory
     
-    except requests.exceptions.RequestException as e:
-        logger.error(f"❌ SharePoint API error checking admin: {e}")
-        return False
-    except Exception as e:
-        logger.error(f"❌ Admin authorization check error: {e}")
-        return False
+    if email in active_emails:
+        logger.info(f"✅ Admin authorized: {email}")
+        return True
+    
+    if email in inactive_emails:
+        logger.info(f"❌ Admin found but not active: {email}")
+    else:
+        logger.info(f"❌ Email not found in admin list: {email}")
+    return False
+
+
+# ============================================================================
+# FORK HANDLING (gunicorn --preload)
+# ============================================================================
+# Background threads do not survive fork: the master stops the index sync
+# before forking, and each worker gets fresh locks and its own sync thread
+# ============================================================================
+
+def _stop_background_sync_before_fork():
+    stop_verification_index_sync(timeout=10)
+
+
+def _reset_caches_after_fork():
+    _sharepoint_site_cache['lock'] = Lock()
+    _admin_directory_cache['lock'] = Lock()
+    _admin_directory_cache['refreshing'] = False
+    _verification_index_cache['lock'] = Lock()
+    _verification_index_cache['syncing'] = False
+    _verification_index_cache['sync_thread'] = None
+    if VERIFICATION_INDEX_ENABLED and _verification_index_cache['entries'] is not None:
+        start_verification_index_sync()
+
+
+register_fork_hooks('sharepoint_verification', _stop_background_sync_before_fork, _reset_caches_after_fork)
+
+
+# ============================================================================
+# READINESS (/ready)
+# ============================================================================
+# The sign-up path needs a Graph token and the verification site ID; the
+# verification index is required while enabled, since without it every
+# sign-up pays a live paged list scan. Checks apply only when the Azure app
+# credentials are set (test-data and admin-only instances have none), and pass
+# once the cache has been warmed: renewal and sync failures show up in the
+# detail and the logs rather than taking every instance out of rotation
+# ============================================================================
+
+def _graph_configured():
+    return all(os.environ.get(name) for name in ('AZURE_CLIENT_ID', 'AZURE_CLIENT_SECRET', 'AZURE_TENANT_ID'))
+
+
+def _graph_token_readiness():
+    state = get_graph_token_cache_state()
+    return state['present'], {
+        'ttl_remaining_s': round(state['ttl_remaining_s']),
+        'expired': state['expired'],
+        'consecutive_failures': state['consecutive_failures']
+    }
+
+
+def _site_id_readiness():
+    state = get_site_id_cache_state()
+    return state['present'], {'age_s': round(state['age_s'])}
+
+
+def _verification_index_readiness():
+    state = get_verification_index_state()
+    return state['present'], {
+        'sync_age_s': round(state['sync_age_s']),
+        'stale': state['stale'],
+        'email_count': state['email_count']
+    }
+
+
+register_readiness_check('graph_token', _graph_token_readiness, enabled=_graph_configured)
+register_readiness_check('site_id', _site_id_readiness, enabled=_graph_configured)
+if VERIFICATION_INDEX_ENABLED:
+    register_readiness_check('verification_index', _verification_index_readiness, enabled=_graph_configured)
+
+
+# ============================================================================
+# METRICS (/metrics)
+# ============================================================================
+
+def _cache_age_metrics():
+    now = time.time()
+    ages = {}
+    with _verification_index_cache['lock']:
+        if _verification_index_cache['entries'] is not None:
+            ages[('verification_index',)] = now - _verification_index_cache['synced_at']
+    with _admin_directory_cache['lock']:
+        if _admin_directory_cache['active_emails'] is not None:
+            ages[('admin_directory',)] = now - _admin_directory_cache['loaded_at']
+    return ages
+
+
+register_metric_callback('cache_age_seconds', 'gauge', 'Age of each snapshot cache since it was loaded', ['cache'], _cache_age_metrics)
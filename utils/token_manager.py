@@ -0,0 +1,304 @@
+"""
+Background renewal for app-only access tokens
+A TokenManager holds one client-credentials token (Graph for SharePoint, Graph
+for the External ID tenant) and renews it on a background timer once
+TOKEN_RENEW_AT_FRACTION of its lifetime has passed, so request threads only
+read a ready token. Only a cold start (no token yet, or the old one expired
+while renewal kept failing) acquires on the request path, one caller at a time.
+
+Workers on the same host share tokens through the shared cache tier: the
+first worker to reach a renewal point acquires, the others adopt its token.
+
+Failed renewals are retried with backoff while the old token keeps serving;
+after TOKEN_RENEW_ALERT_AFTER_FAILURES consecutive failures every registered
+alert hook is called on each further failure.
+
+Usage:
+    manager = TokenManager('graph', acquire)  # acquire(timeout) -> (access_token, expires_in)
+    token, metrics = manager.get(source='request_path')
+
+Environment:
+    TOKEN_RENEW_AT_FRACTION: fraction of the token lifetime after which it is renewed (default 0.5)
+    TOKEN_RENEW_RETRY_SECONDS: first retry delay after a failed renewal, doubled per failure (default 30)
+    TOKEN_RENEW_ALERT_AFTER_FAILURES: consecutive failures before alert hooks fire (default 3)
+"""
+import os
+import time
+import logging
+from collections import namedtuple
+from threading import Lock, Thread, Event
+from utils.shared_cache import shared_cache_get_or_load
+from utils.prefork import register_fork_hooks
+from utils.metrics import record_cache_lookup, observe_loader, register_metric_callback
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RENEW_AT_FRACTION = float(os.environ.get('TOKEN_RENEW_AT_FRACTION', '0.5'))
+TOKEN_RENEW_RETRY_SECONDS = int(os.environ.get('TOKEN_RENEW_RETRY_SECONDS', '30'))
+TOKEN_RENEW_ALERT_AFTER_FAILURES = int(os.environ.get('TOKEN_RENEW_ALERT_AFTER_FAILURES', '3'))
+
+# Tokens are not handed out in their last 5 minutes (matches the previous refresh margin)
+TOKEN_EXPIRY_MARGIN_SECONDS = 300
+# Longest wait between renewal retries
+TOKEN_RENEW_MAX_RETRY_SECONDS = 300
+
+# Published token - replaced as a whole, never mutated
+ManagedTokenSnapshot = namedtuple('ManagedTokenSnapshot', ['access_token', 'cached_at', 'expires_at', 'lifetime', 'source'])
+
+_alert_hooks = []
+_managers = []  # Every TokenManager, for fork handling
+
+
+def register_token_alert_hook(hook):
+    """
+    Register a callable notified while token renewal keeps failing
+
+    Args:
+        hook: called as hook(name, failures, ttl_remaining_s, error) - ttl_remaining_s
+            is how long the current token stays usable (0 if there is none)
+    """
+    _alert_hooks.append(hook)
+
+
+def _log_renewal_alert(name, failures, ttl_remaining_s, error):
+    logger.error(f"🚨 TOKEN RENEWAL FAILING: token={name}, consecutive_failures={failures}, "
+                 f"current_token_ttl={ttl_remaining_s:.0f}s, error={error}")
+
+
+register_token_alert_hook(_log_renewal_alert)
+
+
+class TokenAcquisitionError(Exception):
+    """Raised by acquire callables when no token could be obtained"""
+
+
+class TokenManager:
+    """One app-only token, renewed in the background before it expires"""
+
+    def __init__(self, name, acquire):
+        """
+        Args:
+            name: token name for logs and diagnostics (e.g. 'graph')
+            acquire: callable(timeout) -> (access_token, expires_in_s); raises on failure.
+                timeout is the HTTP timeout in seconds (None for the library default)
+        """
+        self.name = name
+        self._acquire = acquire
+        self._snapshot = None
+        self._acquire_lock = Lock()  # One acquisition at a time (renewal or cold start)
+        self._lock = Lock()  # Guards the renewal bookkeeping below
+        self._thread = None
+        self._stop = Event()
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.renewals = 0
+        self.next_renewal_at = None
+        _managers.append(self)
+
+    def current(self):
+        """Get the current token snapshot if usable (outside the expiry margin), else None"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.time() < snapshot.expires_at - TOKEN_EXPIRY_MARGIN_SECONDS:
+            return snapshot
+        return None
+
+    def _acquire_shared(self, timeout):
+        """
+        Acquire via the host-wide shared cache: a token another worker acquired
+        since this worker's renewal point is adopted instead of requesting a new one.
+        Shared entries expire at the token's own renewal point
+
+        Returns:
+            tuple: (access_token, expires_in_s)
+        """
+        def load():
+            with observe_loader(f'{self.name}_token'):
+                access_token, expires_in = self._acquire(timeout)
+            return {'access_token': access_token, 'expires_at': time.time() + expires_in, 'lifetime': expires_in}
+
+        value, origin, _ = shared_cache_get_or_load(
+            f'token:{self.name}', load,
+            ttl_seconds=lambda value: value['lifetime'] * TOKEN_RENEW_AT_FRACTION,
+            wait_seconds=timeout
+        )
+        if origin in ('shared', 'waited'):
+            logger.info(f"🔗 {self.name} token adopted from shared cache")
+        return value['access_token'], value['expires_at'] - time.time()
+
+    def _publish(self, access_token, expires_in, source):
+        now = time.time()
+        self._snapshot = ManagedTokenSnapshot(access_token, now, now + expires_in, expires_in, source)
+        with self._lock:
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.next_renewal_at = now + expires_in * TOKEN_RENEW_AT_FRACTION
+        return self._snapshot
+
+    def get(self, source='request_path', timeout=None):
+        """
+        Get a usable token, acquiring it on this thread only when none is ready
+
+        Args:
+            source: where a cold acquisition came from ('startup_warmup', 'request_path', ...)
+            timeout: HTTP timeout for a cold acquisition
+
+        Returns:
+            tuple: (snapshot or None, acquisition_ms: float, error: str or None)
+                acquisition_ms is 0 when a ready token was returned
+        """
+        snapshot = self.current()
+        record_cache_lookup(f'{self.name}_token', hit=snapshot is not None)
+        if snapshot is not None:
+            return snapshot, 0.0, None
+
+        acquire_start = time.time()
+        with self._acquire_lock:
+            # Another caller (or the renewer) may have acquired while we waited
+            snapshot = self.current()
+            if snapshot is not None:
+                return snapshot, (time.time() - acquire_start) * 1000, None
+
+            try:
+                access_token, expires_in = self._acquire_shared(timeout)
+            except Exception as e:
+                with self._lock:
+                    self.last_error = str(e)
+                return None, (time.time() - acquire_start) * 1000, str(e)
+
+            snapshot = self._publish(access_token, expires_in, source)
+
+        self.start()
+        return snapshot, (time.time() - acquire_start) * 1000, None
+
+    def _retry_delay(self):
+        delay = min(TOKEN_RENEW_MAX_RETRY_SECONDS, TOKEN_RENEW_RETRY_SECONDS * 2 ** max(0, self.consecutive_failures - 1))
+        snapshot = self._snapshot
+        if snapshot is not None:
+            # Never sleep past the point where the current token stops being handed out
+            delay = min(delay, max(1.0, snapshot.expires_at - TOKEN_EXPIRY_MARGIN_SECONDS - time.time()))
+        return delay
+
+    def _renew(self):
+        """Acquire a replacement token; on failure keep the current one and schedule a retry"""
+        renew_start = time.time()
+        try:
+            with self._acquire_lock:
+                access_token, expires_in = self._acquire_shared(None)
+                self._publish(access_token, expires_in, 'background_renewal')
+            with self._lock:
+                self.renewals += 1
+            logger.info(f"🔄 {self.name} token renewed in background: {(time.time() - renew_start) * 1000:.1f}ms, TTL={expires_in:.0f}s")
+            return
+        except Exception as e:
+            error = str(e)
+
+        snapshot = self._snapshot
+        ttl_remaining = max(0.0, snapshot.expires_at - time.time()) if snapshot is not None else 0.0
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = error
+            failures = self.consecutive_failures
+            self.next_renewal_at = time.time() + self._retry_delay()
+
+        logger.warning(f"⚠️ {self.name} token renewal failed (attempt {failures}, current token TTL={ttl_remaining:.0f}s): {error}")
+        if failures >= TOKEN_RENEW_ALERT_AFTER_FAILURES:
+            for hook in list(_alert_hooks):
+                try:
+                    hook(self.name, failures, ttl_remaining, error)
+                except Exception as hook_error:
+                    logger.error(f"❌ Token alert hook failed: {hook_error}")
+
+    def _renewal_loop(self):
+        while not self._stop.is_set():
+            with self._lock:
+                next_renewal_at = self.next_renewal_at
+            delay = max(0.0, next_renewal_at - time.time()) if next_renewal_at is not None else TOKEN_RENEW_RETRY_SECONDS
+            if self._stop.wait(delay):
+                break
+            self._renew()
+
+    def start(self):
+        """Start the background renewal thread (no-op if it is already running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = Thread(target=self._renewal_loop, name=f'token-renewal-{self.name}', daemon=True)
+            self._thread.start()
+        logger.info(f"🔄 {self.name} token renewal thread started (renew at {TOKEN_RENEW_AT_FRACTION:.0%} of lifetime)")
+
+    def stop(self, timeout=None):
+        """
+        Stop the background renewal thread (the current token stays usable)
+
+        Args:
+            timeout: seconds to wait for the thread to exit (None = do not wait)
+        """
+        self._stop.set()
+        thread = self._thread
+        if timeout is not None and thread is not None:
+            thread.join(timeout)
+
+    def _reset_after_fork(self):
+        """Fresh locks and renewal thread for a forked child (the parent's thread is gone)"""
+        self._acquire_lock = Lock()
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+        if self._snapshot is not None:
+            self.start()
+
+    def state(self):
+        """
+        Get token and renewal state for diagnostics
+
+        Returns:
+            dict with present, source, age_s, ttl_remaining_s, expired, renewer_running,
+            next_renewal_in_s, consecutive_failures, renewals and last_error
+        """
+        snapshot = self._snapshot
+        now = time.time()
+        with self._lock:
+            renewal = {
+                'renewer_running': self._thread is not None and self._thread.is_alive(),
+                'next_renewal_in_s': max(0.0, self.next_renewal_at - now) if self.next_renewal_at is not None else None,
+                'consecutive_failures': self.consecutive_failures,
+                'renewals': self.renewals,
+                'last_error': self.last_error
+            }
+
+        if snapshot is None:
+            return dict(renewal, present=False, source=None, age_s=0, ttl_remaining_s=0, expired=False)
+
+        return dict(
+            renewal,
+            present=True,
+            source=snapshot.source,
+            age_s=now - snapshot.cached_at,
+            ttl_remaining_s=max(0, snapshot.expires_at - now),
+            expired=now >= snapshot.expires_at
+        )
+
+
+def _stop_renewals_before_fork():
+    for manager in _managers:
+        manager.stop(timeout=10)
+
+
+def _restart_renewals_after_fork():
+    for manager in _managers:
+        manager._reset_after_fork()
+
+
+register_fork_hooks('token_manager', _stop_renewals_before_fork, _restart_renewals_after_fork)
+
+
+def _token_ttl_metrics():
+    now = time.time()
+    return {
+        (manager.name,): max(0.0, manager._snapshot.expires_at - now)
+        for manager in _managers if manager._snapshot is not None
+    }
+
+
+register_metric_callback('token_ttl_seconds', 'gauge', 'Remaining lifetime of each app-only token', ['token'], _token_ttl_metrics)
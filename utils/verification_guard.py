@@ -0,0 +1,166 @@
+"""
+Retry and abuse protection for sign-up verification
+Failed sign-ups are typically retried within seconds with the same details,
+and Entra itself retries the custom extension call. Definitive verification
+results are cached briefly by a hash of the submitted (email, name, DOB), so
+retries are answered from memory, and token buckets per email and per client
+IP stop brute-force attempts before they reach Graph
+"""
+import os
+import re
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+VERIFY_RESULT_CACHE_TTL_SECONDS = int(os.environ.get('VERIFY_RESULT_CACHE_TTL_SECONDS', '60'))
+VERIFY_NEGATIVE_CACHE_TTL_SECONDS = int(os.environ.get('VERIFY_NEGATIVE_CACHE_TTL_SECONDS', '30'))
+VERIFY_RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('VERIFY_RESULT_CACHE_MAX_ENTRIES', '10000'))
+
+VERIFY_EMAIL_RATE_PER_MINUTE = float(os.environ.get('VERIFY_EMAIL_RATE_PER_MINUTE', '6'))
+VERIFY_EMAIL_BURST = int(os.environ.get('VERIFY_EMAIL_BURST', '5'))
+VERIFY_IP_RATE_PER_MINUTE = float(os.environ.get('VERIFY_IP_RATE_PER_MINUTE', '30'))
+VERIFY_IP_BURST = int(os.environ.get('VERIFY_IP_BURST', '20'))
+
+_result_cache = LRUCache(VERIFY_RESULT_CACHE_MAX_ENTRIES, ttl_seconds=VERIFY_RESULT_CACHE_TTL_SECONDS, name='verification_result')
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets: each key may spend `burst` attempts at once and
+    regains `rate_per_minute` attempts per minute. Idle keys beyond max_keys
+    are evicted least-recently-used first (an evicted key starts with a full bucket)
+    """
+
+    def __init__(self, rate_per_minute, burst, max_keys=10000):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = max(1, int(burst))
+        self.max_keys = max(1, int(max_keys))
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def allow(self, key):
+        """
+        Spend one token for key
+
+        Returns:
+            bool: True if the attempt is allowed
+        """
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(self.burst), now]
+                self._buckets[key] = bucket
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_per_second)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                self.allowed += 1
+                return True
+
+            self.limited += 1
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'keys': len(self._buckets),
+                'allowed': self.allowed,
+                'limited': self.limited
+            }
+
+
+_email_limiter = TokenBucketLimiter(VERIFY_EMAIL_RATE_PER_MINUTE, VERIFY_EMAIL_BURST)
+_ip_limiter = TokenBucketLimiter(VERIFY_IP_RATE_PER_MINUTE, VERIFY_IP_BURST)
+
+
+def verification_result_key(email, first_name, last_name, date_of_birth):
+    """
+    Build the result cache key for submitted sign-up details
+    Inputs are normalized (case, whitespace, DOB separators) so a retry of the
+    same details maps to the same key; only the digest is kept in memory
+
+    Returns:
+        str: hex SHA-256 digest
+    """
+    normalized = '\x1f'.join([
+        (email or '').strip().lower(),
+        (first_name or '').strip().lower(),
+        (last_name or '').strip().lower(),
+        re.sub(r'\D', '', date_of_birth or '')
+    ])
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def get_cached_verification_result(key):
+    """
+    Get a cached verification result
+
+    Returns:
+        result dict (source 'cache', timings replaced with {'result_cache_hit': True}),
+        or None on a miss
+    """
+    result = _result_cache.get(key)
+    if result is None:
+        return None
+    return dict(result, source='cache', timings={'result_cache_hit': True})
+
+
+def store_verification_result(key, result):
+    """
+    Cache a verification result if it is definitive
+    Service errors and exhausted deadlines are never cached; mismatches are kept
+    for VERIFY_NEGATIVE_CACHE_TTL_SECONDS, matches for VERIFY_RESULT_CACHE_TTL_SECONDS
+    """
+    if result.get('service_error') or result.get('deadline_exceeded'):
+        return
+
+    ttl = VERIFY_RESULT_CACHE_TTL_SECONDS if result.get('verified') else VERIFY_NEGATIVE_CACHE_TTL_SECONDS
+    cached = {name: value for name, value in result.items() if name != 'timings'}
+    _result_cache.set(key, cached, ttl_seconds=ttl)
+
+
+def check_verification_rate_limits(email, client_ip):
+    """
+    Spend a verification attempt for the email and the end user's IP
+
+    Args:
+        email: submitted email
+        client_ip: end-user IP from the Entra authentication context (None to skip)
+
+    Returns:
+        str: 'email' or 'ip' naming the exhausted limit, or None if allowed
+    """
+    if email and not _email_limiter.allow(email.strip().lower()):
+        logger.warning(f"🚦 Verification rate limit hit for email={email}")
+        return 'email'
+    if client_ip and not _ip_limiter.allow(client_ip):
+        logger.warning(f"🚦 Verification rate limit hit for client_ip={client_ip}")
+        return 'ip'
+    return None
+
+
+def get_verification_guard_state():
+    """
+    Get result cache and rate limiter counters for diagnostics
+
+    Returns:
+        dict with result_cache, email_limiter and ip_limiter stats
+    """
+    return {
+        'result_cache': _result_cache.stats(),
+        'email_limiter': _email_limiter.stats(),
+        'ip_limiter': _ip_limiter.stats()
+    }
@@ -0,0 +1,217 @@
+"""
+Multi-source resident verification
+Queries the configured verification sources (SharePoint verification list,
+Entrata) concurrently, each with its own timeout inside the request deadline,
+and returns the first positive match. Sources that are still running when a
+match arrives (or when the deadline runs out) are ignored, and the log records
+which source won and how long each took.
+
+Environment:
+    VERIFICATION_SOURCES: comma-separated sources in priority order
+        (default 'sharepoint'; e.g. 'sharepoint,entrata')
+    VERIFICATION_SOURCE_TIMEOUTS_MS: per-source timeouts, e.g. 'sharepoint=1500,entrata=1200'
+        (sources not listed only use the request deadline)
+"""
+import os
+import time
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.deadline import Deadline
+from utils.logging_pipeline import log_kv
+from utils.prefork import register_fork_hooks
+from utils.sharepoint_verification import verify_resident_sharepoint, parse_signup_date_of_birth, INVALID_DOB_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_source_timeouts(raw):
+    """Parse "source=ms,source=ms" into a dict, ignoring malformed entries"""
+    timeouts = {}
+    for entry in (raw or '').split(','):
+        name, sep, value = entry.partition('=')
+        if not sep:
+            continue
+        try:
+            timeouts[name.strip().lower()] = int(value)
+        except ValueError:
+            continue
+    return timeouts
+
+
+VERIFICATION_SOURCES = [
+    name.strip().lower() for name in os.environ.get('VERIFICATION_SOURCES', 'sharepoint').split(',') if name.strip()
+]
+VERIFICATION_SOURCE_TIMEOUTS_MS = _parse_source_timeouts(os.environ.get('VERIFICATION_SOURCE_TIMEOUTS_MS', ''))
+VERIFICATION_FANOUT_WORKERS = int(os.environ.get('VERIFICATION_FANOUT_WORKERS', '8'))
+
+_verification_executor = ThreadPoolExecutor(max_workers=VERIFICATION_FANOUT_WORKERS, thread_name_prefix='verify')
+
+
+def _shutdown_executor_before_fork():
+    _verification_executor.shutdown(wait=True)
+
+
+def _new_executor_after_fork():
+    # The parent's worker threads do not exist in a forked child
+    global _verification_executor
+    _verification_executor = ThreadPoolExecutor(max_workers=VERIFICATION_FANOUT_WORKERS, thread_name_prefix='verify')
+
+
+register_fork_hooks('verification_orchestrator', _shutdown_executor_before_fork, _new_executor_after_fork)
+
+
+def _verify_with_entrata(email, first_name, last_name, dob, deadline):
+    from utils.entrata_api import get_entrata_client  # Only when 'entrata' is a configured source
+    return get_entrata_client().verify_resident(email, first_name, last_name, dob, deadline=deadline)
+
+
+def _verify_with_sharepoint(email, first_name, last_name, dob, deadline):
+    return verify_resident_sharepoint(email=email, first_name=first_name, last_name=last_name,
+                                      date_of_birth=dob, deadline=deadline)
+
+
+_SOURCE_VERIFIERS = {
+    'sharepoint': _verify_with_sharepoint,
+    'entrata': _verify_with_entrata
+}
+
+
+def _source_deadline(source, deadline):
+    """Deadline for one source: its configured timeout, never past the request deadline"""
+    timeout_ms = VERIFICATION_SOURCE_TIMEOUTS_MS.get(source)
+    remaining_ms = deadline.remaining_ms()
+    if timeout_ms is None or timeout_ms > remaining_ms:
+        return Deadline(None if remaining_ms == float('inf') else remaining_ms)
+    return Deadline(timeout_ms)
+
+
+def _run_source(source, email, first_name, last_name, dob, deadline):
+    """Run one source verifier, turning exceptions into a service error result"""
+    start = time.time()
+    try:
+        result = _SOURCE_VERIFIERS[source](email, first_name, last_name, dob, deadline)
+    except Exception as e:
+        logger.error(f"❌ Verification source {source} failed: {e}", exc_info=True)
+        result = {
+            'verified': False,
+            'resident_id': None,
+            'message': 'Unable to verify at this time. Please try again later.',
+            'service_error': True
+        }
+    result['source'] = source
+    result['source_ms'] = (time.time() - start) * 1000
+    result['deadline_exceeded'] = result.get('deadline_exceeded', False) or deadline.expired()
+    return result
+
+
+def verify_resident(email, first_name, last_name, date_of_birth, deadline=None):
+    """
+    Verify a resident against every configured source, returning the first match
+
+    - Any source verifies: that result wins immediately (others are ignored)
+    - All sources answered and at least one failed to check: service error
+      (a miss in one source is not conclusive while another could not be asked)
+    - All sources answered with a mismatch: not verified
+    - Deadline ran out first: deadline_exceeded result
+
+    Args:
+        email, first_name, last_name, date_of_birth: submitted sign-up details
+        deadline: request Deadline shared by all sources
+
+    Returns:
+        dict with 'verified', 'resident_id', 'message', 'timings', 'service_error'
+        and 'deadline_exceeded'; timings include verification_winner and <source>_ms
+    """
+    deadline = deadline or Deadline()
+    fanout_start = time.time()
+    sources = [source for source in VERIFICATION_SOURCES if source in _SOURCE_VERIFIERS]
+    if not sources:
+        logger.error(f"❌ No known verification sources configured: {VERIFICATION_SOURCES}")
+        sources = ['sharepoint']
+
+    dob = parse_signup_date_of_birth(date_of_birth)
+    if dob is None:
+        logger.error(f"❌ Invalid date format: {date_of_birth}")
+        return {'verified': False, 'resident_id': None, 'message': INVALID_DOB_MESSAGE, 'timings': {}}
+
+    if len(sources) == 1:
+        # Single source - run inline, no thread hand-off
+        results = [_run_source(sources[0], email, first_name, last_name, dob, deadline)]
+        pending = []
+    else:
+        futures = {}
+        for source in sources:
+            # Each worker runs in a copy of the request context so its Server-Timing spans are kept
+            context = contextvars.copy_context()
+            source_deadline = _source_deadline(source, deadline)
+            future = _verification_executor.submit(
+                context.run, _run_source, source, email, first_name, last_name, dob, source_deadline
+            )
+            futures[future] = (source, source_deadline)
+
+        results = []
+        pending = set(futures)
+        while pending and not deadline.expired():
+            # Wake at the next source timeout so a hung source is given up on in time
+            remaining_ms = min(futures[future][1].remaining_ms() for future in pending)
+            done, pending = wait(pending, timeout=None if remaining_ms == float('inf') else remaining_ms / 1000,
+                                 return_when=FIRST_COMPLETED)
+            results.extend(future.result() for future in done)
+            if any(result['verified'] for result in results):
+                break
+
+            for future in [future for future in pending if futures[future][1].expired()]:
+                source, source_deadline = futures[future]
+                logger.warning(f"⏳ Verification source {source} timed out - ignoring it")
+                pending.discard(future)
+                future.cancel()
+                results.append({
+                    'verified': False,
+                    'resident_id': None,
+                    'message': 'Unable to verify at this time. Please try again later.',
+                    'service_error': True,
+                    'deadline_exceeded': True,
+                    'source': source,
+                    'source_ms': source_deadline.elapsed_ms()
+                })
+
+        for future in pending:
+            future.cancel()  # Only stops sources that have not started; running ones are ignored
+        pending = [futures[future][0] for future in pending]
+
+    timings = {f"{result['source']}_ms": result['source_ms'] for result in results}
+    winner = next((result for result in results if result['verified']), None)
+
+    if winner is not None:
+        outcome = dict(winner)
+    elif pending:
+        deadline.exceeded_stage = deadline.exceeded_stage or f"fanout:{','.join(pending)}"
+        outcome = {
+            'verified': False,
+            'resident_id': None,
+            'message': 'Unable to verify at this time. Please try again later.',
+            'service_error': True,
+            'deadline_exceeded': True
+        }
+    else:
+        failed = [result for result in results if result.get('service_error')]
+        outcome = dict(failed[0] if failed else results[0])
+        # A single source timing out is a service error; only the request deadline ends the call early
+        outcome['deadline_exceeded'] = deadline.expired()
+
+    # Keep the winning/deciding source's detailed timings alongside the per-source latencies
+    timings.update(outcome.get('timings', {}))
+    timings['verification_winner'] = winner['source'] if winner is not None else None
+    timings['fanout_ms'] = (time.time() - fanout_start) * 1000
+    outcome['timings'] = timings
+    outcome.setdefault('service_error', False)
+    outcome.setdefault('deadline_exceeded', False)
+
+    log_kv(logger, logging.INFO, "🏁 VERIFICATION SOURCES",
+           winner=timings['verification_winner'] or 'none',
+           winner_latency_ms=winner['source_ms'] if winner is not None else 0,
+           **{result['source']: 'verified' if result['verified'] else ('error' if result.get('service_error') else 'no_match')
+              for result in results},
+           **{source: 'pending' for source in pending})
+    return outcome